@@ -0,0 +1,339 @@
+"""
+여러 사이트맵(도메인)을 한 프로세스에서 일괄 진단 (cron 등 비대화형 실행용)
+- aiohttp 세션, 분석 워커/파싱 프로세스 풀, 브라우저 풀, 캐시와 결과 저장소를 모든 도메인이 공유합니다
+- 전체 동시 요청 수(--concurrency)는 분석 워커 수와 세션 연결 수로 한 번에 제한하고,
+  도메인별 URL은 FairQueue로 번갈아 투입하여 URL이 많은 도메인이 다른 도메인을 밀어내지 않게 합니다
+- 검색 엔진 수집은 차단을 피하기 위해 BATCH_ENGINE_SITES개 도메인씩만 동시에 진행합니다
+- 도메인별 리포트(main.py와 같은 형식)와 전체 요약(batch_summary_*.csv)을 저장합니다
+
+사용법:
+  python batch.py sites.txt [--incremental] [--concurrency 50]
+  python batch.py https://a.com/sitemap.xml b.com
+  (파일은 한 줄에 사이트맵 URL 또는 도메인 하나, 도메인이면 https://<도메인>/sitemap.xml 사용, # 이후는 주석)
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import os
+import re
+import sys
+from collections import deque
+
+import aiohttp
+
+from config import (
+    BATCH_ENGINE_SITES,
+    BATCH_SITE_BUFFER,
+    CONCURRENT_REQUESTS,
+    ENGINES,
+    INCREMENTAL_STALE_DAYS,
+)
+from host_limiter import HostLimiter
+from http_cache import HttpCache
+from index_checker import get_domain_from_url
+from main import (
+    apply_engine_results,
+    crawl_all_engines,
+    write_metrics,
+    write_run_reports,
+)
+from metrics import METRICS, http_trace_config
+from run_store import REPORT_ENGINES, RunStore
+from seo_analyzer import analyze_urls_async
+from serp_cache import SerpCache
+from sitemap_parser import SitemapError, describe_error, iter_sitemap_entries_async
+from state_store import UrlStateStore
+
+REPORTS_DIR = "reports"
+SUMMARY_FIELDNAMES = (['Domain', 'Sitemap', 'Run', 'URLs', 'Reused'] +
+                      [f"{engine.capitalize()}_Indexed" for engine in REPORT_ENGINES] +
+                      ['Any_Indexed', 'Not_Indexed', 'Redirected', 'Report', 'Error'])
+
+class FairQueue:
+    """
+    키(도메인)별 대기열을 한 항목씩 번갈아 꺼내는 큐입니다.
+    키마다 최대 maxsize개까지만 쌓이므로 빠른 사이트맵이 앞서 나가도 메모리와 순서가 한 도메인에 쏠리지 않습니다.
+    생산자는 open()으로 등록하고 끝나면 close()를 호출합니다. 모두 끝나고 비면 get()이 None을 반환합니다.
+    """
+    def __init__(self, maxsize=BATCH_SITE_BUFFER):
+        self.maxsize = maxsize
+        self._items = {}
+        self._ready = deque()  # 꺼낼 항목이 있는 키 (순환)
+        self._open = 0
+        self._changed = asyncio.Condition()
+
+    def open(self):
+        self._open += 1
+
+    async def close(self):
+        async with self._changed:
+            self._open -= 1
+            self._changed.notify_all()
+
+    async def put(self, key, item):
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self._items.get(key, ())) < self.maxsize)
+            items = self._items.setdefault(key, deque())
+            if not items:
+                self._ready.append(key)
+            items.append(item)
+            self._changed.notify_all()
+
+    async def get(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._ready or not self._open)
+            if not self._ready:
+                return None
+            key = self._ready.popleft()
+            items = self._items[key]
+            item = items.popleft()
+            if items:
+                self._ready.append(key)
+            else:
+                del self._items[key]
+            self._changed.notify_all()
+            return key, item
+
+class BatchSite:
+    """일괄 실행의 도메인(사이트맵) 하나에 대한 진행 상태"""
+    def __init__(self, sitemap_url):
+        self.sitemap_url = sitemap_url
+        self.domain = None
+        self.run_id = None
+        self.found = 0
+        self.reused = 0
+        self.lastmods = {}
+        self.engine_task = None
+        self.engine_urls = None
+        self.error = None
+        self.sitemap_failed = False # 사이트맵을 모두 읽지 못함 (실행을 완료로 표시하지 않음)
+
+def to_sitemap_url(value):
+    """도메인만 주어지면 https://<도메인>/sitemap.xml로 바꿉니다."""
+    value = value.strip()
+    if '://' in value:
+        return value
+    return f"https://{value.strip('/')}/sitemap.xml"
+
+def read_sitemap_list(values):
+    """인자(사이트맵 URL, 도메인 또는 목록 파일 경로)를 중복 없는 사이트맵 URL 목록으로 펼칩니다."""
+    sitemaps = []
+    for value in values:
+        if os.path.isfile(value):
+            with open(value, encoding='utf-8') as f:
+                lines = [line.split('#', 1)[0].strip() for line in f]
+            sitemaps.extend(to_sitemap_url(line) for line in lines if line)
+        else:
+            sitemaps.append(to_sitemap_url(value))
+    return list(dict.fromkeys(sitemaps))
+
+async def run_batch_async(sitemap_urls, cache, state, store, limiter, incremental=False,
+                          stale_days=INCREMENTAL_STALE_DAYS, refresh_engines=(), concurrency=CONCURRENT_REQUESTS):
+    """
+    사이트맵 여러 개를 하나의 세션과 분석 워커 풀로 함께 분석하고, 도메인별 검색 엔진 수집을 진행합니다.
+    반환값: BatchSite 목록 (run_id가 None이면 URL을 찾지 못한 사이트)
+    """
+    from browser_pool import close_shared_pool
+
+    sites = [BatchSite(url) for url in sitemap_urls]
+    fair = FairQueue()
+    owners = {}  # 분석 중인 URL → 해당 URL을 넘긴 BatchSite 목록
+    engine_slots = asyncio.Semaphore(BATCH_ENGINE_SITES)
+    serp_cache = SerpCache()
+    stale_after = stale_days * 86400
+
+    def save_result(site, result, reused=False):
+        url = result['url']
+        if not reused:
+            state.save(result, site.lastmods.pop(url, None))
+        store.add(site.run_id, result)
+        print(f"{'Reused' if reused else 'Checked'}: {url} [{result['status_code']}]")
+
+    def on_analyze_complete(result):
+        url = result['url']
+        waiting = owners[url]
+        site = waiting.popleft()
+        if not waiting:
+            del owners[url]
+        save_result(site, result)
+
+    async def crawl_engines(site):
+        async with engine_slots:
+            print(f"\n[검색 엔진] {site.domain} 수집 시작")
+            return await crawl_all_engines(site.domain, refresh_engines, serp_cache=serp_cache, close_pool=False)
+
+    async def produce(site, session):
+        """사이트맵 항목을 읽어 도메인 대기열에 넣습니다. 첫 항목에서 실행을 시작하고 검색 엔진 수집을 예약합니다."""
+        try:
+            async for entry in iter_sitemap_entries_async(site.sitemap_url, session=session, cache=cache):
+                url = entry['loc']
+                if site.run_id is None:
+                    site.domain = get_domain_from_url(url)
+                    site.run_id = store.start_run(site.domain, site.sitemap_url)
+                    site.engine_task = asyncio.create_task(crawl_engines(site))
+                site.found += 1
+                previous = state.reusable_result(url, entry['lastmod'], stale_after) if incremental else None
+                if previous is not None:
+                    site.reused += 1
+                    save_result(site, previous, reused=True)
+                    continue
+                site.lastmods[url] = entry['lastmod']
+                await fair.put(site, url)
+        except SitemapError as e:
+            # 읽은 URL까지는 분석하되, 목록이 불완전하므로 요약과 종료 코드에 실패로 남김
+            site.sitemap_failed = True
+            if site.found:
+                site.error = f"사이트맵 일부를 읽지 못함 (URL {site.found}개만 분석): {e}"
+            else:
+                site.error = f"사이트맵을 읽지 못함: {e}"
+            print(f"[!] {site.sitemap_url}: {site.error}")
+        except Exception as e:
+            site.sitemap_failed = True
+            site.error = describe_error(e)
+            print(f"[!] 사이트맵 처리 오류 ({site.sitemap_url}): {site.error}")
+        finally:
+            await fair.close()
+
+    async def queued_urls():
+        while True:
+            item = await fair.get()
+            if item is None:
+                return
+            site, url = item
+            owners.setdefault(url, deque()).append(site)
+            yield url
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                     trace_configs=[http_trace_config()]) as session:
+        for _ in sites:
+            fair.open()
+        producers = [asyncio.create_task(produce(site, session)) for site in sites]
+        engine_tasks = []
+        try:
+            with METRICS.timer('stage_seconds', stage='analysis'):
+                await analyze_urls_async(queued_urls(), on_analyze_complete, retain=False, limiter=limiter,
+                                         cache=cache, session=session, concurrency=concurrency)
+            await asyncio.gather(*producers)
+            engine_tasks = [site.engine_task for site in sites if site.engine_task is not None]
+            if any(not task.done() for task in engine_tasks):
+                print("\n  SEO 분석 완료 - 검색 엔진 수집이 끝나기를 기다리는 중...")
+            for site in sites:
+                if site.engine_task is None:
+                    continue
+                try:
+                    site.engine_urls = await site.engine_task
+                except Exception as e:
+                    site.error = f"검색 엔진 수집 오류: {e}"
+                    site.engine_urls = {engine: set() for engine in ENGINES}
+        finally:
+            for task in producers + [site.engine_task for site in sites if site.engine_task is not None]:
+                task.cancel()
+            await close_shared_pool()
+            serp_cache.close()
+    return sites
+
+def _file_tag(domain, timestamp):
+    return f"{re.sub(r'[^0-9A-Za-z.-]', '_', domain)}_{timestamp}"
+
+def write_batch_summary(filename, rows):
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def run_batch(sitemap_urls, incremental=False, stale_days=INCREMENTAL_STALE_DAYS, refresh_engines=(),
+              concurrency=CONCURRENT_REQUESTS, reports_dir=REPORTS_DIR):
+    """
+    사이트맵 목록을 일괄 진단하고 도메인별 리포트와 전체 요약 CSV를 저장합니다.
+    반환값: (요약 CSV 경로, 도메인별 요약 dict 목록)
+    """
+    os.makedirs(reports_dir, exist_ok=True)
+    cache = HttpCache()
+    state = UrlStateStore()
+    store = RunStore()
+    limiter = HostLimiter()
+    try:
+        with METRICS.timer('stage_seconds', stage='pipeline'):
+            sites = asyncio.run(run_batch_async(sitemap_urls, cache, state, store, limiter, incremental=incremental,
+                                                stale_days=stale_days, refresh_engines=refresh_engines,
+                                                concurrency=concurrency))
+    finally:
+        cache.close()
+        state.close()
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    rows = []
+    try:
+        for site in sites:
+            row = {'Sitemap': site.sitemap_url, 'Domain': site.domain or '', 'Error': site.error or ''}
+            if site.run_id is None:
+                row['Error'] = row['Error'] or "URL 없음"
+                rows.append(row)
+                continue
+            if site.sitemap_failed:
+                # main.py와 같이 실행을 끝나지 않은 상태로 남겨 --resume으로 남은 URL을 이어서 진행할 수 있게 함
+                print(f"[!] {site.sitemap_url}: run #{site.run_id}을(를) 완료하지 못했습니다. "
+                      f"'python main.py --resume {site.run_id}'로 이어서 진행할 수 있습니다.")
+            else:
+                store.finish_run(site.run_id)
+            apply_engine_results(store, site.run_id, site.engine_urls)
+            report = write_run_reports(store, site.run_id, site.domain, reports_dir, _file_tag(site.domain, timestamp))
+            summary = report['summary']
+            row.update({
+                'Run': site.run_id,
+                'URLs': summary['total'],
+                'Reused': site.reused,
+                'Any_Indexed': summary['any_indexed'],
+                'Not_Indexed': summary['not_indexed'],
+                'Redirected': summary['redirected'],
+                'Report': report['sorted_filename'],
+            })
+            for engine in REPORT_ENGINES:
+                row[f"{engine.capitalize()}_Indexed"] = summary['engines'][engine]
+            rows.append(row)
+    finally:
+        store.close()
+
+    summary_filename = os.path.join(reports_dir, f"batch_summary_{timestamp}.csv")
+    write_batch_summary(summary_filename, rows)
+    write_metrics(reports_dir, f"batch_{timestamp}")
+    return summary_filename, rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="여러 사이트맵 일괄 진단")
+    parser.add_argument('sites', nargs='+', help="사이트맵 URL, 도메인 또는 목록 파일 (한 줄에 하나)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="새 URL, lastmod가 갱신된 URL, 지난번 실패한 URL, 오래된 결과만 다시 분석")
+    parser.add_argument('--stale-days', type=float, default=INCREMENTAL_STALE_DAYS,
+                        help=f"증분 실행 시 이 기간(일)보다 오래된 결과는 재분석 (기본값: {INCREMENTAL_STALE_DAYS})")
+    parser.add_argument('--refresh-engines', nargs='*', choices=list(ENGINES), metavar='ENGINE',
+                        help="캐시된 검색 엔진 결과를 무시하고 다시 수집 (엔진 생략 시 전체)")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENT_REQUESTS,
+                        help=f"모든 도메인을 합친 동시 요청 수 (기본값: {CONCURRENT_REQUESTS})")
+    parser.add_argument('--reports-dir', default=REPORTS_DIR)
+    args = parser.parse_args(argv)
+    refresh_engines = () if args.refresh_engines is None else tuple(args.refresh_engines or ENGINES)
+
+    sitemap_urls = read_sitemap_list(args.sites)
+    if not sitemap_urls:
+        print("진단할 사이트맵이 없습니다.")
+        return 1
+    print(f"[일괄 실행] 사이트맵 {len(sitemap_urls)}개, 전체 동시 요청 {args.concurrency}개")
+    summary_filename, rows = run_batch(sitemap_urls, incremental=args.incremental, stale_days=args.stale_days,
+                                       refresh_engines=refresh_engines, concurrency=args.concurrency,
+                                       reports_dir=args.reports_dir)
+
+    print("\n===== 일괄 실행 요약 =====")
+    for row in rows:
+        if row.get('Run') is None:
+            print(f"- {row['Sitemap']}: 실패 ({row['Error']})")
+            continue
+        engines = ', '.join(f"{engine.capitalize()} {row[f'{engine.capitalize()}_Indexed']}" for engine in REPORT_ENGINES)
+        note = f" [{row['Error']}]" if row['Error'] else ""
+        print(f"- {row['Domain']}: URL {row['URLs']}개, {engines}, 미인덱싱 {row['Not_Indexed']}개{note}")
+    print(f"\n전체 요약: {summary_filename}")
+    return 1 if any(row['Error'] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+벤치마크용 로컬 사이트 서버 (aiohttp)
+- /sitemap_index.xml: 자식 사이트맵 목록 (짝수 번째는 /sitemaps/<n>.xml.gz로 gzip 압축)
+- /p/<i>: 합성 HTML 페이지 (크기, 응답 지연 분포, 오류율 설정 가능)
+- /r/<i>: 301 → /p/<i % redirect_targets> (리다이렉트 대상은 소수로 모임)
+- /serp/<engine>?domain=...&start=...: 검색 결과 페이지 fixture (serp_fixture와 동일한 HTML)
+
+사용법:
+  python bench_server.py --urls 10000 --port 8080
+"""
+import argparse
+import asyncio
+import base64
+import gzip
+import html
+import random
+from urllib.parse import quote
+
+from aiohttp import web
+
+
+class BenchSite:
+    """합성 사이트 설정. 같은 설정이면 항상 같은 URL 구성과 페이지를 만듭니다."""
+    def __init__(self, urls=1000, per_sitemap=500, page_kb=30, latency_ms=20.0, jitter_ms=20.0,
+                 error_rate=0.0, redirect_rate=0.0, redirect_targets=10, seed=0):
+        self.urls = urls
+        self.per_sitemap = per_sitemap
+        self.page_kb = page_kb
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.redirect_rate = redirect_rate
+        self.redirect_targets = max(1, redirect_targets)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._filler = self._make_filler(page_kb * 1024)
+
+    def _make_filler(self, size):
+        words = ['seo', 'index', 'sitemap', 'crawler', 'search', 'engine', 'canonical', 'robots', '검색', '분석']
+        rng = random.Random(self.seed)
+        parts, total = [], 0
+        while total < size:
+            sentence = ' '.join(rng.choice(words) for _ in range(12))
+            parts.append(f"<p>{sentence}</p>\n")
+            total += len(parts[-1].encode('utf-8'))
+        return ''.join(parts)
+
+    def _bucket(self, i, salt):
+        """URL 번호별로 고정된 0~1 값 (오류/리다이렉트 대상 선정용)"""
+        return random.Random(f"{self.seed}:{salt}:{i}").random()
+
+    def is_redirect(self, i):
+        return self._bucket(i, 'redirect') < self.redirect_rate
+
+    def page_path(self, i):
+        return f"/r/{i}" if self.is_redirect(i) else f"/p/{i}"
+
+    def sitemap_count(self):
+        return (self.urls + self.per_sitemap - 1) // self.per_sitemap
+
+    def sitemap_path(self, n):
+        return f"/sitemaps/{n}.xml.gz" if n % 2 == 0 else f"/sitemaps/{n}.xml"
+
+    def sitemap_index(self, base):
+        items = ''.join(f"<sitemap><loc>{base}{self.sitemap_path(n)}</loc></sitemap>"
+                        for n in range(self.sitemap_count()))
+        return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex>{items}</sitemapindex>'
+
+    def sitemap(self, base, n):
+        start = n * self.per_sitemap
+        items = ''.join(
+            f"<url><loc>{base}{self.page_path(i)}</loc><lastmod>2024-01-01</lastmod></url>"
+            for i in range(start, min(start + self.per_sitemap, self.urls)))
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset>{items}</urlset>'
+
+    def page(self, i):
+        return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Synthetic page {i} for benchmark</title>"
+                f"<meta name=\"description\" content=\"Synthetic description {i}\">"
+                f"<link rel=\"canonical\" href=\"/p/{i}\"></head>"
+                f"<body><h1>Page {i}</h1>{self._filler}</body></html>")
+
+    def delay(self):
+        """응답 지연(초): 기본 지연 + 평균 jitter_ms의 지수 분포 (긴 꼬리)"""
+        jitter = self.rng.expovariate(1 / self.jitter_ms) if self.jitter_ms > 0 else 0
+        return (self.latency_ms + jitter) / 1000
+
+def _wrap_serp_href(engine, url):
+    """엔진별 결과 링크 표기 (Google /url?q=, Bing ck/a?u=a1<base64url>, Naver는 원래 URL)"""
+    if engine == 'google':
+        return f"/url?q={url}&sa=U&ved=bench"
+    if engine == 'bing':
+        encoded = base64.urlsafe_b64encode(url.encode('utf-8')).decode('ascii').rstrip('=')
+        return f"https://www.bing.com/ck/a?!&&p=bench&u=a1{encoded}&ntb=1"
+    return url
+
+# 엔진 자체 링크 (캐시, 다음 페이지 등) - 결과에서 제외되어야 함
+SERP_ENGINE_LINKS = {
+    'google': ('/search?q=site:{domain}&start=10', 'https://webcache.googleusercontent.com/search?q=cache:{i}',
+               '/url?q=https://support.google.com/websearch&sa=U'),
+    'bing': ('/search?q=site:{domain}&first=11', 'https://cc.bingj.com/cache.aspx?d={i}&w=bench'),
+    'naver': ('?query=site:{domain}&start=11', 'https://search.naver.com/search.naver?query=cache:{i}'),
+}
+
+def serp_fixture(engine, domain, count=10, start=0):
+    """
+    검색 엔진별 링크 표기(래퍼 포함)를 흉내 낸 SERP HTML
+    결과 URL은 기본 호스트, www. 호스트, 하위 도메인(blog.)이 섞여 있고 모두 대상 도메인의 결과로 인정되어야 합니다.
+    엔진 자체 링크와 비슷한 이름의 다른 도메인 링크도 함께 넣습니다.
+    """
+    cache_link = SERP_ENGINE_LINKS[engine][1]
+    links = []
+    for i in range(start, start + count):
+        host = {3: f"www.{domain}", 4: f"blog.{domain}"}.get(i % 5, domain)
+        href = _wrap_serp_href(engine, f"https://{host}/p/{i}")
+        if engine == 'naver' and i % 5 == 2:
+            href = quote(href, safe='')  # 퍼센트 인코딩된 채로 들어 있는 링크
+        links.append(f'<div class="result"><a href="{html.escape(href)}">Result {i}</a>'
+                     f'<a href="{html.escape(cache_link.format(i=i))}">cache</a></div>')
+    nav = ''.join(f'<a href="{html.escape(link.format(domain=domain, i=0))}">nav</a>'
+                  for link in SERP_ENGINE_LINKS[engine])
+    nav += (f'<a href="https://ads.example/click">ad</a><a href="https://not{domain}/p/0">lookalike</a>'
+            f'<a href="https://{domain}.mirror.example/p/0">mirror</a>')
+    return f"<html><head><title>site:{domain}</title></head><body>{''.join(links)}{nav}</body></html>"
+
+def make_app(site):
+    async def sitemap_index(request):
+        base = f"http://{request.host}"
+        return web.Response(text=site.sitemap_index(base), content_type='application/xml')
+
+    async def sitemap(request):
+        name = request.match_info['name']
+        n = int(name.split('.')[0])
+        body = site.sitemap(f"http://{request.host}", n).encode('utf-8')
+        if name.endswith('.gz'):
+            return web.Response(body=gzip.compress(body), content_type='application/x-gzip')
+        return web.Response(body=body, content_type='application/xml')
+
+    async def page(request):
+        i = int(request.match_info['i'])
+        await asyncio.sleep(site.delay())
+        if site.error_rate and site.rng.random() < site.error_rate:
+            return web.Response(status=503, text="unavailable")
+        return web.Response(text=site.page(i), content_type='text/html', charset='utf-8')
+
+    async def redirect(request):
+        i = int(request.match_info['i'])
+        raise web.HTTPMovedPermanently(f"/p/{i % site.redirect_targets}")
+
+    async def serp(request):
+        engine = request.match_info['engine']
+        domain = request.query.get('domain', request.host)
+        start = int(request.query.get('start', 0))
+        return web.Response(text=serp_fixture(engine, domain, start=start), content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/sitemap_index.xml', sitemap_index)
+    app.router.add_get('/sitemaps/{name}', sitemap)
+    app.router.add_get('/p/{i}', page)
+    app.router.add_get('/r/{i}', redirect)
+    app.router.add_get('/serp/{engine}', serp)
+    return app
+
+def run_server(settings, port, host='127.0.0.1'):
+    """settings(dict)로 BenchSite를 만들어 서버를 실행합니다 (별도 프로세스에서 호출)."""
+    web.run_app(make_app(BenchSite(**settings)), host=host, port=port, print=None)
+
+def add_site_arguments(parser):
+    parser.add_argument('--urls', type=int, default=1000, help="사이트맵 URL 수")
+    parser.add_argument('--per-sitemap', type=int, default=500, help="자식 사이트맵당 URL 수")
+    parser.add_argument('--page-kb', type=int, default=30, help="페이지 크기 (KB)")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="기본 응답 지연 (ms)")
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help="추가 지연 평균 (ms, 지수 분포)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument('--redirect-rate', type=float, default=0.0, help="리다이렉트 URL 비율 (0~1)")
+    parser.add_argument('--redirect-targets', type=int, default=10, help="리다이렉트 대상 페이지 수")
+
+def site_settings(args):
+    return {
+        'urls': args.urls,
+        'per_sitemap': args.per_sitemap,
+        'page_kb': args.page_kb,
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'error_rate': args.error_rate,
+        'redirect_rate': args.redirect_rate,
+        'redirect_targets': args.redirect_targets,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 사이트 서버")
+    add_site_arguments(parser)
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    print(f"http://127.0.0.1:{args.port}/sitemap_index.xml ({args.urls} URLs)")
+    run_server(site_settings(args), args.port)
@@ -0,0 +1,363 @@
+"""
+성능 측정 도구
+사용법:
+  python benchmark.py fetch-corpus <sitemap_url> <저장 폴더> [--limit 200]
+  python benchmark.py parse <HTML 폴더> [--repeat 3]
+  python benchmark.py canon [--input URL목록.txt] [--count 100000]
+  python benchmark.py pipeline [--urls 5000] [--page-kb 30] [--latency-ms 20] [--error-rate 0.01] [--redirect-rate 0.05]
+                               [--save 기준.json | --compare 기준.json [--tolerance 0.15]]
+"""
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+import aiohttp
+import requests
+
+from bench_server import (
+    BenchSite,
+    add_site_arguments,
+    run_server,
+    serp_fixture,
+    site_settings,
+)
+from run_store import REPORT_ENGINES, RunStore
+from seo_analyzer import analyze_html, analyze_html_soup, analyze_urls_async
+from serp_links import links_from_html
+from sitemap_parser import iter_sitemap_entries_async, iter_sitemap_urls
+from url_canon import canonicalize
+from utils import get_random_header, normalize_url_legacy
+
+COMPARE_FIELDS = ('title', 'description', 'h1', 'canonical', 'robots', 'issues')
+
+def load_corpus(directory):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+def time_engine(func, pages, repeat):
+    """가장 빠른 반복 회차의 소요 시간을 반환합니다."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, content in pages:
+            func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_parse(args):
+    pages = load_corpus(args.directory)
+    if not pages:
+        print(f"'{args.directory}'에 .html 파일이 없습니다.")
+        return
+    total_mb = sum(len(c) for _, c in pages) / 1024 / 1024
+    print(f"코퍼스: {len(pages)}개 페이지, {total_mb:.1f}MB (반복 {args.repeat}회 중 최고 기록)")
+
+    engines = [('bs4 (기존)', analyze_html_soup), ('html_extractor', analyze_html)]
+    timings = {}
+    for name, func in engines:
+        elapsed = time_engine(func, pages, args.repeat)
+        timings[name] = elapsed
+        print(f"  {name:<16} {elapsed:8.3f}s  {len(pages)/elapsed:8.1f} pages/s  {total_mb/elapsed:6.1f} MB/s")
+    base, new = timings[engines[0][0]], timings[engines[1][0]]
+    print(f"  속도 향상: x{base/new:.2f}")
+
+    # 결과 일치 여부 확인
+    mismatches = []
+    for name, content in pages:
+        old, cur = analyze_html_soup(content), analyze_html(content)
+        diff = [f for f in COMPARE_FIELDS if old[f] != cur[f]]
+        if diff:
+            mismatches.append((name, diff))
+    print(f"  결과 불일치: {len(mismatches)}개 페이지")
+    for name, diff in mismatches[:10]:
+        print(f"    - {name}: {', '.join(diff)}")
+
+def synthetic_urls(count):
+    """
+    같은 페이지를 검색 결과마다 다르게 표기한 URL 목록 (스킴, www., 대소문자, 기본 포트, 인코딩, 끝 슬래시, 추적 파라미터)
+    서로 다른 페이지는 count / 4개입니다.
+    """
+    rng = random.Random(0)
+    hosts = ['https://www.example.com', 'http://example.com', 'https://EXAMPLE.com:443', 'https://example.com']
+    pages = max(1, count // 4)
+    urls = []
+    for i in range(count):
+        n = i % pages
+        name = rng.choice(['한글', '%ED%95%9C%EA%B8%80', '%ed%95%9c%ea%b8%80'])
+        path = f"/category/{n % 50}/post-{n}-{name}" + rng.choice(['', '/'])
+        query = rng.choice(['', '?utm_source=naver', '#section'])
+        urls.append(rng.choice(hosts) + path + query)
+    return urls
+
+def bench_canon(args):
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = synthetic_urls(args.count)
+    print(f"URL {len(urls)}개")
+
+    def run(func):
+        start = time.perf_counter()
+        keys = [func(url) for url in urls]
+        return time.perf_counter() - start, len(set(keys))
+
+    canonicalize.cache_clear()
+    rows = [('기존 (문자열 치환)', run(normalize_url_legacy)),
+            ('url_canon (캐시 없음)', run(canonicalize)),
+            ('url_canon (캐시 적중)', run(canonicalize))]
+    for name, (elapsed, distinct) in rows:
+        print(f"  {name:<20} {elapsed:8.3f}s  {len(urls)/elapsed:12.0f} URLs/s  고유 키 {distinct}개")
+    print(f"  캐시: {canonicalize.cache_info()}")
+
+# ----- 파이프라인 벤치마크 (로컬 서버 사용) -----
+# 각 단계는 별도 프로세스에서 실행하여 단계별 최대 메모리(RSS)와 CPU 시간을 따로 측정합니다.
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _traced_session(latencies, limit):
+    """요청 시작부터 응답 헤더 수신까지의 시간(ms)을 latencies에 기록하는 세션"""
+    trace = aiohttp.TraceConfig()
+
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        latencies.append((time.perf_counter() - ctx.started) * 1000)
+
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit), trace_configs=[trace])
+
+def stage_sitemap(base, settings):
+    latencies = []
+
+    async def run():
+        async with _traced_session(latencies, 8) as session:
+            count = 0
+            async for _ in iter_sitemap_entries_async(f"{base}/sitemap_index.xml", session=session):
+                count += 1
+            return count
+    return {'items': asyncio.run(run()), 'latencies': latencies}
+
+def stage_analyze(base, settings):
+    site = BenchSite(**settings)
+    latencies = []
+    counts = {'items': 0, 'failed': 0}
+
+    def on_result(result):
+        counts['items'] += 1
+        if result['failure_class'] or result['status_code'] != 200:
+            counts['failed'] += 1
+
+    async def run():
+        async with _traced_session(latencies, 100) as session:
+            urls = (f"{base}{site.page_path(i)}" for i in range(site.urls))
+            await analyze_urls_async(urls, on_result, retain=False, session=session)
+    asyncio.run(run())
+    return dict(counts, latencies=latencies)
+
+def stage_report(base, settings):
+    site = BenchSite(**settings)
+    with tempfile.TemporaryDirectory() as directory:
+        store = RunStore(os.path.join(directory, 'runs.db'))
+        run_id = store.start_run('bench', base)
+        for i in range(site.urls):
+            store.add(run_id, {'url': f"{base}/p/{i}", 'status_code': 200, 'title': f"Page {i}",
+                               'content_type': 'text/html', 'issues': ['Missing Canonical tag'] if i % 3 else []})
+        indexed = {engine: {f"{base}/p/{i}" for i in range(0, site.urls, n + 2)}
+                   for n, engine in enumerate(REPORT_ENGINES)}
+        store.apply_index_status(run_id, indexed, lambda url: url)
+        store.summary(run_id)
+        store.export_csv(run_id, os.path.join(directory, 'report.csv'))
+        store.export_csv(run_id, os.path.join(directory, 'sorted.csv'), indexed_first=True)
+        store.close()
+    return {'items': site.urls}
+
+def stage_serp(base, settings):
+    latencies = []
+    pages = [(engine, serp_fixture(engine, 'bench.example', start=page * 10))
+             for engine in REPORT_ENGINES for page in range(200)]
+    found = 0
+    for engine, html in pages:
+        started = time.perf_counter()
+        found += len(links_from_html(html, 'bench.example'))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {'items': len(pages), 'links': found, 'latencies': latencies}
+
+STAGES = {
+    'sitemap': stage_sitemap,
+    'analyze': stage_analyze,
+    'report': stage_report,
+    'serp': stage_serp,
+}
+
+def _run_stage(name, base, settings, queue):
+    started, cpu_started = time.perf_counter(), time.process_time()
+    stats = STAGES[name](base, settings)
+    stats['seconds'] = time.perf_counter() - started
+    stats['cpu'] = time.process_time() - cpu_started
+    stats['peak_rss_mb'] = _peak_rss_mb()
+    queue.put(stats)
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def _wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"벤치마크 서버가 {timeout}초 안에 시작되지 않았습니다 (port {port})")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _fmt(value, width, precision=1):
+    return f"{value:>{width}.{precision}f}" if value is not None else f"{'-':>{width}}"
+
+def bench_pipeline(args):
+    settings = site_settings(args)
+    ctx = multiprocessing.get_context('spawn')
+    port = _free_port()
+    server = ctx.Process(target=run_server, args=(settings, port), daemon=True)
+    server.start()
+    results = {}
+    try:
+        _wait_for_port(port)
+        base = f"http://127.0.0.1:{port}"
+        print(f"로컬 서버: {base} (URL {args.urls}개, 페이지 {args.page_kb}KB, 지연 {args.latency_ms}+~{args.jitter_ms}ms, "
+              f"오류율 {args.error_rate}, 리다이렉트 {args.redirect_rate})")
+        for name in args.stages:
+            queue = ctx.Queue()
+            worker = ctx.Process(target=_run_stage, args=(name, base, settings, queue))
+            worker.start()
+            stats = queue.get()
+            worker.join()
+            latencies = stats.pop('latencies', [])
+            stats['rate'] = stats['items'] / stats['seconds'] if stats['seconds'] else 0
+            stats['p50_ms'] = _percentile(latencies, 50)
+            stats['p99_ms'] = _percentile(latencies, 99)
+            results[name] = stats
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"\n  {'단계':<8} {'항목':>8} {'시간(s)':>9} {'항목/s':>10} {'p50(ms)':>9} {'p99(ms)':>9} {'최대RSS(MB)':>12} {'CPU(s)':>8}")
+    for name, stats in results.items():
+        print(f"  {name:<8} {stats['items']:>8} {stats['seconds']:>9.2f} {stats['rate']:>10.1f} "
+              f"{_fmt(stats['p50_ms'], 9)} {_fmt(stats['p99_ms'], 9)} "
+              f"{_fmt(stats['peak_rss_mb'], 12)} {stats['cpu']:>8.2f}")
+    if 'analyze' in results:
+        print(f"  (analyze 실패/비정상 응답: {results['analyze']['failed']}개)")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'stages': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n기준 결과 저장: {args.save}")
+    if args.compare and not compare_baseline(args.compare, settings, results, args.tolerance):
+        sys.exit(1)
+
+def compare_baseline(path, settings, results, tolerance):
+    """
+    기준 결과와 비교하여 처리량이 tolerance 비율 이상 떨어지거나 p99 지연이 그만큼 늘어난 단계를 출력합니다.
+    회귀가 없으면 True
+    """
+    with open(path, encoding='utf-8') as f:
+        saved = json.load(f)
+    baseline = saved['stages']
+    if saved.get('settings') != settings:
+        print(f"\n[!] 기준 결과와 서버 설정이 다릅니다: {saved.get('settings')}")
+    ok = True
+    print(f"\n기준 결과 대비 (허용 범위 {tolerance:.0%})")
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        problems = []
+        if base['rate'] and stats['rate'] < base['rate'] * (1 - tolerance):
+            problems.append(f"처리량 {base['rate']:.1f} → {stats['rate']:.1f}/s")
+        if base.get('p99_ms') and stats['p99_ms'] and stats['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            problems.append(f"p99 {base['p99_ms']:.1f} → {stats['p99_ms']:.1f}ms")
+        change = (stats['rate'] / base['rate'] - 1) if base['rate'] else 0
+        print(f"  {name:<8} 처리량 {change:+.1%}  {'회귀: ' + ', '.join(problems) if problems else 'OK'}")
+        ok = ok and not problems
+    return ok
+
+def fetch_corpus(args):
+    os.makedirs(args.directory, exist_ok=True)
+    saved = 0
+    for url in iter_sitemap_urls(args.sitemap_url):
+        if saved >= args.limit:
+            break
+        try:
+            response = requests.get(url, headers=get_random_header(), timeout=10)
+        except requests.RequestException as e:
+            print(f"Skip {url}: {e}")
+            continue
+        if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', ''):
+            continue
+        saved += 1
+        with open(os.path.join(args.directory, f"page_{saved:05d}.html"), 'wb') as f:
+            f.write(response.content)
+    print(f"{saved}개 페이지 저장 완료: {args.directory}")
+
+def main():
+    parser = argparse.ArgumentParser(description="SEO 도구 성능 측정")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('parse', help="HTML 분석 엔진 비교 (bs4 vs html_extractor)")
+    p.add_argument('directory')
+    p.add_argument('--repeat', type=int, default=3)
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser('canon', help="URL 정규화 비교 (기존 문자열 치환 vs url_canon)")
+    p.add_argument('--input', help="한 줄에 URL 하나씩 적힌 파일 (생략 시 합성 URL 사용)")
+    p.add_argument('--count', type=int, default=100000)
+    p.set_defaults(func=bench_canon)
+
+    p = sub.add_parser('pipeline', help="로컬 합성 사이트로 단계별 처리량/지연/메모리/CPU 측정")
+    add_site_arguments(p)
+    p.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    p.add_argument('--save', help="결과를 기준 파일(JSON)로 저장")
+    p.add_argument('--compare', help="기준 파일과 비교하여 회귀가 있으면 종료 코드 1")
+    p.add_argument('--tolerance', type=float, default=0.15, help="회귀로 판단할 변화 비율")
+    p.set_defaults(func=bench_pipeline)
+
+    p = sub.add_parser('fetch-corpus', help="사이트맵의 페이지를 내려받아 벤치마크 코퍼스 생성")
+    p.add_argument('sitemap_url')
+    p.add_argument('directory')
+    p.add_argument('--limit', type=int, default=200)
+    p.set_defaults(func=fetch_corpus)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
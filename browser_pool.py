@@ -0,0 +1,112 @@
+"""
+검색 엔진 수집용 공유 브라우저 풀 (Playwright)
+- 브라우저는 종류(firefox/chromium)별로 프로세스당 한 번만 실행하고 엔진/도메인 간에 재사용합니다
+- 브라우저 컨텍스트는 엔진별로 하나씩 만들어 재사용합니다 (쿠키 유지, 엔진 간 격리)
+- 이미지/폰트 등 결과 수집에 필요 없는 리소스는 요청 단계에서 차단합니다
+- 디버그 스크린샷은 설정에 따라 모든 페이지, 캡차/오류 시에만, 또는 사용하지 않음
+"""
+import asyncio
+import os
+
+from playwright.async_api import async_playwright
+
+from config import BLOCK_RESOURCE_TYPES, DEBUG_DIR, DEBUG_SCREENSHOTS
+
+
+class BrowserPool:
+    def __init__(self, block_types=BLOCK_RESOURCE_TYPES, screenshots=DEBUG_SCREENSHOTS, debug_dir=DEBUG_DIR):
+        self.block_types = frozenset(block_types)
+        self.screenshots = screenshots
+        self.debug_dir = debug_dir
+        self._playwright = None
+        self._browsers = {}
+        self._contexts = {}
+        self._lock = asyncio.Lock()
+        self.blocked = 0
+
+    async def _browser(self, kind, launch_options):
+        """kind('firefox'/'chromium') 브라우저를 처음 요청될 때 실행합니다. 호출 전 _lock을 잡아야 합니다."""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = self._browsers.get(kind)
+        if browser is None or not browser.is_connected():
+            browser = await getattr(self._playwright, kind).launch(**launch_options)
+            self._browsers[kind] = browser
+        return browser
+
+    async def context(self, name, kind, launch_options=None, context_options=None, init_script=None):
+        """
+        name(보통 엔진 이름)별 브라우저 컨텍스트를 반환합니다.
+        처음 요청될 때만 브라우저/컨텍스트를 만들고, 이후에는 같은 컨텍스트를 재사용합니다.
+        """
+        async with self._lock:
+            context = self._contexts.get(name)
+            if context is not None:
+                return context
+            browser = await self._browser(kind, launch_options or {})
+            context = await browser.new_context(**(context_options or {}))
+            if init_script:
+                await context.add_init_script(init_script)
+            if self.block_types:
+                await context.route("**/*", self._route)
+            self._contexts[name] = context
+            return context
+
+    async def new_page(self, name, kind, launch_options=None, context_options=None, init_script=None):
+        """공유 컨텍스트에서 새 탭을 엽니다. 사용이 끝나면 page.close()로 닫아야 합니다."""
+        context = await self.context(name, kind, launch_options, context_options, init_script)
+        return await context.new_page()
+
+    async def _route(self, route):
+        if route.request.resource_type in self.block_types:
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def screenshot(self, page, name, error=False):
+        """
+        설정에 따라 디버그 스크린샷을 저장합니다.
+        error=True는 캡차/차단/오류 상황으로, 'error' 모드에서도 저장합니다.
+        """
+        if self.screenshots == 'off' or (self.screenshots == 'error' and not error):
+            return
+        try:
+            os.makedirs(self.debug_dir, exist_ok=True)
+            await page.screenshot(path=os.path.join(self.debug_dir, f"{name}.png"))
+        except Exception as e:
+            print(f"  [!] 스크린샷 저장 실패: {e}")
+
+    async def close(self):
+        async with self._lock:
+            for context in self._contexts.values():
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            for browser in self._browsers.values():
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            self._contexts.clear()
+            self._browsers.clear()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+# 프로세스 공유 풀 (처음 사용할 때 생성)
+_shared_pool = None
+
+def shared_pool():
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = BrowserPool()
+    return _shared_pool
+
+async def close_shared_pool():
+    """공유 풀의 브라우저를 모두 종료합니다. 풀을 만든 이벤트 루프 안에서 호출해야 합니다."""
+    global _shared_pool
+    if _shared_pool is not None:
+        await _shared_pool.close()
+        _shared_pool = None
@@ -26,5 +26,93 @@ ENGINES = {
     }
 }
 
-# 비동기 동시 요청 제한
-CONCURRENT_REQUESTS = 10
+# 비동기 동시 요청 제한 (전체 워커 수, 호스트별 한도는 아래 설정에 따라 자동 조절)
+CONCURRENT_REQUESTS = 32
+
+# 호스트별 적응형 동시성 (AIMD)
+HOST_CONCURRENCY_START = 4        # 호스트별 초기 동시 요청 수
+HOST_CONCURRENCY_MIN = 1
+HOST_CONCURRENCY_MAX = 32
+HOST_BACKOFF_FACTOR = 0.5         # 429/5xx/오류 시 동시 요청 수에 곱하는 값
+HOST_LATENCY_SPIKE_FACTOR = 3.0   # 평균 응답 지연의 몇 배를 넘으면 과부하로 볼지
+RETRY_AFTER_MAX = 120             # Retry-After 최대 대기 시간 (초)
+
+# 페이지 응답 읽기 설정
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # 페이지당 최대 다운로드 크기 (초과분은 읽지 않음)
+READ_CHUNK_SIZE = 16 * 1024           # 스트리밍 읽기 단위
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')  # 분석 대상 Content-Type
+
+# 실패 원인별 재시도 정책 (max_attempts: 최초 요청 포함 최대 시도 횟수, 지연 단위: 초)
+RETRY_POLICIES = {
+    'dns':     {'max_attempts': 2, 'base_delay': 5.0, 'max_delay': 30.0},
+    'connect': {'max_attempts': 3, 'base_delay': 2.0, 'max_delay': 30.0},
+    'timeout': {'max_attempts': 3, 'base_delay': 2.0, 'max_delay': 60.0},
+    '5xx':     {'max_attempts': 3, 'base_delay': 2.0, 'max_delay': 60.0},
+    '429':     {'max_attempts': 4, 'base_delay': 5.0, 'max_delay': 120.0},
+}
+RETRY_BUDGET_RATIO = 0.1  # 전체 재시도 수 상한 = 최초 요청 수 × 비율 + 최소값
+RETRY_BUDGET_MIN = 20
+
+# HTML 파싱 전용 프로세스 수 (0이면 이벤트 루프에서 직접 파싱, 보통 CPU 코어 수 정도로 설정)
+PARSE_WORKERS = 0
+
+# 사이트맵 수집 설정
+SITEMAP_CONCURRENT_REQUESTS = 8  # 자식 사이트맵 동시 다운로드 수
+SITEMAP_MAX_DEPTH = 5            # 인덱스 사이트맵 최대 중첩 깊이
+
+# HTTP 캐시 (조건부 요청) 설정
+HTTP_CACHE_PATH = "cache/http_cache.db"
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 최대 캐시 크기 (초과 시 오래 사용하지 않은 항목부터 삭제)
+HTTP_CACHE_TTL = 0                        # 이 시간(초) 안에 확인한 항목은 요청 없이 재사용 (0이면 항상 재검증)
+
+# 증분 실행 설정
+STATE_DB_PATH = "cache/url_state.db"  # URL별 lastmod 및 마지막 분석 결과 저장소
+INCREMENTAL_STALE_DAYS = 7            # 이 기간(일)보다 오래된 분석 결과는 변경이 없어도 재분석
+
+# 실행 결과 저장소 (SQLite) - CSV 리포트는 이 저장소에서 생성
+RUN_DB_PATH = "reports/seo_runs.db"
+
+# 검색 엔진 브라우저 설정 (Playwright)
+BLOCK_RESOURCE_TYPES = ('image', 'media', 'font')  # 불러오지 않을 리소스 종류 (headless 전용이면 'stylesheet' 추가 가능)
+DEBUG_SCREENSHOTS = 'error'                        # 'always': 모든 페이지 / 'error': 캡차·오류 시에만 / 'off'
+DEBUG_DIR = "debug_screenshots"
+
+# 검색 엔진 결과(SERP) 캐시 - (엔진, 도메인, 페이지)별로 저장, TTL 안에서는 브라우저를 실행하지 않고 재사용
+SERP_CACHE_PATH = "cache/serp_cache.db"
+SERP_CACHE_TTL = 12 * 3600  # 초 (0이면 캐시 사용 안 함)
+
+# URL 정규화 설정 (사이트맵 URL과 검색 결과 URL 비교용, url_canon.py)
+CANON_QUERY_POLICY = 'drop_tracking'  # 'keep': 쿼리 유지 / 'drop_tracking': 추적 파라미터만 제거 / 'drop_all': 쿼리 제거
+CANON_TRACKING_PARAMS = ('gclid', 'fbclid', 'msclkid', 'yclid', 'dclid', '_ga', 'igshid', 'mc_cid', 'mc_eid')
+CANON_TRACKING_PREFIXES = ('utm_',)   # 이 접두사로 시작하는 파라미터도 추적 파라미터로 취급
+CANON_TRAILING_SLASH = 'strip'        # 'strip': 경로 끝 / 제거 / 'keep': 그대로 유지
+CANON_CACHE_SIZE = 200000             # 정규화 결과 메모리 캐시 크기 (URL 개수)
+
+# 리다이렉트 추적 설정 (페이지 분석 시 리다이렉트를 직접 한 단계씩 따라감)
+MAX_REDIRECTS = 10         # 이 횟수를 넘으면 중단하고 이슈로 기록
+REDIRECT_CHAIN_MAX = 2     # 이보다 많은 단계를 거치는 리다이렉트는 '긴 체인' 이슈로 기록
+REDIRECT_CACHE_SIZE = 10000  # 실행 중 공유하는 리다이렉트/최종 URL 결과 수 (최근 사용 순으로 유지)
+
+# 실행 계측 (metrics.py) - 실행이 끝나면 reports 폴더에 JSON 요약과 Prometheus 텍스트 파일(.prom)로 저장
+METRICS_ENABLED = True
+
+# 일괄 실행 설정 (batch.py)
+BATCH_ENGINE_SITES = 1   # 검색 엔진 수집을 동시에 진행할 도메인 수 (늘리면 캡차/차단 위험 증가)
+BATCH_SITE_BUFFER = 50   # 도메인별로 미리 읽어 두는 사이트맵 URL 수 (도메인 간 번갈아 투입하는 대기열 크기)
+
+# 분산(샤드) 실행 설정 (shards.py)
+SHARD_QUEUE_PATH = "cache/shard_queue.db"  # URL 작업 큐(임대 테이블). 여러 서버에서 실행할 때는 공유 저장소에 둠
+SHARD_DIR = "reports/shards"                # 작업자별 부분 결과 저장소 (합치기 단계에서 읽으므로 역시 공유 저장소에 둠)
+SHARD_LEASE_SIZE = 200                      # 작업자가 한 번에 임대하는 URL 수
+SHARD_LEASE_SECONDS = 600                   # 임대 유효 시간(초). 이 안에 완료/갱신되지 않으면 다른 작업자가 가져감
+
+# 체크포인트 (중단된 실행 이어서 하기: python main.py --resume <run>)
+CHECKPOINT_INTERVAL = 30  # 분석 결과가 이 시간(초)마다 최소 한 번은 실행 결과 저장소에 기록됨
+
+# 내부 링크 탐색 설정 (link_graph.py) - 사이트맵에 없는 페이지, 내부 링크가 없는(고아) 페이지, 클릭 깊이 리포트
+DISCOVERY_MAX_DEPTH = 5         # 시작 페이지(또는 사이트맵 URL)에서 따라가는 최대 링크 단계
+DISCOVERY_MAX_PAGES = 100000    # 탐색 중 요청하는 최대 페이지 수 (사이트맵 URL 포함)
+DISCOVERY_MAX_LINKS = 1000      # 페이지당 수집하는 최대 링크 수
+DISCOVERY_SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.pdf', '.zip', '.gz',
+                             '.mp3', '.mp4', '.avi', '.css', '.js', '.xml', '.json')  # 그래프에 넣지 않는 링크
+LINK_GRAPH_DIR = "reports/link_graph"  # 링크 그래프 저장소(SQLite, 노드/간선 정수 번호) 폴더
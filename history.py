@@ -0,0 +1,177 @@
+"""
+검색 엔진 인덱싱 이력 관리
+- URL × 엔진별 현재 인덱싱 상태(index_state)와 상태 변화 기록(index_changes)을 실행 결과 저장소에 함께 보관합니다
+- 실행이 끝날 때 이번 결과와 현재 상태를 비교하여 '바뀐 것'만 기록하므로,
+  diff 조회 비용은 전체 URL × 실행 수가 아니라 변화 건수에 비례합니다
+
+사용법:
+  python history.py diff <도메인> [--days 7 | --runs <이전 run> <이후 run>] [--output 파일.csv]
+  python history.py missing <도메인> --days 14 [--engine google]
+"""
+import argparse
+import csv
+import datetime
+import time
+
+from config import RUN_DB_PATH
+from run_store import REPORT_ENGINES, RunStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_state (
+    domain TEXT NOT NULL,
+    url TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    indexed INTEGER NOT NULL,
+    since REAL NOT NULL,          -- 현재 상태가 시작된 시각
+    since_run INTEGER NOT NULL,
+    last_run INTEGER NOT NULL,
+    PRIMARY KEY (domain, url, engine)
+);
+CREATE TABLE IF NOT EXISTS index_changes (
+    run_id INTEGER NOT NULL,
+    domain TEXT NOT NULL,
+    url TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    previous INTEGER,             -- NULL이면 처음 확인된 URL
+    indexed INTEGER NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_state_missing ON index_state(domain, engine, indexed, since);
+CREATE INDEX IF NOT EXISTS idx_changes_time ON index_changes(domain, changed_at);
+CREATE INDEX IF NOT EXISTS idx_changes_run ON index_changes(domain, run_id);
+"""
+
+CHANGE_LABELS = {
+    (None, 1): 'new (indexed)',
+    (None, 0): 'new (not indexed)',
+    (0, 1): 'newly indexed',
+    (1, 0): 'dropped',
+}
+
+DIFF_FIELDNAMES = ['URL', 'Engine', 'Change', 'Run', 'Changed_At']
+
+class IndexHistory:
+    def __init__(self, store):
+        self.store = store
+        self.conn = store.conn
+        self.conn.executescript(SCHEMA)
+
+    def record_run(self, run_id, domain):
+        """
+        실행 결과를 현재 상태와 비교하여 변화를 기록하고 상태를 갱신합니다.
+        반환값: 이번 실행에서 기록된 변화 건수
+        """
+        self.store.flush()
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.execute("""
+                INSERT INTO index_changes (run_id, domain, url, engine, previous, indexed, changed_at)
+                SELECT ?, ?, u.url, s.engine, st.indexed, s.indexed, ?
+                FROM index_status s
+                JOIN urls u ON u.id = s.url_id
+                LEFT JOIN index_state st ON st.domain = ? AND st.url = u.url AND st.engine = s.engine
+                WHERE s.run_id = ? AND (st.indexed IS NULL OR st.indexed != s.indexed)""",
+                (run_id, domain, now, domain, run_id))
+            changes = cursor.rowcount
+            self.conn.execute("""
+                INSERT INTO index_state (domain, url, engine, indexed, since, since_run, last_run)
+                SELECT ?, u.url, s.engine, s.indexed, ?, ?, ?
+                FROM index_status s JOIN urls u ON u.id = s.url_id
+                WHERE s.run_id = ?
+                ON CONFLICT (domain, url, engine) DO UPDATE SET
+                    since = CASE WHEN indexed != excluded.indexed THEN excluded.since ELSE since END,
+                    since_run = CASE WHEN indexed != excluded.indexed THEN excluded.since_run ELSE since_run END,
+                    indexed = excluded.indexed,
+                    last_run = excluded.last_run""",
+                (domain, now, run_id, run_id, run_id))
+        return changes
+
+    def changes_since(self, domain, since):
+        """since(타임스탬프) 이후의 변화를 시간순으로 yield 합니다."""
+        yield from self._changes(
+            "WHERE domain = ? AND changed_at >= ? ORDER BY changed_at, rowid", (domain, since))
+
+    def changes_between_runs(self, domain, after_run, until_run):
+        """after_run 이후부터 until_run까지(포함)의 변화를 yield 합니다."""
+        yield from self._changes(
+            "WHERE domain = ? AND run_id > ? AND run_id <= ? ORDER BY run_id, rowid", (domain, after_run, until_run))
+
+    def _changes(self, where, params):
+        cursor = self.conn.execute(
+            f"SELECT url, engine, previous, indexed, run_id, changed_at FROM index_changes {where}", params)
+        for url, engine, previous, indexed, run_id, changed_at in cursor:
+            yield {
+                'URL': url,
+                'Engine': engine,
+                'Change': CHANGE_LABELS[(previous, indexed)],
+                'Run': run_id,
+                'Changed_At': _format_time(changed_at),
+            }
+
+    def still_missing(self, domain, days, engine=None):
+        """days일 이상 계속 미인덱싱 상태인 URL을 (url, engine, 미인덱싱 시작 시각)으로 yield 합니다."""
+        cutoff = time.time() - days * 86400
+        engines = [engine] if engine else list(REPORT_ENGINES)
+        for name in engines:
+            cursor = self.conn.execute(
+                "SELECT url, since FROM index_state WHERE domain = ? AND engine = ? AND indexed = 0 AND since <= ? "
+                "ORDER BY since", (domain, name, cutoff))
+            for url, since in cursor:
+                yield url, name, _format_time(since)
+
+    def previous_run(self, domain, run_id):
+        row = self.conn.execute(
+            "SELECT MAX(id) FROM runs WHERE domain = ? AND id < ? AND status = 'finished'", (domain, run_id)).fetchone()
+        return row[0]
+
+def write_diff_report(filename, changes):
+    """변화 목록을 CSV로 저장하고 기록한 건수를 반환합니다."""
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=DIFF_FIELDNAMES)
+        writer.writeheader()
+        for change in changes:
+            writer.writerow(change)
+            count += 1
+    return count
+
+def _format_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 엔진 인덱싱 이력 조회")
+    parser.add_argument('--db', default=RUN_DB_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('diff', help="기간 또는 실행 사이의 인덱싱 변화 (신규 인덱싱/누락)")
+    p.add_argument('domain')
+    p.add_argument('--days', type=float, default=7)
+    p.add_argument('--runs', type=int, nargs=2, metavar=('AFTER_RUN', 'UNTIL_RUN'))
+    p.add_argument('--output', help="CSV로 저장할 파일 경로")
+
+    p = sub.add_parser('missing', help="N일 이상 계속 미인덱싱 상태인 URL")
+    p.add_argument('domain')
+    p.add_argument('--days', type=float, default=14)
+    p.add_argument('--engine', choices=REPORT_ENGINES)
+
+    args = parser.parse_args()
+    store = RunStore(args.db)
+    history = IndexHistory(store)
+
+    if args.command == 'diff':
+        if args.runs:
+            changes = history.changes_between_runs(args.domain, *args.runs)
+        else:
+            changes = history.changes_since(args.domain, time.time() - args.days * 86400)
+        if args.output:
+            print(f"{write_diff_report(args.output, changes)}건 저장: {args.output}")
+        else:
+            for change in changes:
+                print(f"[{change['Changed_At']}] {change['Engine']:<6} {change['Change']:<18} {change['URL']}")
+    else:
+        for url, engine, since in history.still_missing(args.domain, args.days, args.engine):
+            print(f"{engine:<6} {since}부터 미인덱싱  {url}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+호스트별 적응형 동시성 제어 (AIMD)
+- 응답이 정상이면 동시 요청 수를 조금씩 늘리고 (Additive Increase)
+- 429/5xx/연결 오류/응답 지연 급증 시 절반으로 줄입니다 (Multiplicative Decrease)
+- Retry-After 헤더를 받으면 해당 시간 동안 그 호스트로의 요청을 멈춥니다
+"""
+import asyncio
+import collections
+import email.utils
+import time
+
+from config import (
+    HOST_BACKOFF_FACTOR,
+    HOST_CONCURRENCY_MAX,
+    HOST_CONCURRENCY_MIN,
+    HOST_CONCURRENCY_START,
+    HOST_LATENCY_SPIKE_FACTOR,
+    RETRY_AFTER_MAX,
+)
+
+# 처리율(req/s) 계산 구간 (초)
+RATE_WINDOW = 10.0
+
+# 지연 시간 이동 평균 가중치
+LATENCY_ALPHA = 0.2
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환합니다."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def is_throttle_status(status):
+    """서버 과부하 신호로 취급하는 응답 코드"""
+    return status == 429 or status >= 500
+
+class HostState:
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.inflight = 0
+        self.blocked_until = 0.0
+        self.latency = None        # 응답 지연 이동 평균 (초)
+        self.last_decrease = 0.0
+        self.started = None
+        self.finished = None
+        self.requests = 0
+        self.throttled = 0
+        self.completed = collections.deque()
+        self.waiters = collections.deque()
+
+class HostLimiter:
+    """
+    호스트별 동시 요청 수를 응답 상태에 따라 조절합니다.
+    사용법: await limiter.acquire(host) → 요청 → limiter.release(host, status, latency, retry_after)
+    """
+    def __init__(self, start=HOST_CONCURRENCY_START, minimum=HOST_CONCURRENCY_MIN, maximum=HOST_CONCURRENCY_MAX):
+        self.start = start
+        self.minimum = minimum
+        self.maximum = maximum
+        self.hosts = {}
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(self.start)
+        return state
+
+    async def acquire(self, host):
+        state = self._state(host)
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = state.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if state.inflight < int(state.limit):
+                state.inflight += 1
+                state.requests += 1
+                if state.started is None:
+                    state.started = time.monotonic()
+                return
+            waiter = loop.create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+                if waiter in state.waiters:
+                    state.waiters.remove(waiter)
+
+    def release(self, host, status=None, latency=None, retry_after=None):
+        """
+        요청 결과를 반영하고 슬롯을 반납합니다.
+        status가 None이면 네트워크 오류(타임아웃, 연결 실패 등)로 간주합니다.
+        """
+        state = self._state(host)
+        now = time.monotonic()
+        state.inflight -= 1
+        state.finished = now
+        state.completed.append(now)
+        while state.completed and state.completed[0] < now - RATE_WINDOW:
+            state.completed.popleft()
+
+        if retry_after:
+            state.blocked_until = max(state.blocked_until, now + min(retry_after, RETRY_AFTER_MAX))
+
+        spike = latency is not None and state.latency is not None and latency > state.latency * HOST_LATENCY_SPIKE_FACTOR
+        if status is None or is_throttle_status(status) or spike:
+            state.throttled += 1
+            # 한 번의 혼잡에 여러 요청이 동시에 실패해도 감소는 응답 지연 한 주기에 한 번만
+            if now - state.last_decrease >= (state.latency or 1.0):
+                state.limit = max(self.minimum, state.limit * HOST_BACKOFF_FACTOR)
+                state.last_decrease = now
+        else:
+            state.limit = min(self.maximum, state.limit + 1.0 / state.limit)
+
+        if latency is not None and status is not None and not is_throttle_status(status):
+            state.latency = latency if state.latency is None else (
+                (1 - LATENCY_ALPHA) * state.latency + LATENCY_ALPHA * latency)
+
+        self._wake(state)
+
+    def _wake(self, state):
+        free = int(state.limit) - state.inflight
+        while free > 0 and state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def snapshot(self):
+        """
+        호스트별 현재 동시성 한도, 처리율(req/s), 누적 요청/제한 응답 수를 반환합니다.
+        rate: 최근 RATE_WINDOW초 처리율, avg_rate: 첫 요청부터 마지막 응답까지의 평균 처리율
+        """
+        now = time.monotonic()
+        stats = {}
+        for host, state in self.hosts.items():
+            recent = sum(1 for t in state.completed if t >= now - RATE_WINDOW)
+            elapsed = (state.finished - state.started) if state.finished and state.started else 0
+            stats[host] = {
+                'limit': round(state.limit, 2),
+                'inflight': state.inflight,
+                'rate': round(recent / RATE_WINDOW, 2),
+                'avg_rate': round(state.requests / elapsed, 2) if elapsed > 0 else None,
+                'latency_ms': round(state.latency * 1000) if state.latency is not None else None,
+                'requests': state.requests,
+                'throttled': state.throttled,
+            }
+        return stats
@@ -0,0 +1,295 @@
+"""
+단일 패스 HTML 추출 엔진
+- lxml HTMLPullParser(증분 토크나이저)로 문서를 한 번만 훑으며 모든 규칙에 필요한 요소를 수집
+- </head>와 필요한 H1을 확인하면 나머지 본문은 파싱하지 않고 종료
+- 검사 항목은 Rule 단위로 추가하며, 규칙이 늘어나도 파싱 횟수는 늘지 않음
+- 링크 수집 규칙(LinkRule)을 넣으면 본문 끝까지 읽으며 같은 패스에서 <a href>를 모읍니다
+"""
+import codecs
+import re
+
+from lxml import etree
+
+# 인코딩 판별을 위해 확인하는 문서 앞부분 크기 (HTML 표준의 prescan 범위)
+SNIFF_BYTES = 1024
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.I)
+
+class Rule:
+    """
+    추출 규칙의 기본 클래스입니다.
+    규칙 인스턴스는 상태를 갖지 않고 모든 값은 record에 기록합니다 (여러 페이지/프로세스에서 공유 가능).
+    """
+    tags = ()        # 관심 있는 태그 (소문자)
+    capture = False  # 요소의 하위 텍스트가 필요한 경우 True
+
+    def init(self, record):
+        """파싱 시작 전 record에 기본값을 채웁니다."""
+
+    def handle(self, elem, record):
+        """관심 태그의 닫는 태그를 만났을 때 호출됩니다."""
+
+    def done(self, record, head_closed):
+        """더 이상 이 규칙을 위해 본문을 읽을 필요가 없으면 True"""
+        return head_closed
+
+    def finish(self, record):
+        """파싱 종료 후 값을 정리하고 이슈를 record['issues']에 추가합니다."""
+
+def element_text(elem):
+    return ''.join(elem.itertext()).strip()
+
+class TitleRule(Rule):
+    tags = ('title',)
+    capture = True
+
+    def init(self, record):
+        record['title'] = None
+
+    def handle(self, elem, record):
+        if record['title'] is None:
+            record['title'] = element_text(elem)
+
+    def done(self, record, head_closed):
+        return head_closed or record['title'] is not None
+
+    def finish(self, record):
+        if record['title'] is None:
+            record['title'] = "Missing"
+            record['issues'].append("Missing Title tag")
+        elif len(record['title']) < 10:
+            record['issues'].append("Title too short")
+
+class MetaRule(Rule):
+    """
+    <meta name="..."> 의 content 값을 추출합니다 (첫 번째 태그 기준).
+    name은 기존 BeautifulSoup 구현과 같이 대소문자/공백까지 정확히 일치해야 합니다 (name="Description"은 해당 없음).
+    """
+    tags = ('meta',)
+
+    def __init__(self, name, field, lower=False):
+        self.name = name
+        self.field = field
+        self.lower = lower
+
+    def init(self, record):
+        record[self.field] = None
+
+    def handle(self, elem, record):
+        if record[self.field] is None and elem.get('name') == self.name:
+            value = (elem.get('content') or '').strip()
+            record[self.field] = value.lower() if self.lower else value
+
+    def finish(self, record):
+        if record[self.field] is None:
+            record[self.field] = ''
+
+class DescriptionRule(MetaRule):
+    def __init__(self):
+        super().__init__('description', 'description')
+
+    def finish(self, record):
+        super().finish(record)
+        if not record['description']:
+            record['issues'].append("Missing Meta Description")
+
+class RobotsRule(MetaRule):
+    def __init__(self):
+        super().__init__('robots', 'robots', lower=True)
+
+    def finish(self, record):
+        super().finish(record)
+        if 'noindex' in record['robots']:
+            record['issues'].append("Meta robots set to 'noindex'")
+
+class CanonicalRule(Rule):
+    tags = ('link',)
+
+    def init(self, record):
+        record['canonical'] = None
+
+    def handle(self, elem, record):
+        if record['canonical'] is None and 'canonical' in (elem.get('rel') or '').split():
+            record['canonical'] = elem.get('href') or ''
+
+    def finish(self, record):
+        if record['canonical'] is None:
+            record['canonical'] = ''
+        if not record['canonical']:
+            record['issues'].append("Missing Canonical tag")
+
+class H1Rule(Rule):
+    """
+    H1 태그를 수집합니다.
+    max_count개를 찾으면 본문 읽기를 멈춥니다. 기본값 2는 '없음/1개/여러 개'를 정확히 구분하는 최소값이며,
+    H1이 하나뿐인 페이지는 두 번째 H1이 없음을 확인하기 위해 본문 끝까지 읽습니다.
+    """
+    tags = ('h1',)
+    capture = True
+
+    def __init__(self, max_count=2):
+        self.max_count = max_count
+
+    def init(self, record):
+        record['h1'] = []
+
+    def handle(self, elem, record):
+        record['h1'].append(element_text(elem))
+
+    def done(self, record, head_closed):
+        return len(record['h1']) >= self.max_count
+
+    def finish(self, record):
+        if len(record['h1']) == 0:
+            record['issues'].append("Missing H1 tag")
+        elif len(record['h1']) > 1:
+            record['issues'].append("Multiple H1 tags")
+
+class LinkRule(Rule):
+    """
+    <a href> 링크와 <base href>를 수집합니다 (내부 링크 탐색용, link_graph.py).
+    링크는 본문 전체에 있으므로 max_links개를 모으기 전에는 본문 끝까지 읽습니다.
+    rel="nofollow" 링크는 제외하며, 상대 경로 해석은 호출하는 쪽에서 합니다.
+    """
+    tags = ('a', 'base')
+
+    def __init__(self, max_links=1000):
+        self.max_links = max_links
+
+    def init(self, record):
+        record['links'] = []
+        record['base_href'] = ''
+
+    def handle(self, elem, record):
+        href = (elem.get('href') or '').strip()
+        if not href:
+            return
+        if elem.tag == 'base':
+            if not record['base_href']:
+                record['base_href'] = href
+        elif len(record['links']) < self.max_links and 'nofollow' not in (elem.get('rel') or '').lower().split():
+            record['links'].append(href)
+
+    def done(self, record, head_closed):
+        return len(record['links']) >= self.max_links
+
+# 기본 규칙 (이슈 순서는 기존 리포트와 동일)
+DEFAULT_RULES = (TitleRule(), DescriptionRule(), H1Rule(), CanonicalRule(), RobotsRule())
+
+# 닫는 태그를 만나도 트리에서 해제하지 않는 요소
+_KEEP_TAGS = frozenset(('html', 'head', 'body'))
+
+class HtmlExtractor:
+    """
+    HTML을 청크 단위로 받아 한 번의 순회로 모든 규칙을 적용합니다.
+    feed()는 모든 규칙이 끝났으면 True를 반환하며, 이후의 본문은 더 보낼 필요가 없습니다.
+    """
+    def __init__(self, rules=DEFAULT_RULES, encoding=None):
+        self.rules = rules
+        self.record = {'issues': []}
+        self.head_closed = False
+        self.done = False
+        self._handlers = {}
+        self._capture_tags = set()
+        self._capturing = 0
+        for rule in rules:
+            rule.init(self.record)
+            for tag in rule.tags:
+                self._handlers.setdefault(tag, []).append(rule)
+            if rule.capture:
+                self._capture_tags.update(rule.tags)
+        self.encoding = encoding
+        self._parser = None
+
+    def feed(self, chunk):
+        if not self.done and chunk:
+            if self._parser is None:
+                self._start(chunk)
+            self._parser.feed(chunk)
+            self._process()
+        return self.done
+
+    def _start(self, head):
+        """첫 청크로 인코딩을 판별한 뒤 파서를 생성합니다. (BOM > meta charset > UTF-8)"""
+        if self.encoding is None:
+            self.encoding = sniff_encoding(head)
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=self.encoding, no_network=True)
+
+    def close(self):
+        """파싱을 마치고 결과 record를 반환합니다."""
+        if not self.done and self._parser is not None:
+            try:
+                self._parser.close()
+            except etree.LxmlError:
+                pass
+            self._process()
+        for rule in self.rules:
+            rule.finish(self.record)
+        return self.record
+
+    def _process(self):
+        record = self.record
+        check = False
+        for event, elem in self._parser.read_events():
+            tag = elem.tag
+            if event == 'start':
+                if tag == 'body' and not self.head_closed:
+                    self.head_closed = check = True
+                if tag in self._capture_tags:
+                    self._capturing += 1
+                continue
+
+            if tag == 'head' and not self.head_closed:
+                self.head_closed = check = True
+            handlers = self._handlers.get(tag)
+            if handlers:
+                for rule in handlers:
+                    rule.handle(elem, record)
+                check = True
+            if tag in self._capture_tags:
+                self._capturing -= 1
+            if not self._capturing and tag not in _KEEP_TAGS:
+                _release(elem)
+
+            if check and self.head_closed:
+                check = False
+                if all(rule.done(record, True) for rule in self.rules):
+                    self.done = True
+                    return
+
+def sniff_encoding(head):
+    """문서 앞부분에서 문자 인코딩을 판별합니다. 알 수 없으면 UTF-8로 간주합니다."""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        name = match.group(1).decode('ascii').lower()
+        try:
+            codecs.lookup(name)
+            return name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+def _release(elem):
+    """처리가 끝난 요소와 앞선 형제 요소를 트리에서 제거합니다."""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def extract(content, rules=DEFAULT_RULES, encoding=None, chunk_size=16 * 1024):
+    """
+    HTML 바이트 전체를 받아 규칙을 적용한 record를 반환합니다.
+    청크 단위로 넣으면서 모든 규칙이 끝나는 즉시 중단합니다.
+    """
+    if isinstance(content, str):
+        content, encoding = content.encode('utf-8'), 'utf-8'
+    extractor = HtmlExtractor(rules, encoding)
+    view = memoryview(content)
+    for offset in range(0, len(view), chunk_size):
+        if extractor.feed(bytes(view[offset:offset + chunk_size])):
+            break
+    return extractor.close()
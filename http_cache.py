@@ -0,0 +1,123 @@
+"""
+조건부 요청용 디스크 HTTP 캐시 (SQLite)
+- URL별로 ETag/Last-Modified와 '분석 결과'만 저장합니다 (응답 본문은 저장하지 않음)
+- 다음 실행에서 If-None-Match/If-Modified-Since를 보내고, 304 응답이면 저장된 결과를 재사용합니다
+- ttl 이내에 확인한 항목은 요청 없이 바로 재사용합니다
+- 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다
+"""
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from config import HTTP_CACHE_MAX_BYTES, HTTP_CACHE_PATH, HTTP_CACHE_TTL
+
+# 이 횟수만큼 변경이 쌓이면 커밋 (기본값)
+COMMIT_EVERY = 200
+
+class CacheEntry:
+    def __init__(self, etag, last_modified, payload, validated_at, fresh):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.payload = payload
+        self.validated_at = validated_at
+        self.fresh = fresh
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class HttpCache:
+    """
+    commit_every: 이 횟수만큼 변경이 쌓이면 커밋합니다.
+    여러 프로세스가 같은 파일을 함께 쓸 때는 1로 두어 쓰기 잠금을 오래 잡지 않게 합니다.
+    """
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES, ttl=HTTP_CACHE_TTL,
+                 commit_every=COMMIT_EVERY):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.commit_every = commit_every
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._pending = 0
+
+    def get(self, key):
+        row = self.conn.execute(
+            "SELECT etag, last_modified, payload, validated_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, payload, validated_at = row
+        now = time.time()
+        self._write("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        fresh = self.ttl > 0 and now - validated_at < self.ttl
+        return CacheEntry(etag, last_modified, json.loads(zlib.decompress(payload)), validated_at, fresh)
+
+    def put(self, key, etag, last_modified, payload):
+        """검증자(ETag/Last-Modified)가 없고 TTL도 쓰지 않으면 재사용할 수 없으므로 저장하지 않습니다."""
+        if not etag and not last_modified and self.ttl <= 0:
+            return
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        old = self.conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        self._write(
+            "INSERT OR REPLACE INTO entries (key, etag, last_modified, payload, size, validated_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, etag, last_modified, blob, len(blob), now, now))
+        self.total_bytes += len(blob) - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def touch(self, key):
+        """304 응답으로 재검증된 항목의 확인 시각을 갱신합니다."""
+        self._write("UPDATE entries SET validated_at = ? WHERE key = ?", (time.time(), key))
+
+    def _evict(self):
+        """전체 크기가 max_bytes의 90% 이하가 될 때까지 오래 사용하지 않은 항목을 삭제합니다."""
+        target = self.max_bytes * 0.9
+        while self.total_bytes > target:
+            rows = self.conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 100").fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                self.total_bytes -= size
+                if self.total_bytes <= target:
+                    break
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.conn.commit()
+        self._pending = 0
+
+    def _write(self, sql, params):
+        self.conn.execute(sql, params)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
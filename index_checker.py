@@ -6,23 +6,36 @@ Playwright 기반 검색 엔진 인덱싱 체커 v5
 - 더 긴 랜덤 딜레이
 """
 import asyncio
-import re
 import os
 import random
-from urllib.parse import urlparse, unquote
-from playwright.async_api import async_playwright
+import time
+from urllib.parse import urlparse
+
 from playwright_stealth import Stealth
-from utils import normalize_url
 
-# 디버그 폴더
-DEBUG_DIR = "debug_screenshots"
+from browser_pool import close_shared_pool, shared_pool
+from metrics import METRICS
+from serp_links import collect_serp_links
+
 PROFILE_DIR = "browser_profile"
-os.makedirs(DEBUG_DIR, exist_ok=True)
 os.makedirs(PROFILE_DIR, exist_ok=True)
 
 # headless 모드 설정 (False로 하면 실제 브라우저 창이 보임)
 HEADLESS_MODE = False  # 실제 브라우저 창 표시 - 캡차 직접 풀기 가능
 
+# 브라우저 실행 옵션 (Google/Bing은 Firefox 하나를 함께 사용)
+FIREFOX_LAUNCH = {
+    'headless': HEADLESS_MODE,
+    'firefox_user_prefs': {
+        "dom.webdriver.enabled": False,
+        "useAutomationExtension": False,
+    },
+}
+CHROMIUM_LAUNCH = {
+    'headless': True,
+    'args': ['--disable-blink-features=AutomationControlled'],
+}
+
 def get_domain_from_url(url):
     parsed = urlparse(url)
     return parsed.netloc
@@ -52,324 +65,315 @@ async def human_scroll(page):
     except:
         pass
 
-async def crawl_google_firefox(target_url, max_pages=3):
+async def crawl_google_firefox(target_url, max_pages=3, pool=None, start_page=0, serp_cache=None):
     """
     Google 검색 - Firefox 사용 (탐지율 낮음)
     """
     domain = get_domain_from_url(target_url)
-    target_host = normalize_url(domain)
     indexed_urls = set()
     
     print(f"[Firefox] Google에서 site:{domain} 검색 중...")
     
-    async with async_playwright() as p:
-        # Firefox 사용 (Chrome보다 탐지 어려움)
-        browser = await p.firefox.launch(
-            headless=HEADLESS_MODE,
-            firefox_user_prefs={
-                "dom.webdriver.enabled": False,
-                "useAutomationExtension": False,
-            }
-        )
-        
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            locale='ko-KR',
-            timezone_id='Asia/Seoul',
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
-        )
-        
-        page = await context.new_page()
-        
-        try:
-            for page_num in range(max_pages):
-                print(f"  Page {page_num + 1} 로딩 중...")
-                
-                if page_num == 0:
-                    # 구글 메인 페이지 방문
-                    await page.goto("https://www.google.com", wait_until='networkidle', timeout=30000)
-                    await human_delay(2, 4)
-                    await random_mouse_move(page)
-                    
-                    # 검색창 찾기 및 클릭
-                    search_box = page.locator('textarea[name="q"], input[name="q"]').first
-                    await search_box.click()
-                    await human_delay(0.5, 1.5)
-                    
-                    # 사람처럼 천천히 타이핑
-                    query = f"site:{domain}"
-                    for char in query:
-                        await page.keyboard.type(char, delay=random.randint(80, 200))
-                        if random.random() < 0.1:  # 10% 확률로 잠시 멈춤
-                            await asyncio.sleep(random.uniform(0.2, 0.5))
-                    
-                    await human_delay(1, 2)
-                    await random_mouse_move(page)
-                    
-                    # 엔터 대신 검색 버튼 클릭 시도
-                    try:
-                        search_btn = page.locator('input[name="btnK"]').first
-                        await search_btn.click()
-                    except:
-                        await page.keyboard.press('Enter')
-                    
-                    await page.wait_for_load_state('networkidle')
-                else:
-                    start = page_num * 10
-                    await page.goto(f"https://www.google.com/search?q=site:{domain}&start={start}&hl=ko", 
-                                   wait_until='networkidle', timeout=30000)
-                
-                await human_delay(3, 6)
+    # Firefox 사용 (Chrome보다 탐지 어려움) - 공유 풀의 브라우저에서 탭만 새로 열기
+    pool = pool or shared_pool()
+    page = await pool.new_page('google', 'firefox', FIREFOX_LAUNCH, {
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'ko-KR',
+        'timezone_id': 'Asia/Seoul',
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
+    })
+    
+    try:
+        for page_num in range(start_page, max_pages):
+            page_started = time.perf_counter()
+            print(f"  Page {page_num + 1} 로딩 중...")
+            
+            if page_num == 0:
+                # 구글 메인 페이지 방문
+                await page.goto("https://www.google.com", wait_until='networkidle', timeout=30000)
+                await human_delay(2, 4)
                 await random_mouse_move(page)
-                await human_scroll(page)
                 
-                # 스크린샷 저장
-                await page.screenshot(path=f"{DEBUG_DIR}/google_firefox_p{page_num+1}.png")
+                # 검색창 찾기 및 클릭
+                search_box = page.locator('textarea[name="q"], input[name="q"]').first
+                await search_box.click()
+                await human_delay(0.5, 1.5)
                 
-                content = await page.content()
+                # 사람처럼 천천히 타이핑
+                query = f"site:{domain}"
+                for char in query:
+                    await page.keyboard.type(char, delay=random.randint(80, 200))
+                    if random.random() < 0.1:  # 10% 확률로 잠시 멈춤
+                        await asyncio.sleep(random.uniform(0.2, 0.5))
                 
-                # 캡차 감지
-                if 'recaptcha' in content.lower() or '로봇이 아닙니다' in content or 'unusual traffic' in content.lower():
-                    print(f"  [!] 캡차 감지됨")
-                    if not HEADLESS_MODE:
-                        print(f"  [!] 브라우저 창에서 캡차를 직접 풀어주세요...")
-                        await asyncio.sleep(30)  # 캡차 풀 시간 제공
-                        content = await page.content()
-                    else:
-                        break
+                await human_delay(1, 2)
+                await random_mouse_move(page)
                 
-                # 링크 추출
-                count = 0
+                # 엔터 대신 검색 버튼 클릭 시도
                 try:
-                    all_links = await page.locator(f'a[href*="{domain}"]').all()
-                    for link in all_links:
-                        href = await link.get_attribute('href')
-                        if href and href.startswith('http'):
-                            if '/url?q=' in href:
-                                try:
-                                    href = href.split('/url?q=')[1].split('&')[0]
-                                    href = unquote(href)
-                                except:
-                                    continue
-                            
-                            link_norm = normalize_url(href)
-                            if target_host in link_norm and 'google' not in href:
-                                indexed_urls.add(href)
-                                count += 1
-                except Exception as e:
-                    print(f"  [!] 링크 추출 에러: {e}")
-                
-                print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
+                    search_btn = page.locator('input[name="btnK"]').first
+                    await search_btn.click()
+                except:
+                    await page.keyboard.press('Enter')
                 
-                if count == 0 and page_num > 0:
+                await page.wait_for_load_state('networkidle')
+            else:
+                start = page_num * 10
+                await page.goto(f"https://www.google.com/search?q=site:{domain}&start={start}&hl=ko", 
+                               wait_until='networkidle', timeout=30000)
+            
+            await human_delay(3, 6)
+            await random_mouse_move(page)
+            await human_scroll(page)
+            
+            # 스크린샷 저장 (DEBUG_SCREENSHOTS='always'일 때만)
+            await pool.screenshot(page, f"google_firefox_p{page_num+1}")
+            
+            blocked = False
+            content = await page.content()
+            
+            # 캡차 감지
+            if 'recaptcha' in content.lower() or '로봇이 아닙니다' in content or 'unusual traffic' in content.lower():
+                print("  [!] 캡차 감지됨")
+                blocked = True
+                await pool.screenshot(page, f"google_firefox_p{page_num+1}_captcha", error=True)
+                if not HEADLESS_MODE:
+                    print("  [!] 브라우저 창에서 캡차를 직접 풀어주세요...")
+                    await asyncio.sleep(30)  # 캡차 풀 시간 제공
+                    content = await page.content()
+                else:
+                    METRICS.inc('serp_pages_total', engine='google', outcome='blocked')
                     break
-                
-                await human_delay(4, 8)
-                
-        except Exception as e:
-            print(f"  [!] Google 크롤링 에러: {e}")
-        finally:
-            await browser.close()
-    
+            
+            # 링크 추출 (evaluate 한 번으로 모든 링크를 가져와 필터링)
+            count = 0
+            page_links = None
+            try:
+                with METRICS.timer('serp_extract_seconds', engine='google'):
+                    page_links = await collect_serp_links(page, domain)
+                indexed_urls.update(page_links)
+                count = len(page_links)
+            except Exception as e:
+                print(f"  [!] 링크 추출 에러: {e}")
+            
+            print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
+            # 페이지 이동부터 링크 추출까지 (사람처럼 보이기 위한 대기 포함)
+            METRICS.observe('serp_page_seconds', time.perf_counter() - page_started, engine='google')
+            METRICS.inc('serp_pages_total', engine='google', outcome='blocked' if blocked else 'ok')
+            
+            # 검색 결과 캐시 저장 (캡차/추출 오류가 있었던 페이지는 저장하지 않음)
+            if serp_cache is not None and page_links is not None and not blocked:
+                serp_cache.put('google', domain, page_num, page_links, last=count == 0 and page_num > 0)
+            
+            if count == 0 and page_num > 0:
+                break
+            
+            await human_delay(4, 8)
+            
+    except Exception as e:
+        print(f"  [!] Google 크롤링 에러: {e}")
+        await pool.screenshot(page, "google_error", error=True)
+    finally:
+        await page.close()
+
     return indexed_urls
 
-async def crawl_bing_firefox(target_url, max_pages=3):
+async def crawl_bing_firefox(target_url, max_pages=3, pool=None, start_page=0, serp_cache=None):
     """
     Bing 검색 - Firefox 사용
     """
     domain = get_domain_from_url(target_url)
-    target_host = normalize_url(domain)
     indexed_urls = set()
     
     print(f"[Firefox] Bing에서 site:{domain} 검색 중...")
     
-    async with async_playwright() as p:
-        browser = await p.firefox.launch(
-            headless=HEADLESS_MODE,
-            firefox_user_prefs={
-                "dom.webdriver.enabled": False,
-            }
-        )
-        
-        context = await browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            locale='ko-KR',
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
-        )
-        
-        page = await context.new_page()
-        
-        try:
-            for page_num in range(max_pages):
-                print(f"  Page {page_num + 1} 로딩 중...")
-                
-                if page_num == 0:
-                    await page.goto("https://www.bing.com", wait_until='networkidle', timeout=30000)
-                    await human_delay(2, 4)
-                    await random_mouse_move(page)
-                    
-                    search_box = page.locator('textarea[name="q"], input[name="q"]').first
-                    await search_box.click()
-                    await human_delay(0.5, 1)
-                    
-                    query = f"site:{domain}"
-                    for char in query:
-                        await page.keyboard.type(char, delay=random.randint(80, 200))
-                    
-                    await human_delay(1, 2)
-                    await page.keyboard.press('Enter')
-                    await page.wait_for_load_state('networkidle')
-                else:
-                    start = page_num * 10 + 1
-                    await page.goto(f"https://www.bing.com/search?q=site:{domain}&first={start}", 
-                                   wait_until='networkidle', timeout=30000)
-                
-                await human_delay(3, 5)
+    pool = pool or shared_pool()
+    page = await pool.new_page('bing', 'firefox', FIREFOX_LAUNCH, {
+        'viewport': {'width': 1920, 'height': 1080},
+        'locale': 'ko-KR',
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0',
+    })
+    
+    try:
+        for page_num in range(start_page, max_pages):
+            page_started = time.perf_counter()
+            print(f"  Page {page_num + 1} 로딩 중...")
+            
+            if page_num == 0:
+                await page.goto("https://www.bing.com", wait_until='networkidle', timeout=30000)
+                await human_delay(2, 4)
                 await random_mouse_move(page)
-                await human_scroll(page)
                 
-                await page.screenshot(path=f"{DEBUG_DIR}/bing_firefox_p{page_num+1}.png")
-                
-                content = await page.content()
-                
-                # 차단 감지
-                if '마지막 한 단계' in content or 'captcha' in content.lower() or 'verify' in content.lower():
-                    print(f"  [!] Bing 인증 요구됨")
-                    if not HEADLESS_MODE:
-                        print(f"  [!] 브라우저 창에서 인증을 완료해주세요...")
-                        await asyncio.sleep(30)
-                        content = await page.content()
-                    else:
-                        break
-                
-                count = 0
-                try:
-                    all_links = await page.locator(f'a[href*="{domain}"]').all()
-                    for link in all_links:
-                        href = await link.get_attribute('href')
-                        if href and href.startswith('http'):
-                            link_norm = normalize_url(href)
-                            if target_host in link_norm and 'bing' not in href and 'microsoft' not in href:
-                                indexed_urls.add(href)
-                                count += 1
-                except Exception as e:
-                    print(f"  [!] 링크 추출 에러: {e}")
+                search_box = page.locator('textarea[name="q"], input[name="q"]').first
+                await search_box.click()
+                await human_delay(0.5, 1)
                 
-                print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
+                query = f"site:{domain}"
+                for char in query:
+                    await page.keyboard.type(char, delay=random.randint(80, 200))
                 
-                if count == 0 and page_num > 0:
+                await human_delay(1, 2)
+                await page.keyboard.press('Enter')
+                await page.wait_for_load_state('networkidle')
+            else:
+                start = page_num * 10 + 1
+                await page.goto(f"https://www.bing.com/search?q=site:{domain}&first={start}", 
+                               wait_until='networkidle', timeout=30000)
+            
+            await human_delay(3, 5)
+            await random_mouse_move(page)
+            await human_scroll(page)
+            
+            await pool.screenshot(page, f"bing_firefox_p{page_num+1}")
+            
+            blocked = False
+            content = await page.content()
+            
+            # 차단 감지
+            if '마지막 한 단계' in content or 'captcha' in content.lower() or 'verify' in content.lower():
+                print("  [!] Bing 인증 요구됨")
+                blocked = True
+                await pool.screenshot(page, f"bing_firefox_p{page_num+1}_verify", error=True)
+                if not HEADLESS_MODE:
+                    print("  [!] 브라우저 창에서 인증을 완료해주세요...")
+                    await asyncio.sleep(30)
+                    content = await page.content()
+                else:
+                    METRICS.inc('serp_pages_total', engine='bing', outcome='blocked')
                     break
-                
-                await human_delay(3, 6)
-                
-        except Exception as e:
-            print(f"  [!] Bing 크롤링 에러: {e}")
-        finally:
-            await browser.close()
-    
+            
+            # 링크 추출 (evaluate 한 번으로 모든 링크를 가져와 필터링)
+            count = 0
+            page_links = None
+            try:
+                with METRICS.timer('serp_extract_seconds', engine='bing'):
+                    page_links = await collect_serp_links(page, domain)
+                indexed_urls.update(page_links)
+                count = len(page_links)
+            except Exception as e:
+                print(f"  [!] 링크 추출 에러: {e}")
+            
+            print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
+            # 페이지 이동부터 링크 추출까지 (사람처럼 보이기 위한 대기 포함)
+            METRICS.observe('serp_page_seconds', time.perf_counter() - page_started, engine='bing')
+            METRICS.inc('serp_pages_total', engine='bing', outcome='blocked' if blocked else 'ok')
+            
+            # 검색 결과 캐시 저장 (캡차/추출 오류가 있었던 페이지는 저장하지 않음)
+            if serp_cache is not None and page_links is not None and not blocked:
+                serp_cache.put('bing', domain, page_num, page_links, last=count == 0 and page_num > 0)
+            
+            if count == 0 and page_num > 0:
+                break
+            
+            await human_delay(3, 6)
+            
+    except Exception as e:
+        print(f"  [!] Bing 크롤링 에러: {e}")
+        await pool.screenshot(page, "bing_error", error=True)
+    finally:
+        await page.close()
+
     return indexed_urls
 
-async def crawl_naver_playwright(target_url, max_pages=5):
+async def crawl_naver_playwright(target_url, max_pages=5, pool=None, start_page=0, serp_cache=None):
     """
     네이버 검색 (기존과 동일)
     """
     domain = get_domain_from_url(target_url)
-    target_host = normalize_url(domain)
     indexed_urls = set()
     
     print(f"[Playwright] Naver에서 site:{domain} 검색 중...")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = await browser.new_context(
-            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            viewport={'width': 1280, 'height': 900},
-            locale='ko-KR',
-            timezone_id='Asia/Seoul'
-        )
-        
-        await context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-        """)
-        
-        page = await context.new_page()
-        
-        try:
-            for page_num in range(max_pages):
-                start = page_num * 10 + 1
-                search_url = f"https://search.naver.com/search.naver?where=web&query=site:{domain}&start={start}"
-                
-                await page.goto(search_url, wait_until='networkidle', timeout=30000)
-                await human_delay(1.5, 3)
-                
-                await page.screenshot(path=f"{DEBUG_DIR}/naver_page{page_num+1}.png")
-                
-                content = await page.content()
-                
-                if '검색결과가 없습니다' in content or '일치하는 검색결과가 없습니다' in content:
-                    print(f"  Page {page_num + 1}: 검색 결과 끝")
-                    break
-                
-                found_links = set()
-                
-                try:
-                    all_links = await page.locator(f'a[href*="{domain}"]').all()
-                    for link in all_links:
-                        href = await link.get_attribute('href')
-                        if href and href.startswith('http'):
-                            found_links.add(href)
-                except Exception as e:
-                    print(f"  [!] 셀렉터 에러: {e}")
-                
-                regex_links = re.findall(rf'href=["\']([^"\']*{re.escape(domain)}[^"\']*)["\']', content)
-                for href in regex_links:
-                    if href.startswith('http'):
-                        found_links.add(href)
-                
-                count = 0
-                for href in found_links:
-                    try:
-                        href = unquote(href)
-                    except:
-                        pass
-                    
-                    if not href.startswith('http'):
-                        continue
-                    
-                    if 'naver.com' in href and domain not in href:
-                        continue
-                    
-                    link_norm = normalize_url(href)
-                    if target_host in link_norm:
-                        indexed_urls.add(href)
-                        count += 1
-                
-                print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
-                
-                if count == 0:
-                    break
-                    
-                await human_delay(1, 2)
-                
-        except Exception as e:
-            print(f"  [!] Naver 크롤링 에러: {e}")
-        finally:
-            await browser.close()
+    pool = pool or shared_pool()
+    page = await pool.new_page('naver', 'chromium', CHROMIUM_LAUNCH, {
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'viewport': {'width': 1280, 'height': 900},
+        'locale': 'ko-KR',
+        'timezone_id': 'Asia/Seoul',
+    }, init_script="""
+        Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    """)
     
+    try:
+        for page_num in range(start_page, max_pages):
+            page_started = time.perf_counter()
+            start = page_num * 10 + 1
+            search_url = f"https://search.naver.com/search.naver?where=web&query=site:{domain}&start={start}"
+            
+            await page.goto(search_url, wait_until='networkidle', timeout=30000)
+            await human_delay(1.5, 3)
+            
+            await pool.screenshot(page, f"naver_page{page_num+1}")
+            
+            blocked = False
+            content = await page.content()
+            
+            if '검색결과가 없습니다' in content or '일치하는 검색결과가 없습니다' in content:
+                print(f"  Page {page_num + 1}: 검색 결과 끝")
+                if serp_cache is not None:
+                    serp_cache.put('naver', domain, page_num, set(), last=True)
+                break
+            
+            # 링크 추출 (evaluate 한 번으로 모든 링크를 가져와 필터링)
+            count = 0
+            page_links = None
+            try:
+                with METRICS.timer('serp_extract_seconds', engine='naver'):
+                    page_links = await collect_serp_links(page, domain)
+                indexed_urls.update(page_links)
+                count = len(page_links)
+            except Exception as e:
+                print(f"  [!] 링크 추출 에러: {e}")
+            
+            print(f"  Page {page_num + 1}: {count}개 발견 (누적: {len(indexed_urls)}개)")
+            # 페이지 이동부터 링크 추출까지 (사람처럼 보이기 위한 대기 포함)
+            METRICS.observe('serp_page_seconds', time.perf_counter() - page_started, engine='naver')
+            METRICS.inc('serp_pages_total', engine='naver', outcome='blocked' if blocked else 'ok')
+            
+            # 검색 결과 캐시 저장 (캡차/추출 오류가 있었던 페이지는 저장하지 않음)
+            if serp_cache is not None and page_links is not None and not blocked:
+                serp_cache.put('naver', domain, page_num, page_links, last=count == 0)
+            
+            if count == 0:
+                break
+                
+            await human_delay(1, 2)
+            
+    except Exception as e:
+        print(f"  [!] Naver 크롤링 에러: {e}")
+        await pool.screenshot(page, "naver_error", error=True)
+    finally:
+        await page.close()
+
     return indexed_urls
 
 # 통합 함수
-async def crawl_search_results_playwright(target_url, engine='google', max_pages=3):
-    if engine == 'naver':
-        return await crawl_naver_playwright(target_url, max_pages)
-    elif engine == 'google':
-        return await crawl_google_firefox(target_url, max_pages)
-    elif engine == 'bing':
-        return await crawl_bing_firefox(target_url, max_pages)
-    return set()
+CRAWLERS = {
+    'naver': crawl_naver_playwright,
+    'google': crawl_google_firefox,
+    'bing': crawl_bing_firefox,
+}
+
+async def crawl_search_results_playwright(target_url, engine='google', max_pages=3, pool=None,
+                                          serp_cache=None, refresh=False):
+    """
+    serp_cache를 지정하면 TTL 안에 수집한 페이지는 재사용하고, 캐시에 없는 페이지부터 이어서 수집합니다.
+    refresh=True면 캐시를 무시하고 처음부터 다시 수집합니다 (결과는 캐시에 다시 저장).
+    """
+    crawler = CRAWLERS.get(engine)
+    if crawler is None:
+        return set()
+    domain = get_domain_from_url(target_url)
+    cached_urls, start_page = set(), 0
+    if serp_cache is not None and not refresh:
+        cached_urls, start_page, complete = serp_cache.lookup(engine, domain, max_pages)
+        METRICS.inc('serp_pages_total', start_page, engine=engine, outcome='cached')
+        if complete:
+            print(f"[캐시] {engine}: site:{domain} 검색 결과 {len(cached_urls)}개 재사용 ({start_page}페이지)")
+            return cached_urls
+        if start_page:
+            print(f"[캐시] {engine}: {start_page}페이지까지 재사용, {start_page + 1}페이지부터 수집")
+    return cached_urls | await crawler(target_url, max_pages, pool, start_page=start_page, serp_cache=serp_cache)
 
 if __name__ == "__main__":
     async def test():
@@ -380,5 +384,6 @@ if __name__ == "__main__":
         print(f"Google 발견: {len(google_urls)}개")
         for url in list(google_urls)[:5]:
             print(f"  - {url}")
+        await close_shared_pool()
     
     asyncio.run(test())
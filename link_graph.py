@@ -0,0 +1,535 @@
+"""
+내부 링크 그래프 탐색 (사이트맵에 없는 페이지, 고아 페이지, 클릭 깊이)
+- 사이트맵 URL을 노드로 먼저 등록한 뒤, 시작 페이지부터 같은 호스트의 링크를 너비 우선으로 따라가며 페이지를 분석합니다
+  (링크는 seo_analyzer의 단일 패스 추출 중 LinkRule로 함께 수집하므로 페이지당 파싱은 한 번)
+- 본 URL 집합은 정규화 URL의 64비트 해시를 array 기반 해시 테이블(UrlIndex)에 넣어 URL 문자열을 메모리에 두지 않습니다
+  (URL당 약 20~30바이트, 노드 번호는 0부터 순서대로 부여)
+- 링크 그래프는 SQLite에 노드 번호 쌍(edges: src, dst)으로 저장하고, 탐색이 끝나면 CSR 배열(간선당 4바이트)로 읽어
+  시작 페이지 기준 클릭 깊이(BFS)를 계산합니다
+- 탐색 범위는 DISCOVERY_MAX_DEPTH(링크 단계)와 DISCOVERY_MAX_PAGES(요청 페이지 수)로 제한합니다
+
+사용법:
+  python link_graph.py <사이트맵 URL> [--start URL] [--max-depth 5] [--max-pages 100000] [--seed-sitemap]
+  python link_graph.py --report <그래프 .db>   # 저장된 링크 그래프로 리포트만 다시 생성
+리포트 (reports 폴더):
+  link_pages_<도메인>_<시각>.csv           모든 페이지의 사이트맵 포함 여부, 상태 코드, 클릭 깊이, 내부 링크 수
+  link_orphans_<도메인>_<시각>.csv         내부 링크가 없거나 시작 페이지에서 도달할 수 없는 사이트맵 URL
+  link_not_in_sitemap_<도메인>_<시각>.csv  링크로만 발견된(사이트맵에 없는) 정상 페이지
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+from collections import deque
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import aiohttp
+
+from config import (
+    CONCURRENT_REQUESTS,
+    DISCOVERY_MAX_DEPTH,
+    DISCOVERY_MAX_LINKS,
+    DISCOVERY_MAX_PAGES,
+    DISCOVERY_SKIP_EXTENSIONS,
+    LINK_GRAPH_DIR,
+    PARSE_WORKERS,
+)
+from host_limiter import HostLimiter
+from html_extractor import DEFAULT_RULES, LinkRule
+from metrics import http_trace_config
+from seo_analyzer import iter_analyze_results
+from sitemap_parser import SitemapError, iter_sitemap_urls_async
+from url_canon import canonicalize
+
+REPORTS_DIR = "reports"
+
+# 노드/간선/페이지 결과를 모아서 기록하는 단위
+WRITE_BATCH = 5000
+
+# 도달하지 못한 노드의 깊이 (array 'H')
+NO_DEPTH = 0xFFFF
+
+# 노드 상태: 등록만 됨 / 요청 대기 또는 완료
+KNOWN, QUEUED = 0, 1
+
+# 따라가지 않는 href
+_SKIP_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS graph_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,                 -- UrlIndex 노드 번호
+    url TEXT NOT NULL,
+    in_sitemap INTEGER NOT NULL DEFAULT 0,
+    found_on INTEGER,                       -- 처음 링크로 발견한 페이지 (사이트맵/시작 URL이면 NULL)
+    status_code INTEGER,                    -- 요청하지 않은 노드는 NULL
+    outlinks INTEGER NOT NULL DEFAULT 0,
+    inlinks INTEGER NOT NULL DEFAULT 0,
+    depth INTEGER                           -- 시작 페이지에서의 클릭 깊이 (도달할 수 없으면 NULL)
+);
+CREATE TABLE IF NOT EXISTS edges (
+    src INTEGER NOT NULL,
+    dst INTEGER NOT NULL,
+    PRIMARY KEY (src, dst)
+) WITHOUT ROWID;
+"""
+
+PAGE_FIELDNAMES = ['URL', 'In_Sitemap', 'Status', 'Depth', 'Inlinks', 'Outlinks', 'Found_On']
+ORPHAN_FIELDNAMES = ['URL', 'Issue', 'Status', 'Depth', 'Inlinks']
+NOT_IN_SITEMAP_FIELDNAMES = ['URL', 'Depth', 'Inlinks', 'Outlinks', 'Found_On']
+
+def url_hash(key):
+    """정규화 URL의 64비트 해시 (0은 빈 칸 표시로 쓰므로 제외)"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+
+def resolve_link(base, href):
+    """href를 절대 URL로 바꿉니다 (프래그먼트 제거). http(s)가 아니면 None"""
+    if href.startswith(_SKIP_PREFIXES):
+        return None
+    try:
+        url = urldefrag(urljoin(base, href))[0]
+    except ValueError:
+        return None
+    return url if url.startswith(('http://', 'https://')) else None
+
+class UrlIndex:
+    """
+    64비트 URL 해시 → 노드 번호 (선형 탐사 해시 테이블)
+    키와 번호를 array에 두므로 칸당 12바이트이며, 사용률이 70%를 넘으면 두 배로 늘립니다.
+    """
+    def __init__(self, capacity=1 << 16):
+        self._keys = array('Q', [0]) * capacity
+        self._ids = array('I', [0]) * capacity
+        self._mask = capacity - 1
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, key):
+        keys, mask = self._keys, self._mask
+        slot = key & mask
+        while True:
+            found = keys[slot]
+            if found == key or found == 0:
+                return slot
+            slot = (slot + 1) & mask
+
+    def get(self, key):
+        slot = self._slot(key)
+        return self._ids[slot] if self._keys[slot] else None
+
+    def add(self, key):
+        """새 키면 다음 노드 번호를 부여합니다. 반환값: (노드 번호, 새 키 여부)"""
+        slot = self._slot(key)
+        if self._keys[slot]:
+            return self._ids[slot], False
+        if (self.count + 1) * 10 > len(self._keys) * 7:
+            self._grow()
+            slot = self._slot(key)
+        node = self.count
+        self._keys[slot] = key
+        self._ids[slot] = node
+        self.count += 1
+        return node, True
+
+    def _grow(self):
+        keys, ids = self._keys, self._ids
+        capacity = len(keys) * 2
+        self._keys = array('Q', [0]) * capacity
+        self._ids = array('I', [0]) * capacity
+        self._mask = capacity - 1
+        for key, node in zip(keys, ids):
+            if key:
+                slot = self._slot(key)
+                self._keys[slot] = key
+                self._ids[slot] = node
+
+class LinkGraph:
+    """
+    링크 그래프 저장소
+    탐색 중에는 노드별 상태/링크 단계/내부 링크 수만 배열로 유지하고, 노드·간선은 WRITE_BATCH개씩 SQLite에 기록합니다.
+    같은 호스트(정규화 기준, www. 무시)의 URL만 노드가 됩니다.
+    """
+    def __init__(self, path, start_url):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.site_host = canonicalize(start_url).partition('/')[0]
+        self.index = UrlIndex()
+        self.state = array('B')
+        self.link_depth = array('H')  # 탐색 시 시작점에서 따라온 링크 단계
+        self.inlinks = array('I')
+        self.edge_count = 0
+        self._nodes = []
+        self._sitemap_marks = []
+        self._edges = []
+        self._pages = []
+
+    def __len__(self):
+        return len(self.index)
+
+    def add_node(self, url, in_sitemap=False, found_on=None):
+        """URL을 노드로 등록합니다. 반환값: (노드 번호, 새 노드 여부), 다른 호스트이거나 제외 대상이면 (None, False)"""
+        key = canonicalize(url)
+        host, _, path = key.partition('/')
+        if host != self.site_host or path.partition('?')[0].lower().endswith(DISCOVERY_SKIP_EXTENSIONS):
+            return None, False
+        node, new = self.index.add(url_hash(key))
+        if new:
+            self.state.append(KNOWN)
+            self.link_depth.append(NO_DEPTH)
+            self.inlinks.append(0)
+            self._nodes.append((node, url, int(in_sitemap), found_on))
+        elif in_sitemap:
+            self._sitemap_marks.append((node,))
+        self._maybe_flush()
+        return node, new
+
+    def add_edges(self, src, targets):
+        """src 페이지의 링크 대상(노드 번호 집합)을 기록합니다. 페이지마다 한 번만 호출합니다."""
+        targets.discard(src)
+        inlinks = self.inlinks
+        for dst in targets:
+            inlinks[dst] += 1
+        self._edges.extend((src, dst) for dst in targets)
+        self.edge_count += len(targets)
+        self._maybe_flush()
+
+    def set_page(self, node, status_code, outlinks):
+        self._pages.append((status_code, outlinks, node))
+        self._maybe_flush()
+
+    def set_info(self, **values):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO graph_info (key, value) VALUES (?, ?)",
+                                  [(key, str(value)) for key, value in values.items()])
+
+    def _maybe_flush(self):
+        if max(len(self._nodes), len(self._sitemap_marks), len(self._edges), len(self._pages)) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        with self.conn:
+            if self._nodes:
+                self.conn.executemany("INSERT INTO nodes (id, url, in_sitemap, found_on) VALUES (?, ?, ?, ?)",
+                                      self._nodes)
+            if self._sitemap_marks:
+                self.conn.executemany("UPDATE nodes SET in_sitemap = 1 WHERE id = ?", self._sitemap_marks)
+            if self._edges:
+                self.conn.executemany("INSERT OR IGNORE INTO edges (src, dst) VALUES (?, ?)", self._edges)
+            if self._pages:
+                self.conn.executemany("UPDATE nodes SET status_code = ?, outlinks = ? WHERE id = ?", self._pages)
+        self._nodes, self._sitemap_marks, self._edges, self._pages = [], [], [], []
+
+    def finish(self, start):
+        """남은 기록을 저장하고, 시작 노드 기준 클릭 깊이와 내부 링크 수를 노드 테이블에 기록합니다."""
+        self.flush()
+        offsets, targets = load_csr(self.conn, len(self))
+        depths = click_depths(offsets, targets, start)
+        inlinks = self.inlinks
+        with self.conn:
+            self.conn.executemany("UPDATE nodes SET inlinks = ?, depth = ? WHERE id = ?",
+                                  ((inlinks[node], None if depth == NO_DEPTH else depth, node)
+                                   for node, depth in enumerate(depths)))
+
+    def close(self):
+        self.conn.close()
+
+def load_csr(conn, node_count):
+    """
+    간선을 CSR 배열로 읽습니다. targets[offsets[n]:offsets[n + 1]]이 노드 n의 링크 대상입니다.
+    (edges는 (src, dst) 기본 키 순서로 저장되어 있어 정렬 없이 순서대로 읽음)
+    """
+    offsets = array('I', [0]) * (node_count + 1)
+    targets = array('I')
+    for src, dst in conn.execute("SELECT src, dst FROM edges ORDER BY src, dst"):
+        offsets[src + 1] += 1
+        targets.append(dst)
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+    return offsets, targets
+
+def click_depths(offsets, targets, start):
+    """시작 노드에서 링크를 따라 도달하는 최소 단계 수 (도달할 수 없으면 NO_DEPTH)"""
+    depths = array('H', [NO_DEPTH]) * (len(offsets) - 1)
+    depths[start] = 0
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        depth = min(depths[node] + 1, NO_DEPTH - 1)
+        for dst in targets[offsets[node]:offsets[node + 1]]:
+            if depths[dst] == NO_DEPTH:
+                depths[dst] = depth
+                queue.append(dst)
+    return depths
+
+class LinkCrawler:
+    """
+    링크 단계 순서(너비 우선)로 URL을 분석기에 공급하고, 분석 결과의 링크를 그래프와 대기열에 반영합니다.
+    대기열에는 요청할 URL만 들어가며, 최대 페이지 수를 넘겨 넣지 않으므로 크기가 max_pages로 제한됩니다.
+    """
+    def __init__(self, graph, max_depth=DISCOVERY_MAX_DEPTH, max_pages=DISCOVERY_MAX_PAGES):
+        self.graph = graph
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.rules = DEFAULT_RULES + (LinkRule(DISCOVERY_MAX_LINKS),)
+        self.frontier = deque()   # (URL, 노드 번호)
+        self.in_flight = {}       # 분석 중인 URL → 노드 번호
+        self.queued = 0
+        self.crawled = 0
+        self.page_limited = False  # 최대 페이지 수 때문에 요청하지 못한 링크가 있음
+        self.depth_limited = False # 최대 링크 단계 때문에 요청하지 못한 링크가 있음
+        self._wakeup = asyncio.Event()
+
+    def enqueue(self, node, url, depth):
+        graph = self.graph
+        if graph.state[node] != KNOWN:
+            return
+        if depth > self.max_depth:
+            self.depth_limited = True
+            return
+        if self.queued >= self.max_pages:
+            self.page_limited = True
+            return
+        graph.state[node] = QUEUED
+        graph.link_depth[node] = depth
+        self.queued += 1
+        self.frontier.append((url, node))
+
+    async def urls(self):
+        """대기열의 URL을 내보내고, 비었을 때 분석 중인 페이지가 있으면 새 링크가 들어올 때까지 기다립니다."""
+        while True:
+            while self.frontier:
+                url, node = self.frontier.popleft()
+                self.in_flight[url] = node
+                yield url
+            if not self.in_flight:
+                return
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def _follow_links(self, node, result, depth):
+        """페이지의 링크를 노드로 등록하고 다음 링크 단계로 대기열에 넣습니다. 반환값: 링크 대상 노드 집합"""
+        targets = set()
+        if 'nofollow' in result.get('robots', ''):
+            return targets
+        base = result['final_url']
+        if result.get('base_href'):
+            base = urljoin(base, result['base_href'])
+        for href in result.get('links', ()):
+            url = resolve_link(base, href)
+            if url is None:
+                continue
+            target, _ = self.graph.add_node(url, found_on=node)
+            if target is not None:
+                targets.add(target)
+                self.enqueue(target, url, depth + 1)
+        return targets
+
+    def handle(self, result):
+        graph = self.graph
+        node = self.in_flight.pop(result['url'])
+        depth = graph.link_depth[node]
+        hops = result.get('redirects') or []
+        if not hops:
+            targets = self._follow_links(node, result, depth)
+            graph.add_edges(node, targets)
+            graph.set_page(node, result['status_code'], len(targets))
+        else:
+            # 결과의 링크는 리다이렉트를 따라간 최종 페이지에서 수집한 것
+            final, _ = graph.add_node(result['final_url'], found_on=node)
+            if final == node:
+                # 정규화하면 같은 URL(스킴, www., 끝 슬래시만 다름)이면 최종 페이지의 링크가 곧 이 노드의 링크
+                targets = self._follow_links(node, result, depth)
+                graph.add_edges(node, targets)
+                graph.set_page(node, result['status_code'], len(targets))
+            else:
+                # 리다이렉트는 최종 URL로 가는 링크 하나로 기록 (클릭이 아니므로 같은 단계)
+                targets = {final} if final is not None else set()
+                graph.add_edges(node, targets)
+                graph.set_page(node, hops[0]['status'], len(targets))
+                if final is not None and graph.state[final] == KNOWN:
+                    # 최종 페이지는 이미 받았으므로 다시 요청하지 않고 여기서 그 페이지의 링크를 반영
+                    graph.state[final] = QUEUED
+                    graph.link_depth[final] = depth
+                    links = self._follow_links(final, result, depth)
+                    graph.add_edges(final, links)
+                    graph.set_page(final, result['status_code'], len(links))
+        self.crawled += 1
+        self._wakeup.set()
+
+async def discover_async(graph, crawler, sitemap_url, start_url, seed_sitemap=False,
+                         concurrency=CONCURRENT_REQUESTS, parse_workers=PARSE_WORKERS):
+    """사이트맵 URL을 등록한 뒤 시작 URL부터 링크를 따라 탐색합니다. 반환값: (시작 노드 번호, 사이트맵 URL 수)"""
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                     trace_configs=[http_trace_config()]) as session:
+        start, _ = graph.add_node(start_url)
+        if start is None:
+            raise ValueError(f"탐색할 수 없는 시작 URL입니다: {start_url}")
+        crawler.enqueue(start, start_url, 0)
+        sitemap_count = 0
+        async for url in iter_sitemap_urls_async(sitemap_url, session):
+            node, _ = graph.add_node(url, in_sitemap=True)
+            if node is None:
+                continue
+            sitemap_count += 1
+            if seed_sitemap:
+                crawler.enqueue(node, url, 0)
+        print(f"사이트맵 URL {sitemap_count}개 등록, 탐색 시작: {start_url}")
+
+        # HTTP 캐시는 링크를 저장하지 않으므로 사용하지 않음
+        async for result in iter_analyze_results(crawler.urls(), session=session, concurrency=concurrency,
+                                                 parse_workers=parse_workers, limiter=HostLimiter(),
+                                                 rules=crawler.rules):
+            crawler.handle(result)
+            if crawler.crawled % 500 == 0:
+                print(f"  - 페이지 {crawler.crawled}개 / 대기 {len(crawler.frontier)}개, "
+                      f"노드 {len(graph)}개, 링크 {graph.edge_count}개")
+    return start, sitemap_count
+
+def write_link_reports(graph_path, reports_dir, tag):
+    """저장된 링크 그래프로 페이지/고아 페이지/사이트맵 누락 CSV를 만들고 요약 dict를 반환합니다."""
+    conn = sqlite3.connect(graph_path)
+    try:
+        pages_filename = os.path.join(reports_dir, f"link_pages_{tag}.csv")
+        with open(pages_filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(PAGE_FIELDNAMES)
+            writer.writerows(conn.execute(
+                "SELECT n.url, n.in_sitemap, n.status_code, n.depth, n.inlinks, n.outlinks, f.url "
+                "FROM nodes n LEFT JOIN nodes f ON f.id = n.found_on ORDER BY n.depth IS NULL, n.depth, n.id"))
+
+        # 시작 페이지(깊이 0)는 내부 링크가 없어도 고아가 아님
+        orphans_filename = os.path.join(reports_dir, f"link_orphans_{tag}.csv")
+        with open(orphans_filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(ORPHAN_FIELDNAMES)
+            writer.writerows(conn.execute(
+                "SELECT url, CASE WHEN inlinks = 0 THEN 'No internal links' ELSE 'Not reachable from start page' END, "
+                "status_code, depth, inlinks FROM nodes "
+                "WHERE in_sitemap = 1 AND (depth IS NULL OR (inlinks = 0 AND depth > 0)) ORDER BY inlinks, id"))
+
+        missing_filename = os.path.join(reports_dir, f"link_not_in_sitemap_{tag}.csv")
+        with open(missing_filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(NOT_IN_SITEMAP_FIELDNAMES)
+            writer.writerows(conn.execute(
+                "SELECT n.url, n.depth, n.inlinks, n.outlinks, f.url FROM nodes n LEFT JOIN nodes f ON f.id = n.found_on "
+                "WHERE n.in_sitemap = 0 AND n.status_code = 200 ORDER BY n.depth IS NULL, n.depth, n.inlinks DESC"))
+
+        def count(sql):
+            return conn.execute(sql).fetchone()[0]
+        return {
+            'nodes': count("SELECT COUNT(*) FROM nodes"),
+            'edges': count("SELECT COUNT(*) FROM edges"),
+            'sitemap': count("SELECT COUNT(*) FROM nodes WHERE in_sitemap = 1"),
+            'crawled': count("SELECT COUNT(*) FROM nodes WHERE status_code IS NOT NULL"),
+            'orphans': count("SELECT COUNT(*) FROM nodes WHERE in_sitemap = 1 AND (depth IS NULL OR (inlinks = 0 AND depth > 0))"),
+            'not_in_sitemap': count("SELECT COUNT(*) FROM nodes WHERE in_sitemap = 0 AND status_code = 200"),
+            'depths': conn.execute("SELECT depth, COUNT(*) FROM nodes WHERE depth IS NOT NULL "
+                                   "GROUP BY depth ORDER BY depth").fetchall(),
+            'info': dict(conn.execute("SELECT key, value FROM graph_info")),
+            'pages_filename': pages_filename,
+            'orphans_filename': orphans_filename,
+            'missing_filename': missing_filename,
+        }
+    finally:
+        conn.close()
+
+def print_summary(summary):
+    print("\n===== 내부 링크 탐색 결과 =====")
+    print(f"노드(URL): {summary['nodes']}개, 링크: {summary['edges']}개, 요청한 페이지: {summary['crawled']}개")
+    print(f"사이트맵 URL: {summary['sitemap']}개")
+    print(f"- 고아 페이지(내부 링크 없음/도달 불가): {summary['orphans']}개")
+    print(f"- 사이트맵에 없는 페이지: {summary['not_in_sitemap']}개")
+    print("클릭 깊이별 페이지 수: " + ', '.join(f"{depth}단계 {count}개" for depth, count in summary['depths']))
+    info = summary['info']
+    if info.get('page_limited') == 'True':
+        print(f"[!] 최대 페이지 수({info.get('max_pages')})에 도달해 따라가지 못한 링크가 있습니다. "
+              f"고아 페이지/내부 링크 수는 탐색한 페이지 기준입니다 (--max-pages로 늘릴 수 있음).")
+    if info.get('depth_limited') == 'True':
+        print(f"[!] 최대 링크 단계({info.get('max_depth')})보다 깊은 링크는 따라가지 않았습니다.")
+    print(f"\n리포트 저장: {summary['pages_filename']}")
+    print(f"            {summary['orphans_filename']}")
+    print(f"            {summary['missing_filename']}")
+
+def discover(sitemap_url, start_url=None, max_depth=DISCOVERY_MAX_DEPTH, max_pages=DISCOVERY_MAX_PAGES,
+             seed_sitemap=False, concurrency=CONCURRENT_REQUESTS, reports_dir=REPORTS_DIR, graph_dir=LINK_GRAPH_DIR):
+    """
+    링크 탐색 후 그래프를 저장하고 리포트를 만듭니다. 반환값: 리포트 요약 dict
+    start_url: 탐색 시작 URL (생략하면 사이트맵 호스트의 첫 페이지)
+    seed_sitemap: 사이트맵 URL도 시작점(0단계)으로 요청하여, 사이트맵 페이지의 링크까지 내부 링크 수에 반영합니다
+    """
+    if start_url is None:
+        parts = urlsplit(sitemap_url)
+        start_url = f"{parts.scheme}://{parts.netloc}/"
+    domain = urlsplit(start_url).hostname or start_url
+    tag = f"{re.sub(r'[^0-9A-Za-z.-]', '_', domain)}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(reports_dir, exist_ok=True)
+    graph = LinkGraph(os.path.join(graph_dir, f"{tag}.db"), start_url)
+    crawler = LinkCrawler(graph, max_depth, max_pages)
+    graph.set_info(sitemap_url=sitemap_url, start_url=start_url, max_depth=max_depth, max_pages=max_pages,
+                   started_at=datetime.datetime.now().isoformat(timespec='seconds'))
+    try:
+        start, _ = asyncio.run(discover_async(graph, crawler, sitemap_url, start_url, seed_sitemap, concurrency))
+        graph.finish(start)
+        graph.set_info(page_limited=crawler.page_limited, depth_limited=crawler.depth_limited,
+                       finished_at=datetime.datetime.now().isoformat(timespec='seconds'))
+    finally:
+        graph.flush()
+        graph.close()
+    return write_link_reports(graph.path, reports_dir, tag)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="내부 링크 그래프 탐색 (사이트맵에 없는 페이지, 고아 페이지, 클릭 깊이)")
+    parser.add_argument('sitemap_url', nargs='?', help="비교할 사이트맵 URL")
+    parser.add_argument('--start', help="탐색 시작 URL (기본값: 사이트맵 호스트의 첫 페이지)")
+    parser.add_argument('--max-depth', type=int, default=DISCOVERY_MAX_DEPTH,
+                        help=f"시작점에서 따라가는 최대 링크 단계 (기본값: {DISCOVERY_MAX_DEPTH})")
+    parser.add_argument('--max-pages', type=int, default=DISCOVERY_MAX_PAGES,
+                        help=f"요청하는 최대 페이지 수 (기본값: {DISCOVERY_MAX_PAGES})")
+    parser.add_argument('--seed-sitemap', action='store_true',
+                        help="사이트맵 URL도 탐색 시작점으로 요청 (사이트맵 페이지의 링크까지 내부 링크 수에 반영)")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENT_REQUESTS)
+    parser.add_argument('--reports-dir', default=REPORTS_DIR)
+    parser.add_argument('--report', metavar='DB', help="탐색 없이 저장된 링크 그래프(.db)로 리포트만 다시 생성")
+    args = parser.parse_args(argv)
+
+    if args.report:
+        if not os.path.exists(args.report):
+            print(f"링크 그래프 파일이 없습니다: {args.report}")
+            return 1
+        os.makedirs(args.reports_dir, exist_ok=True)
+        tag = os.path.splitext(os.path.basename(args.report))[0]
+        print_summary(write_link_reports(args.report, args.reports_dir, tag))
+        return 0
+    if not args.sitemap_url:
+        parser.error("사이트맵 URL 또는 --report가 필요합니다.")
+
+    print(f"[내부 링크 탐색] 최대 {args.max_depth}단계, 최대 {args.max_pages}페이지")
+    try:
+        summary = discover(args.sitemap_url, args.start, args.max_depth, args.max_pages, args.seed_sitemap,
+                           args.concurrency, args.reports_dir)
+    except SitemapError as e:
+        # 사이트맵 URL 목록이 불완전하면 고아/사이트맵 누락 판정이 틀리므로 리포트를 만들지 않음
+        print(f"[!] 사이트맵을 모두 읽지 못했습니다: {e}")
+        return 1
+    print_summary(summary)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
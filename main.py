@@ -1,12 +1,24 @@
+import argparse
 import asyncio
 import datetime
-import csv
 import os
-from sitemap_parser import get_sitemap_urls
+import sys
+import time
+
+import aiohttp
+
+from config import CONCURRENT_REQUESTS, ENGINES, INCREMENTAL_STALE_DAYS
+from history import IndexHistory, write_diff_report
+from host_limiter import HostLimiter
+from http_cache import HttpCache
 from index_checker import get_domain_from_url
+from metrics import METRICS, http_trace_config
+from run_store import RunStore
 from seo_analyzer import analyze_urls_async
-from utils import CsvLogger, normalize_url
-import sys
+from serp_cache import SerpCache
+from sitemap_parser import SitemapError, iter_sitemap_entries_async
+from state_store import UrlStateStore
+from url_canon import canonical_set, canonicalize
 
 # Windows asyncio policy
 if sys.platform == 'win32':
@@ -34,16 +46,275 @@ def save_history(url, history):
     with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
         json.dump(history, f, ensure_ascii=False, indent=2)
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SEO Indexing & Analysis Tool")
+    parser.add_argument('sitemap_url', nargs='?', help="진단할 Sitemap URL (생략 시 대화형으로 선택)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="새 URL, lastmod가 갱신된 URL, 지난번 실패한 URL, 오래된 결과만 다시 분석")
+    parser.add_argument('--stale-days', type=float, default=INCREMENTAL_STALE_DAYS,
+                        help=f"증분 실행 시 이 기간(일)보다 오래된 결과는 재분석 (기본값: {INCREMENTAL_STALE_DAYS})")
+    parser.add_argument('--refresh-engines', nargs='*', choices=list(ENGINES), metavar='ENGINE',
+                        help="캐시된 검색 엔진 결과를 무시하고 다시 수집 (엔진 생략 시 전체: google naver bing)")
+    parser.add_argument('--resume', type=int, metavar='RUN',
+                        help="중단된 실행을 이어서 진행 (기록된 URL과 검색 엔진 결과는 건너뛰고 같은 run에 기록)")
+    args = parser.parse_args(argv)
+    if args.refresh_engines is None:
+        args.refresh_engines = ()
+    elif not args.refresh_engines:
+        args.refresh_engines = tuple(ENGINES)
+    return args
+
+# 엔진별 수집 페이지 수: 네이버는 5페이지까지 (약 50개), Google/Bing은 3페이지 시도
+ENGINE_PAGES = {'naver': 5, 'google': 3, 'bing': 3}
+
+async def crawl_all_engines(domain, refresh_engines=(), serp_cache=None, close_pool=True, engines=None,
+                            finished=None):
+    """
+    세 검색 엔진을 동시에 수집합니다.
+    엔진별 대기 시간(human_delay 등)은 각 크롤러 안에서 따로 적용되므로 서로의 속도에 영향을 주지 않습니다.
+    TTL 안에 수집한 결과는 SERP 캐시에서 재사용하며, 모두 캐시되어 있으면 브라우저를 실행하지 않습니다.
+    refresh_engines: 캐시를 무시하고 다시 수집할 엔진 목록
+    serp_cache: 공유할 SerpCache (생략하면 새로 열고 끝나면 닫음)
+    close_pool: False면 수집 후에도 공유 브라우저 풀을 유지합니다 (여러 도메인을 이어서 수집할 때)
+    engines: 수집할 엔진 목록 (생략하면 전체)
+    finished: 지정한 set에 검색 결과 끝(또는 최대 페이지)까지 수집한 엔진을 추가합니다.
+              캡차/차단/오류로 중간에 멈춘 엔진은 빈 결과라도 넣지 않습니다 (SERP 캐시에 저장된 페이지로 판단)
+    """
+    from browser_pool import close_shared_pool
+    from index_checker import crawl_search_results_playwright
+    
+    engines = list(ENGINE_PAGES) if engines is None else list(engines)
+    own_cache = serp_cache is None
+    if own_cache:
+        serp_cache = SerpCache()
+    started = time.time()
+    try:
+        # 브라우저는 공유 풀에서 처음 필요할 때 한 번만 실행하고 엔진별로 탭만 새로 엽니다
+        with METRICS.timer('stage_seconds', stage='engines'):
+            results = await asyncio.gather(
+                *(crawl_search_results_playwright(f"https://{domain}", engine, max_pages=ENGINE_PAGES[engine],
+                                                  serp_cache=serp_cache, refresh=engine in refresh_engines)
+                  for engine in engines),
+                return_exceptions=True)
+        if finished is not None:
+            for engine, urls in zip(engines, results):
+                if not isinstance(urls, BaseException) and serp_cache.crawl_finished(
+                        engine, domain, ENGINE_PAGES[engine], started, refresh=engine in refresh_engines):
+                    finished.add(engine)
+    finally:
+        if close_pool:
+            await close_shared_pool()
+        if own_cache:
+            serp_cache.close()
+    engine_urls = {}
+    for engine, urls in zip(engines, results):
+        if isinstance(urls, BaseException):
+            print(f"  [{engine}] 수집 오류: {urls}")
+            urls = set()
+        engine_urls[engine] = urls
+    return engine_urls
+
+async def run_pipeline(sitemap_url, args, cache, state, store, limiter, resume=None):
+    """
+    사이트맵 스트리밍 → SEO 분석을 진행하는 동안 검색 엔진 수집을 별도 태스크로 함께 실행합니다.
+    인덱싱 여부는 둘 다 끝난 뒤 리포트 단계에서 결합합니다.
+    resume: 이어서 진행할 실행 정보(RunStore.run_info). 이미 기록된 URL은 건너뛰고,
+            끝까지 수집해 저장된 검색 엔진 결과가 있으면 그 엔진은 다시 수집하지 않습니다.
+    반환값: (domain, run_id, {engine: 수집된 URL}) / URL이 없으면 None
+    내려받지 못한 사이트맵이 있으면 SitemapError (실행은 끝나지 않은 상태로 남아 --resume으로 다시 시도 가능)
+    """
+    # 요청별 DNS/연결/TTFB 시간은 세션의 TraceConfig로 기록
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=CONCURRENT_REQUESTS),
+                                     trace_configs=[http_trace_config()]) as session:
+        entries = iter_sitemap_entries_async(sitemap_url, session=session, cache=cache)
+        first = await anext(entries, None)
+        if first is None:
+            return None
+        
+        if resume is None:
+            domain = get_domain_from_url(first['loc'])
+            run_id = store.start_run(domain, sitemap_url)
+        else:
+            domain, run_id = resume['domain'], resume['id']
+        
+        # 2. 검색 엔진 크롤링 (Playwright 사용) - 분석과 동시에 진행, 끝까지 수집한 엔진만 실행에 저장(체크포인트)
+        saved_engine_urls = store.engine_results(run_id) if resume is not None else {}
+        missing = [engine for engine in ENGINE_PAGES if engine not in saved_engine_urls]
+        if saved_engine_urls:
+            print(f"\n[2/5] 검색 엔진 수집 결과 재사용 (run #{run_id}에 저장된 결과: {', '.join(saved_engine_urls)})")
+        if not missing:
+            engine_task = asyncio.get_running_loop().create_future()
+            engine_task.set_result(saved_engine_urls)
+        else:
+            print(f"\n[2/5] 검색 엔진 인덱싱 목록 수집 시작 (Playwright 브라우저 사용, {', '.join(missing)} 동시 진행)...")
+            print("      * 실제 브라우저를 사용하므로 시간이 다소 걸릴 수 있습니다.")
+            
+            async def collect_engines():
+                # 차단/캡차로 중간에 멈춘 엔진은 저장하지 않아 --resume 때 다시 수집
+                finished = set()
+                engine_urls = await crawl_all_engines(domain, args.refresh_engines, engines=missing, finished=finished)
+                store.save_engine_results(run_id, {engine: engine_urls[engine] for engine in finished})
+                return {**saved_engine_urls, **engine_urls}
+            engine_task = asyncio.create_task(collect_engines())
+        
+        print(f"\n[3/5] SEO 분석 및 결과 저장 중... ('{store.path}', run #{run_id})")
+        lastmods = {}
+        counts = {'found': 0, 'reused': 0, 'done': 0}
+        stale_after = args.stale_days * 86400
+        
+        # 콜백 함수 (인덱싱 여부는 검색 엔진 수집이 끝난 뒤 결합)
+        def on_analyze_complete(result, reused=False):
+            url = result['url']
+            # 분석이 끝난 URL의 lastmod는 바로 버림 (메모리 사용량이 URL 수가 아닌 진행 중인 URL 수에 비례)
+            lastmod = lastmods.pop(url, None)
+            if not reused:
+                state.save(result, lastmod)
+            store.add(run_id, result)
+            print(f"{'Reused' if reused else 'Checked'}: {url} [{result['status_code']}]")
+        
+        async def target_urls():
+            """사이트맵 항목을 받는 대로 분석 대상으로 넘깁니다."""
+            entry = first
+            while entry is not None:
+                url = entry['loc']
+                counts['found'] += 1
+                # 이어서 실행: 이미 기록된 URL은 건너뜀 (실행 결과 저장소의 UNIQUE 인덱스 조회)
+                if resume is not None and store.has_url(run_id, url):
+                    counts['done'] += 1
+                    entry = await anext(entries, None)
+                    continue
+                lastmods[url] = entry['lastmod']
+                # 증분 실행: 변경이 없는 URL은 이전 결과를 리포트에 그대로 반영
+                previous = state.reusable_result(url, entry['lastmod'], stale_after) if args.incremental else None
+                if previous is None:
+                    yield url
+                else:
+                    counts['reused'] += 1
+                    on_analyze_complete(previous, reused=True)
+                entry = await anext(entries, None)
+        
+        sitemap_error = None
+        try:
+            with METRICS.timer('stage_seconds', stage='analysis'):
+                try:
+                    await analyze_urls_async(target_urls(), on_analyze_complete, retain=False,
+                                             limiter=limiter, cache=cache, session=session)
+                except SitemapError as e:
+                    # 받은 URL의 분석은 끝난 상태. 검색 엔진 수집까지 마쳐 저장해 두고 실행은 실패로 처리
+                    sitemap_error = e
+            print(f"\n발견된 URL: {counts['found']}개")
+            if resume is not None:
+                print(f"[이어서 실행] 이전에 완료된 URL {counts['done']}개를 건너뛰었습니다.")
+            if args.incremental:
+                print(f"[증분 실행] 재분석: {counts['found'] - counts['reused']}개 / 이전 결과 재사용: {counts['reused']}개")
+            if not engine_task.done():
+                print("\n  SEO 분석 완료 - 검색 엔진 수집이 끝나기를 기다리는 중...")
+            engine_urls = await engine_task
+        finally:
+            engine_task.cancel()
+        if sitemap_error is not None:
+            raise sitemap_error
+    return domain, run_id, engine_urls
+
+ENGINE_LABELS = {'google': 'Google', 'naver': 'Naver', 'bing': 'Bing'}
+
+def pct(count, total):
+    return f"{count/total*100:.1f}%" if total else "0.0%"
+
+def apply_engine_results(store, run_id, engine_urls):
+    """검색 엔진별 수집 URL을 정규화해 실행 결과의 인덱싱 여부로 반영합니다."""
+    with METRICS.timer('stage_seconds', stage='index_join'):
+        indexed_sets = {engine: canonical_set(urls) for engine, urls in engine_urls.items()}
+        store.apply_index_status(run_id, indexed_sets, canonicalize)
+
+def write_run_reports(store, run_id, domain, reports_dir, tag):
+    """
+    실행 하나의 전체/정렬 리포트와 이전 실행 대비 인덱싱 변화 리포트를 저장합니다.
+    tag: 파일 이름에 붙일 구분자 (예: 타임스탬프)
+    반환값: summary, filename, sorted_filename, diff_filename, diff_count, previous_run을 담은 dict
+    """
+    filename = os.path.join(reports_dir, f"seo_report_{tag}.csv")
+    with METRICS.timer('stage_seconds', stage='reports'):
+        store.export_csv(run_id, filename)
+    
+    # 통계 계산
+    summary = store.summary(run_id)
+    total_urls = summary['total']
+    engine_lines = [f"{label} 인덱싱: {summary['engines'][engine]}개 ({pct(summary['engines'][engine], total_urls)})"
+                    for engine, label in ENGINE_LABELS.items()]
+    
+    sorted_filename = os.path.join(reports_dir, f"seo_report_sorted_{tag}.csv")
+    with METRICS.timer('stage_seconds', stage='reports'):
+        store.export_csv(run_id, sorted_filename, indexed_first=True, header_lines=[
+            "===== SEO 인덱싱 분석 리포트 =====",
+            f"분석 시간: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"대상 도메인: {domain}",
+            "",
+            "[요약 통계]",
+            f"전체 URL 수: {total_urls}",
+            *engine_lines,
+            f"하나 이상 인덱싱: {summary['any_indexed']}개 ({pct(summary['any_indexed'], total_urls)})",
+            f"미인덱싱: {summary['not_indexed']}개 ({pct(summary['not_indexed'], total_urls)})",
+            f"리다이렉트되는 URL: {summary['redirected']}개",
+            "",
+            "===================================",
+            "",
+        ])
+    
+    # 인덱싱 이력 갱신 및 이전 실행 대비 변화 리포트
+    with METRICS.timer('stage_seconds', stage='history'):
+        history = IndexHistory(store)
+        history.record_run(run_id, domain)
+        previous_run = history.previous_run(domain, run_id)
+        diff_filename = diff_count = None
+        if previous_run:
+            diff_filename = os.path.join(reports_dir, f"index_diff_{tag}.csv")
+            diff_count = write_diff_report(diff_filename, history.changes_between_runs(domain, previous_run, run_id))
+    return {
+        'summary': summary,
+        'filename': filename,
+        'sorted_filename': sorted_filename,
+        'diff_filename': diff_filename,
+        'diff_count': diff_count,
+        'previous_run': previous_run,
+    }
+
+def write_metrics(reports_dir, tag):
+    """실행 계측 결과를 JSON/Prometheus 파일로 저장하고 (json, prom) 경로를 반환합니다. 꺼져 있으면 None"""
+    if not METRICS.enabled:
+        return None
+    files = (os.path.join(reports_dir, f"metrics_{tag}.json"), os.path.join(reports_dir, f"metrics_{tag}.prom"))
+    METRICS.write_json(files[0])
+    METRICS.write_prometheus(files[1])
+    return files
+
+def main(argv=None):
+    args = parse_args(argv)
     print("="*60)
     print("SEO Indexing & Analysis Tool v2.2 (History Added)")
     print("="*60)
     
+    # 실행 결과 저장소 (reports 폴더)
+    REPORTS_DIR = "reports"
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    store = RunStore()
+    
+    # 이어서 실행: 중단된 실행의 사이트맵을 그대로 사용
+    resume = None
+    if args.resume is not None:
+        resume = store.run_info(args.resume)
+        if resume is None or resume['status'] == 'finished':
+            print(f"이어서 진행할 수 있는 실행이 아닙니다: run #{args.resume} "
+                  f"({'없음' if resume is None else '이미 완료됨'})")
+            store.close()
+            return
+        print(f"\n[이어서 실행] run #{resume['id']} ({resume['domain']}, 시작: {resume['started_at']})")
+    
     # 히스토리 로드 및 표시
     history = load_history()
-    sitemap_url = ""
+    sitemap_url = resume['sitemap_url'] if resume else (args.sitemap_url or "")
     
-    if history:
+    if history and not sitemap_url:
         print("\n[최근 사용한 사이트맵]")
         for idx, url in enumerate(history, 1):
             print(f" {idx}. {url}")
@@ -61,141 +332,95 @@ def main():
         
     if not sitemap_url:
         print("URL이 입력되지 않았습니다.")
+        store.close()
         return
         
     # 히스토리 저장
     save_history(sitemap_url, history)
         
-    # 1. 사이트맵 파싱
-    print(f"\n[1/4] 사이트맵 파싱 중...")
-    target_urls = get_sitemap_urls(sitemap_url)
-    total_urls = len(target_urls)
-    print(f"발견된 URL: {total_urls}개")
+    # 조건부 요청용 HTTP 캐시 (변경되지 않은 사이트맵/페이지는 이전 결과 재사용)
+    cache = HttpCache()
+    # URL별 lastmod/마지막 분석 결과 (증분 실행용)
+    state = UrlStateStore()
+    # 호스트별 동시 요청 수는 응답 상태에 따라 자동 조절
+    limiter = HostLimiter()
     
-    if total_urls == 0:
+    # 1~3. 사이트맵 파싱 → 검색 엔진 수집과 SEO 분석을 하나의 이벤트 루프에서 동시에 진행
+    print("\n[1/5] 사이트맵 파싱 및 SEO 분석 시작 (검색 엔진 수집과 동시 진행)...")
+    try:
+        with METRICS.timer('stage_seconds', stage='pipeline'):
+            outcome = asyncio.run(run_pipeline(sitemap_url, args, cache, state, store, limiter, resume))
+    except SitemapError as e:
+        run_id = resume['id'] if resume else store.last_run_id
+        store.close()
+        print(f"\n[!] 사이트맵을 모두 읽지 못해 실행을 완료하지 못했습니다: {e}")
+        if run_id is not None:
+            print(f"    'python main.py --resume {run_id}'로 사이트맵을 다시 읽어 남은 URL을 이어서 진행할 수 있습니다.")
+        return 1
+    except BaseException as e:
+        # 버퍼에 남은 결과까지 기록해 두고 이어서 실행하는 방법을 안내
+        run_id = resume['id'] if resume else store.last_run_id
+        store.close()
+        if run_id is not None:
+            print(f"\n중단되었습니다. 'python main.py --resume {run_id}'로 이어서 진행할 수 있습니다.")
+        if not isinstance(e, KeyboardInterrupt):
+            raise
         return
-        
-    domain = get_domain_from_url(target_urls[0])
-    
-    # 2. 검색 엔진 크롤링 (Playwright 사용)
-    print(f"\n[2/5] 검색 엔진 인덱싱 목록 수집 (Playwright 브라우저 사용)...")
-    print(f"      * 실제 브라우저를 사용하므로 시간이 다소 걸릴 수 있습니다.")
-    
-    from index_checker import crawl_search_results_playwright
-    
-    # 네이버는 5페이지까지 (약 50개), Google/Bing은 3페이지 시도
-    async def crawl_all_engines():
-        naver = await crawl_search_results_playwright(f"https://{domain}", 'naver', max_pages=5)
-        google = await crawl_search_results_playwright(f"https://{domain}", 'google', max_pages=3)
-        bing = await crawl_search_results_playwright(f"https://{domain}", 'bing', max_pages=3)
-        return naver, google, bing
+    finally:
+        cache.close()
+        state.close()
     
-    naver_urls, google_urls, bing_urls = asyncio.run(crawl_all_engines())
-    
-    print(f"\n  === 수집 결과 ===")
-    print(f"  - Naver: {len(naver_urls)}개 {'✓' if naver_urls else '(수집 실패)'}")
-    print(f"  - Google: {len(google_urls)}개 {'✓' if google_urls else '(캡차로 인해 수집 불가 - 수동 확인 필요)'}")
-    print(f"  - Bing: {len(bing_urls)}개 {'✓' if bing_urls else '(수집 불가 - 수동 확인 필요)'}")
-    
-    # 비교를 위한 정규화 세트 생성
-    google_norm = {normalize_url(u) for u in google_urls}
-    naver_norm = {normalize_url(u) for u in naver_urls}
-    bing_norm = {normalize_url(u) for u in bing_urls}
+    if outcome is None:
+        print("발견된 URL: 0개")
+        store.close()
+        return
+    domain, run_id, engine_urls = outcome
+    store.finish_run(run_id)
     
-    # 3. CSV 저장 설정 (reports 폴더에 저장)
-    REPORTS_DIR = "reports"
-    os.makedirs(REPORTS_DIR, exist_ok=True)
+    print("\n  === 수집 결과 ===")
+    print(f"  - Naver: {len(engine_urls['naver'])}개 {'✓' if engine_urls['naver'] else '(수집 실패)'}")
+    print(f"  - Google: {len(engine_urls['google'])}개 {'✓' if engine_urls['google'] else '(캡차로 인해 수집 불가 - 수동 확인 필요)'}")
+    print(f"  - Bing: {len(engine_urls['bing'])}개 {'✓' if engine_urls['bing'] else '(수집 불가 - 수동 확인 필요)'}")
     
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(REPORTS_DIR, f"seo_report_{timestamp}.csv")
-    # Bing 컬럼 추가
-    fieldnames = ['URL', 'Google_Index', 'Naver_Index', 'Bing_Index', 'Status', 'Title', 'Issues']
-    logger = CsvLogger(filename, fieldnames)
+    # 4. 인덱싱 여부 결합 (비교를 위한 정규화 세트와 저장된 분석 결과를 매칭)
+    print(f"\n[4/5] 인덱싱 여부 결합 중... ('{store.path}', run #{run_id})")
+    apply_engine_results(store, run_id, engine_urls)
     
-    print(f"\n[3/4] SEO 분석 및 결과 저장 중... ('{filename}')")
+    # 리포트 파일 이름은 실행 시작 시각 기준 (이어서 실행해도 같은 파일에 기록)
+    timestamp = datetime.datetime.strptime(store.run_info(run_id)['started_at'],
+                                           '%Y-%m-%d %H:%M:%S').strftime("%Y%m%d_%H%M%S")
     
-    # 결과 버퍼 (정렬용)
-    results_buffer = []
-
-    # 콜백 함수
-    def on_analyze_complete(result):
-        url = result['url']
-        url_n = normalize_url(url)
-        
-        # 정확한 매칭을 위해 Set 조회 (`in` 연산자)
-        is_google = "O" if url_n in google_norm else "X"
-        is_naver = "O" if url_n in naver_norm else "X"
-        is_bing = "O" if url_n in bing_norm else "X"
-        
-        row = {
-            'URL': url,
-            'Google_Index': is_google,
-            'Naver_Index': is_naver,
-            'Bing_Index': is_bing,
-            'Status': result['status_code'],
-            'Title': result['title'],
-            'Issues': " | ".join(result['issues']) if result['issues'] else "None"
-        }
-        logger.log(row)
-        results_buffer.append(row)
-        
-        # 콘솔 출력 개선 (인덱싱 상태 표시)
-        idx_status = f"G:{is_google} N:{is_naver} B:{is_bing}"
-        print(f"Checked: {url} [{result['status_code']}] [{idx_status}]")
-
-    # 4. 실행
-    asyncio.run(analyze_urls_async(target_urls, on_analyze_complete))
+    print("\n  === 호스트별 처리율 ===")
+    for host, stats in limiter.snapshot().items():
+        print(f"  - {host}: 평균 {stats['avg_rate']} req/s, 동시 요청 한도 {stats['limit']}, "
+              f"요청 {stats['requests']}회 (제한/오류 응답 {stats['throttled']}회)")
     
-    # 5. 정렬된 결과 파일 생성 (상단에 요약 포함)
-    print(f"\n[5/5] 인덱싱된 항목을 상단으로 정렬하여 별도 저장 중...")
+    # 5~6. 리포트 내보내기 (정렬 리포트는 상단에 요약 포함) 및 이전 실행 대비 변화 리포트
+    print("\n[5/5] 리포트 생성 중 (인덱싱된 항목을 상단으로 정렬한 리포트 포함)...")
+    report = write_run_reports(store, run_id, domain, REPORTS_DIR, timestamp)
+    store.close()
     
-    # 통계 계산
-    total_urls = len(results_buffer)
-    google_indexed = sum(1 for r in results_buffer if r['Google_Index'] == 'O')
-    naver_indexed = sum(1 for r in results_buffer if r['Naver_Index'] == 'O')
-    bing_indexed = sum(1 for r in results_buffer if r['Bing_Index'] == 'O')
-    any_indexed = sum(1 for r in results_buffer if r['Google_Index'] == 'O' or r['Naver_Index'] == 'O' or r['Bing_Index'] == 'O')
-    not_indexed = total_urls - any_indexed
-    
-    # 정렬
-    results_buffer.sort(key=lambda r: ( 
-        1 if (r['Google_Index']=='O' or r['Naver_Index']=='O' or r['Bing_Index']=='O') else 0 
-    ), reverse=True)
-    
-    sorted_filename = os.path.join(REPORTS_DIR, f"seo_report_sorted_{timestamp}.csv")
-    with open(sorted_filename, 'w', newline='', encoding='utf-8-sig') as f:
-        # 요약 통계 헤더
-        f.write("# ===== SEO 인덱싱 분석 리포트 =====\n")
-        f.write(f"# 분석 시간: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"# 대상 도메인: {domain}\n")
-        f.write(f"# \n")
-        f.write(f"# [요약 통계]\n")
-        f.write(f"# 전체 URL 수: {total_urls}\n")
-        f.write(f"# Google 인덱싱: {google_indexed}개 ({google_indexed/total_urls*100:.1f}%)\n")
-        f.write(f"# Naver 인덱싱: {naver_indexed}개 ({naver_indexed/total_urls*100:.1f}%)\n")
-        f.write(f"# Bing 인덱싱: {bing_indexed}개 ({bing_indexed/total_urls*100:.1f}%)\n")
-        f.write(f"# 하나 이상 인덱싱: {any_indexed}개 ({any_indexed/total_urls*100:.1f}%)\n")
-        f.write(f"# 미인덱싱: {not_indexed}개 ({not_indexed/total_urls*100:.1f}%)\n")
-        f.write(f"# \n")
-        f.write(f"# ===================================\n")
-        f.write(f"# \n")
-        
-        # 데이터 헤더 및 내용
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results_buffer)
+    # 7. 실행 계측 결과 내보내기 (지연 시간 분포, 단계별 소요 시간)
+    metrics_files = write_metrics(REPORTS_DIR, timestamp)
     
     # 콘솔에도 요약 출력
-    print(f"\n===== 분석 결과 요약 =====")
+    summary = report['summary']
+    total_urls = summary['total']
+    print("\n===== 분석 결과 요약 =====")
     print(f"전체 URL: {total_urls}개")
-    print(f"Google 인덱싱: {google_indexed}개 ({google_indexed/total_urls*100:.1f}%)")
-    print(f"Naver 인덱싱: {naver_indexed}개 ({naver_indexed/total_urls*100:.1f}%)")
-    print(f"Bing 인덱싱: {bing_indexed}개 ({bing_indexed/total_urls*100:.1f}%)")
-    print(f"미인덱싱: {not_indexed}개")
-    print(f"\n모든 작업이 완료되었습니다!")
-    print(f"1. 전체 로그(실시간): {filename}")
-    print(f"2. 정렬된 리포트(추천): {sorted_filename}")
+    for engine, label in ENGINE_LABELS.items():
+        print(f"{label} 인덱싱: {summary['engines'][engine]}개 ({pct(summary['engines'][engine], total_urls)})")
+    print(f"미인덱싱: {summary['not_indexed']}개")
+    print(f"리다이렉트되는 URL: {summary['redirected']}개")
+    print("\n모든 작업이 완료되었습니다!")
+    print(f"1. 전체 리포트: {report['filename']}")
+    print(f"2. 정렬된 리포트(추천): {report['sorted_filename']}")
+    print(f"3. 결과 저장소: {store.path} (run #{run_id})")
+    if report['diff_filename']:
+        print(f"4. 이전 실행(run #{report['previous_run']}) 대비 인덱싱 변화 {report['diff_count']}건: {report['diff_filename']}")
+    if metrics_files:
+        print(f"- 실행 계측: {metrics_files[0]} / {metrics_files[1]}")
     print("="*60)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
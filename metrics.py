@@ -0,0 +1,199 @@
+"""
+실행 계측 (지연 시간 히스토그램, 카운터)
+- HDR 방식 히스토그램: 값을 마이크로초 정수로 기록하고, 2의 거듭제곱 구간마다 64칸으로 나눠 상대 오차 약 1.6% 이내로 보관
+  (기록은 정수 연산 몇 번과 dict 갱신 하나라 실행 중 계속 켜 두어도 부담이 적습니다)
+- aiohttp TraceConfig로 요청별 DNS / 연결 / 첫 바이트(TTFB) 시간을 기록합니다
+- 실행이 끝나면 JSON 요약과 Prometheus 텍스트 형식(.prom)으로 내보냅니다
+"""
+import json
+import time
+from contextlib import contextmanager
+
+import aiohttp
+
+from config import METRICS_ENABLED
+
+SUB_BUCKET_BITS = 7            # 구간당 칸 수 = 2^(7-1) = 64
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+def _bucket_index(value):
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (value >> shift)
+
+def _bucket_upper(index):
+    """버킷에 들어가는 가장 큰 값"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    sub = index - shift * SUB_BUCKET_HALF
+    return ((sub + 1) << shift) - 1
+
+class Histogram:
+    """지연 시간(초)을 기록하는 HDR 방식 히스토그램"""
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1_000_000))
+        index = _bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """q(0~1) 분위수를 초 단위로 반환합니다."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self):
+        result = {
+            'count': self.count,
+            'sum': self.total / 1_000_000,
+            'min': (self.min or 0) / 1_000_000,
+            'max': self.max / 1_000_000,
+            'mean': self.total / self.count / 1_000_000 if self.count else 0.0,
+        }
+        for q in QUANTILES:
+            result[f"p{q * 100:g}"] = self.percentile(q)
+        return result
+
+class Metrics:
+    """이름과 라벨별 히스토그램/카운터 저장소"""
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.record(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with 블록의 소요 시간을 name 히스토그램에 기록합니다 (예외가 나도 기록)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+
+    # ----- 내보내기 -----
+    def to_dict(self):
+        histograms, counters = {}, {}
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            histograms.setdefault(name, []).append(dict(labels=dict(labels), **histogram.summary()))
+        for (name, labels), value in sorted(self.counters.items()):
+            counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        return {'histograms': histograms, 'counters': counters}
+
+    def write_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, filename, prefix='seo_monitor_'):
+        """히스토그램은 summary(분위수, _sum, _count), 카운터는 counter 형식으로 기록합니다."""
+        lines = []
+        typed = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            for q in QUANTILES:
+                lines.append(f"{metric}{_labels(labels, quantile=q)} {histogram.percentile(q):.6f}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram.total / 1_000_000:.6f}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+        for (name, labels), value in sorted(self.counters.items()):
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    body = ','.join(f'{key}="{str(value)}"'.replace('\n', ' ') for key, value in pairs)
+    return '{' + body + '}'
+
+# 프로세스 공유 저장소
+METRICS = Metrics()
+
+def http_trace_config(metrics=METRICS):
+    """요청별 DNS 조회 / 연결 / 첫 바이트(응답 헤더)까지 시간을 기록하는 aiohttp TraceConfig"""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params):
+        ctx.request_started = time.perf_counter()
+
+    async def on_request_end(session, ctx, params):
+        metrics.observe('http_ttfb_seconds', time.perf_counter() - ctx.request_started)
+
+    async def on_request_exception(session, ctx, params):
+        metrics.inc('http_request_errors_total', error=type(params.exception).__name__)
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_started = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        metrics.observe('http_dns_seconds', time.perf_counter() - ctx.dns_started)
+
+    async def on_connect_start(session, ctx, params):
+        ctx.connect_started = time.perf_counter()
+
+    async def on_connect_end(session, ctx, params):
+        metrics.observe('http_connect_seconds', time.perf_counter() - ctx.connect_started)
+
+    async def on_connection_reused(session, ctx, params):
+        metrics.inc('http_connections_reused_total')
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    trace.on_dns_resolvehost_start.append(on_dns_start)
+    trace.on_dns_resolvehost_end.append(on_dns_end)
+    trace.on_connection_create_start.append(on_connect_start)
+    trace.on_connection_create_end.append(on_connect_end)
+    trace.on_connection_reuseconn.append(on_connection_reused)
+    return trace
@@ -0,0 +1,64 @@
+"""
+리다이렉트 추적 도우미
+- 3xx 응답을 hop(요청 URL, 상태 코드, Location, 지연 시간) 단위로 기록합니다
+- RedirectCache: 한 실행 안에서 리다이렉트를 거쳐 도달한 URL의 응답을 공유합니다
+  여러 사이트맵 URL이 같은 대상으로 리다이렉트되어도 대상은 한 번만 요청/분석합니다
+"""
+import asyncio
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+from config import REDIRECT_CACHE_SIZE
+
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+def redirect_hop(url, response, latency):
+    """리다이렉트 응답이면 hop dict를, 아니면 None을 반환합니다."""
+    location = response.headers.get('Location')
+    if response.status not in REDIRECT_STATUSES or not location:
+        return None
+    return {
+        'url': url,
+        'status': response.status,
+        'location': urljoin(url, location),
+        'latency_ms': round(latency * 1000),
+    }
+
+class RedirectCache:
+    """
+    URL별 (hop, 분석 결과) 공유 캐시입니다.
+    처음 요청하는 쪽(owner)이 실제로 요청한 뒤 settle로 결과를 알리고,
+    같은 URL을 동시에 요청하려던 쪽은 claim이 반환한 future를 기다려 결과를 그대로 사용합니다.
+    대기하는 쪽은 다른 대기에 의존하지 않으므로 리다이렉트 루프가 있어도 교착되지 않습니다.
+    """
+    def __init__(self, max_size=REDIRECT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+
+    def claim(self, url):
+        """
+        (future, owner)를 반환합니다.
+        owner=True면 호출한 쪽이 직접 요청하고 settle을 호출해야 하며, False면 future를 기다리면 됩니다.
+        """
+        future = self._entries.get(url)
+        if future is not None:
+            self._entries.move_to_end(url)
+            self.hits += 1
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        self._entries[url] = future
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return future, True
+
+    def settle(self, url, future, hop, record):
+        """
+        요청 결과를 기다리는 쪽에 전달합니다.
+        크롤링 실패(재시도 대상 포함)나 요청 중 예외(hop/record 모두 None)는 캐시에 남기지 않습니다.
+        """
+        failed = (hop is None and record is None) or (record is not None and record.get('failure_class'))
+        if failed and self._entries.get(url) is future:
+            del self._entries[url]
+        if not future.done():
+            future.set_result((hop, record))
@@ -0,0 +1,108 @@
+"""
+페이지 요청 재시도 엔진
+- 실패 원인 분류 (dns / connect / timeout / 5xx / 429)
+- 원인별 정책(최대 시도 횟수, 지수 백오프)과 지터 적용
+- 전체 재시도 예산: 장애 상황에서 재시도가 요청 수를 폭증시키지 않도록 제한
+- 지연 큐: 대기 중인 재시도가 워커를 붙잡지 않도록 별도로 보관 후 작업 큐로 되돌림
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import socket
+
+import aiohttp
+
+from config import RETRY_BUDGET_MIN, RETRY_BUDGET_RATIO, RETRY_POLICIES
+
+
+def classify_status(status):
+    """응답 코드를 실패 원인으로 분류합니다. 재시도 대상이 아니면 None"""
+    if status == 429:
+        return '429'
+    if 500 <= status <= 599:
+        return '5xx'
+    return None
+
+def classify_exception(exc):
+    """요청 중 발생한 예외를 실패 원인으로 분류합니다."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return 'timeout'
+    if isinstance(exc, aiohttp.ClientConnectorCertificateError):
+        return 'error'
+    if isinstance(exc, aiohttp.ClientConnectorError):
+        if isinstance(exc.os_error, socket.gaierror):
+            return 'dns'
+        return 'connect'
+    if isinstance(exc, (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError, aiohttp.ClientPayloadError)):
+        return 'connect'
+    return 'error'
+
+def backoff_delay(failure_class, attempt):
+    """
+    attempt번째 시도가 실패한 뒤 기다릴 시간(초)을 반환합니다.
+    지수 백오프 상한(base_delay × 2^(attempt-1), 최대 max_delay) 안에서 무작위로 고릅니다 (jitter).
+    """
+    policy = RETRY_POLICIES[failure_class]
+    ceiling = min(policy['max_delay'], policy['base_delay'] * (2 ** (attempt - 1)))
+    return random.uniform(policy['base_delay'] / 2, ceiling)
+
+def can_retry(failure_class, attempt):
+    policy = RETRY_POLICIES.get(failure_class)
+    return policy is not None and attempt < policy['max_attempts']
+
+class RetryBudget:
+    """
+    재시도 총량을 (최초 요청 수 × ratio + minimum)으로 제한합니다.
+    사이트 전체가 다운된 경우 등에서 재시도가 끝없이 쌓이지 않게 합니다.
+    """
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, minimum=RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+
+    def record_request(self):
+        self.requests += 1
+
+    def allow(self):
+        if self.retries >= self.minimum + self.requests * self.ratio:
+            return False
+        self.retries += 1
+        return True
+
+class DeferredQueue:
+    """
+    지정한 시간이 지난 항목을 대상 큐(asyncio.Queue)로 옮겨주는 지연 큐입니다.
+    run()을 별도 태스크로 실행해야 합니다.
+    """
+    def __init__(self, target):
+        self.target = target
+        self._heap = []
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def defer(self, item, delay):
+        loop = asyncio.get_running_loop()
+        heapq.heappush(self._heap, (loop.time() + delay, next(self._seq), item))
+        self._changed.set()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._changed.clear()
+            if not self._heap:
+                await self._changed.wait()
+                continue
+            wait = self._heap[0][0] - loop.time()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, item = heapq.heappop(self._heap)
+            await self.target.put(item)
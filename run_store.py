@@ -0,0 +1,368 @@
+"""
+실행 결과 저장소 (SQLite, WAL 모드)
+- 실행(run) / URL 분석 결과 / 검색 엔진별 인덱싱 여부 / 이슈를 테이블로 저장합니다
+- URL마다 검색 엔진별 인덱싱 여부를 비트마스크(index_mask) 하나로 보관합니다 (엔진 추가 = 비트 하나 추가)
+- 이슈 문자열은 issue_types에 한 번만 저장하고 URL에는 번호만 기록합니다
+- 요약 통계는 한 번의 집계 조회로, 정렬 리포트는 정렬 없이 '인덱싱됨 → 미인덱싱' 두 구간으로 나눠 읽습니다
+- 결과는 메모리에 모아두었다가 일정 개수마다 하나의 트랜잭션으로 기록합니다
+- CSV 리포트와 정렬 리포트는 저장소에서 스트리밍으로 내보냅니다 (메모리 버퍼 없음)
+- 기록된 URL과 검색 엔진 수집 결과는 중단된 실행을 이어서 진행할 때(--resume) 체크포인트로 사용합니다
+"""
+import csv
+import datetime
+import os
+import sqlite3
+import time
+
+from config import CHECKPOINT_INTERVAL, ENGINES, RUN_DB_PATH
+
+# 이 개수만큼 결과가 쌓이면 한 번에 기록
+BATCH_SIZE = 500
+
+# 리포트에 포함하는 검색 엔진 (컬럼 순서)
+REPORT_ENGINES = tuple(ENGINES)
+
+# 검색 엔진별 비트 (index_mask)
+ENGINE_BITS = {engine: 1 << i for i, engine in enumerate(REPORT_ENGINES)}
+
+REPORT_FIELDNAMES = ['URL'] + [f"{engine.capitalize()}_Index" for engine in REPORT_ENGINES] + ['Status', 'Title', 'Issues']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    domain TEXT,
+    sitemap_url TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL DEFAULT 'running'
+);
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    url TEXT NOT NULL,
+    status_code INTEGER,
+    title TEXT,
+    content_type TEXT,
+    attempts INTEGER,
+    failure_class TEXT,
+    index_mask INTEGER NOT NULL DEFAULT 0,   -- ENGINE_BITS 조합
+    final_url TEXT,                          -- 리다이렉트된 경우 최종 URL
+    UNIQUE (run_id, url)
+);
+CREATE TABLE IF NOT EXISTS redirect_hops (
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    run_id INTEGER NOT NULL,
+    hop INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    location TEXT NOT NULL,
+    latency_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS index_status (
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    run_id INTEGER NOT NULL,
+    engine TEXT NOT NULL,
+    indexed INTEGER NOT NULL,
+    PRIMARY KEY (url_id, engine)
+);
+CREATE TABLE IF NOT EXISTS issue_types (
+    id INTEGER PRIMARY KEY,
+    issue TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS engine_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    engine TEXT NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS engine_checkpoints (  -- 수집을 끝까지 마쳐 engine_results에 저장한 엔진 (결과가 0개여도 기록)
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    engine TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, engine)
+);
+CREATE TABLE IF NOT EXISTS url_issues (
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    run_id INTEGER NOT NULL,
+    issue_id INTEGER NOT NULL REFERENCES issue_types(id)
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_urls_run ON urls(run_id);
+CREATE INDEX IF NOT EXISTS idx_urls_status ON urls(run_id, status_code);
+CREATE INDEX IF NOT EXISTS idx_index_status_engine ON index_status(run_id, engine, indexed);
+CREATE INDEX IF NOT EXISTS idx_url_issues_type ON url_issues(run_id, issue_id);
+CREATE INDEX IF NOT EXISTS idx_url_issues_url ON url_issues(url_id);
+CREATE INDEX IF NOT EXISTS idx_redirect_hops_url ON redirect_hops(url_id);
+CREATE INDEX IF NOT EXISTS idx_engine_results_run ON engine_results(run_id, engine);
+"""
+
+INSERT_URL = ("INSERT INTO urls (run_id, url, status_code, title, content_type, attempts, failure_class, index_mask, "
+              "final_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+def index_mask(indexed):
+    """{engine: bool}을 비트마스크로 변환합니다."""
+    mask = 0
+    for engine, flag in indexed.items():
+        if flag:
+            mask |= ENGINE_BITS[engine]
+    return mask
+
+def _now():
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+class RunStore:
+    def __init__(self, path=RUN_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+        self._buffer = []
+        self._flushed_at = time.monotonic()
+        self.last_run_id = None
+        self._issue_ids = dict((issue, issue_id) for issue_id, issue in self.conn.execute("SELECT id, issue FROM issue_types"))
+
+    def _migrate(self):
+        """이전 형식(indexed_any 컬럼, 문자열 issues 테이블)의 저장소를 현재 형식으로 변환합니다."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(urls)")}
+        with self.conn:
+            if 'final_url' not in columns:
+                self.conn.execute("ALTER TABLE urls ADD COLUMN final_url TEXT")
+            if 'index_mask' not in columns:
+                self.conn.execute("ALTER TABLE urls ADD COLUMN index_mask INTEGER NOT NULL DEFAULT 0")
+                for engine, bit in ENGINE_BITS.items():
+                    self.conn.execute(
+                        "UPDATE urls SET index_mask = index_mask | ? WHERE id IN "
+                        "(SELECT url_id FROM index_status WHERE engine = ? AND indexed = 1)", (bit, engine))
+                self.conn.execute("DROP INDEX IF EXISTS idx_urls_not_indexed")
+            if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'issues'").fetchone():
+                self.conn.execute("INSERT OR IGNORE INTO issue_types (issue) SELECT DISTINCT issue FROM issues")
+                self.conn.execute(
+                    "INSERT INTO url_issues (url_id, run_id, issue_id) SELECT i.url_id, i.run_id, t.id "
+                    "FROM issues i JOIN issue_types t ON t.issue = i.issue ORDER BY i.rowid")
+                self.conn.execute("DROP TABLE issues")
+
+    # ----- 기록 -----
+    def start_run(self, domain, sitemap_url):
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (domain, sitemap_url, started_at) VALUES (?, ?, ?)",
+                (domain, sitemap_url, _now()))
+        self.last_run_id = cursor.lastrowid
+        return cursor.lastrowid
+
+    def add(self, run_id, result, indexed=None):
+        """
+        분석 결과 하나를 버퍼에 추가합니다.
+        indexed: {engine: bool} 검색 엔진별 인덱싱 여부 (None이면 나중에 apply_index_status로 결합)
+        """
+        indexed = indexed or {}
+        self._buffer.append((run_id, result, indexed))
+        # 개수 또는 시간 기준으로 기록 (느린 사이트도 CHECKPOINT_INTERVAL마다 체크포인트가 남음)
+        if len(self._buffer) >= BATCH_SIZE or time.monotonic() - self._flushed_at >= CHECKPOINT_INTERVAL:
+            self.flush()
+
+    def _issue_id(self, issue):
+        """이슈 문자열의 번호를 반환합니다 (처음 나온 이슈는 issue_types에 추가)."""
+        issue_id = self._issue_ids.get(issue)
+        if issue_id is None:
+            issue_id = self.conn.execute("INSERT INTO issue_types (issue) VALUES (?)", (issue,)).lastrowid
+            self._issue_ids[issue] = issue_id
+        return issue_id
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        if not self._buffer:
+            return
+        with self.conn:
+            for run_id, result, indexed in self._buffer:
+                hops = result.get('redirects') or []
+                row = (run_id, result['url'], result['status_code'], result['title'], result.get('content_type'),
+                       result.get('attempts'), result.get('failure_class'), index_mask(indexed),
+                       result.get('final_url') if hops else None)
+                try:
+                    cursor = self.conn.execute(INSERT_URL, row)
+                except sqlite3.IntegrityError:
+                    # 같은 실행에서 다시 분석된 URL은 이전 기록을 교체
+                    self._delete_url(run_id, result['url'])
+                    cursor = self.conn.execute(INSERT_URL, row)
+                url_id = cursor.lastrowid
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO index_status (url_id, run_id, engine, indexed) VALUES (?, ?, ?, ?)",
+                    [(url_id, run_id, engine, int(flag)) for engine, flag in indexed.items()])
+                self.conn.executemany(
+                    "INSERT INTO url_issues (url_id, run_id, issue_id) VALUES (?, ?, ?)",
+                    [(url_id, run_id, self._issue_id(issue)) for issue in result['issues']])
+                self.conn.executemany(
+                    "INSERT INTO redirect_hops (url_id, run_id, hop, status, location, latency_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(url_id, run_id, i, hop['status'], hop['location'], hop.get('latency_ms'))
+                     for i, hop in enumerate(hops, 1)])
+        self._buffer.clear()
+
+    def apply_index_status(self, run_id, indexed_sets, normalize):
+        """
+        검색 엔진 수집 결과를 이미 저장된 URL 분석 결과와 결합합니다.
+        indexed_sets: {engine: 정규화된 URL 집합}, normalize: URL 정규화 함수
+        URL은 id 순서로 일정 개수씩 읽어 처리하므로 메모리 사용량이 일정합니다.
+        """
+        self.flush()
+        last_id = 0
+        while True:
+            rows = self.conn.execute(
+                "SELECT id, url FROM urls WHERE run_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (run_id, last_id, BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            status_rows, mask_rows = [], []
+            for url_id, url in rows:
+                url_n = normalize(url)
+                mask = 0
+                for engine, urls in indexed_sets.items():
+                    flag = url_n in urls
+                    status_rows.append((url_id, run_id, engine, int(flag)))
+                    if flag:
+                        mask |= ENGINE_BITS[engine]
+                mask_rows.append((mask, url_id))
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO index_status (url_id, run_id, engine, indexed) VALUES (?, ?, ?, ?)",
+                    status_rows)
+                self.conn.executemany("UPDATE urls SET index_mask = ? WHERE id = ?", mask_rows)
+
+    def merge_run(self, path, source_run_id, run_id):
+        """
+        다른 저장소 파일(샤드 작업자의 부분 결과)에 기록된 실행 결과를 run_id로 합칩니다.
+        이미 있는 URL은 건너뛰므로 같은 URL이 여러 파일에 있어도 한 번만 들어갑니다. 반환값: 추가된 URL 수
+        """
+        self.flush()
+        self.conn.execute("ATTACH DATABASE ? AS src", (path,))
+        try:
+            with self.conn:
+                before = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM urls").fetchone()[0]
+                self.conn.execute("INSERT OR IGNORE INTO issue_types (issue) SELECT issue FROM src.issue_types ORDER BY id")
+                added = self.conn.execute(
+                    "INSERT OR IGNORE INTO urls (run_id, url, status_code, title, content_type, attempts, failure_class, "
+                    "index_mask, final_url) SELECT ?, url, status_code, title, content_type, attempts, failure_class, "
+                    "index_mask, final_url FROM src.urls WHERE run_id = ? ORDER BY id", (run_id, source_run_id)).rowcount
+                # 이번에 추가된 URL(id > before)에 대해서만 이슈와 리다이렉트 단계를 옮김
+                self.conn.execute(
+                    "INSERT INTO url_issues (url_id, run_id, issue_id) SELECT u.id, u.run_id, t.id "
+                    "FROM src.url_issues si JOIN src.urls su ON su.id = si.url_id "
+                    "JOIN urls u ON u.run_id = ? AND u.url = su.url AND u.id > ? "
+                    "JOIN src.issue_types st ON st.id = si.issue_id JOIN issue_types t ON t.issue = st.issue "
+                    "WHERE si.run_id = ? ORDER BY si.rowid", (run_id, before, source_run_id))
+                self.conn.execute(
+                    "INSERT INTO redirect_hops (url_id, run_id, hop, status, location, latency_ms) "
+                    "SELECT u.id, u.run_id, h.hop, h.status, h.location, h.latency_ms "
+                    "FROM src.redirect_hops h JOIN src.urls su ON su.id = h.url_id "
+                    "JOIN urls u ON u.run_id = ? AND u.url = su.url AND u.id > ? "
+                    "WHERE h.run_id = ? ORDER BY h.rowid", (run_id, before, source_run_id))
+        finally:
+            self.conn.execute("DETACH DATABASE src")
+        self._issue_ids = dict((issue, issue_id) for issue_id, issue in self.conn.execute("SELECT id, issue FROM issue_types"))
+        return added
+
+    def _delete_url(self, run_id, url):
+        url_id = self.conn.execute("SELECT id FROM urls WHERE run_id = ? AND url = ?", (run_id, url)).fetchone()[0]
+        for table in ('index_status', 'url_issues', 'redirect_hops'):
+            self.conn.execute(f"DELETE FROM {table} WHERE url_id = ?", (url_id,))
+        self.conn.execute("DELETE FROM urls WHERE id = ?", (url_id,))
+
+    def save_engine_results(self, run_id, engine_urls):
+        """
+        검색 엔진별 수집 URL을 실행에 저장합니다 (이어서 실행할 때 다시 수집하지 않도록).
+        끝까지 수집한 엔진만 넘깁니다. 넘기지 않은 엔진의 저장된 결과는 그대로 둡니다.
+        """
+        saved_at = _now()
+        with self.conn:
+            for engine, urls in engine_urls.items():
+                self.conn.execute("DELETE FROM engine_results WHERE run_id = ? AND engine = ?", (run_id, engine))
+                self.conn.executemany("INSERT INTO engine_results (run_id, engine, url) VALUES (?, ?, ?)",
+                                      [(run_id, engine, url) for url in urls])
+                self.conn.execute("INSERT OR REPLACE INTO engine_checkpoints (run_id, engine, saved_at) VALUES (?, ?, ?)",
+                                  (run_id, engine, saved_at))
+
+    def finish_run(self, run_id):
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ?, status = 'finished' WHERE id = ?", (_now(), run_id))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # ----- 조회 -----
+    def run_info(self, run_id):
+        row = self.conn.execute(
+            "SELECT id, domain, sitemap_url, started_at, status FROM runs WHERE id = ?",
+            (run_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'domain', 'sitemap_url', 'started_at', 'status'), row))
+
+    def has_url(self, run_id, url):
+        """실행에 이미 기록된 URL인지 (UNIQUE(run_id, url) 인덱스 조회, 이어서 실행할 때 완료 여부 확인용)"""
+        return self.conn.execute("SELECT 1 FROM urls WHERE run_id = ? AND url = ?", (run_id, url)).fetchone() is not None
+
+    def engine_results(self, run_id):
+        """끝까지 수집해 저장된 검색 엔진 결과 {engine: URL 집합}. 저장되지 않은 엔진은 포함하지 않음"""
+        engine_urls = {engine: set() for engine, in self.conn.execute(
+            "SELECT engine FROM engine_checkpoints WHERE run_id = ?", (run_id,))}
+        for engine, url in self.conn.execute("SELECT engine, url FROM engine_results WHERE run_id = ?", (run_id,)):
+            if engine in engine_urls:
+                engine_urls[engine].add(url)
+        return engine_urls
+
+    def summary(self, run_id):
+        """전체 URL 수, 엔진별 인덱싱 수, 하나 이상 인덱싱된 URL 수, 리다이렉트 URL 수를 URL 테이블 한 번의 집계로 계산합니다."""
+        engine_sums = ''.join(f", COALESCE(SUM((index_mask & {bit}) != 0), 0)" for bit in ENGINE_BITS.values())
+        row = self.conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(index_mask != 0), 0), COUNT(final_url){engine_sums} "
+            f"FROM urls WHERE run_id = ?", (run_id,)).fetchone()
+        total, any_indexed, redirected = row[:3]
+        return {
+            'total': total,
+            'any_indexed': any_indexed,
+            'not_indexed': total - any_indexed,
+            'redirected': redirected,
+            'engines': dict(zip(REPORT_ENGINES, row[3:])),
+        }
+
+    def iter_report_rows(self, run_id, indexed_first=False):
+        """
+        리포트 행(dict)을 저장소에서 하나씩 읽어 yield 합니다.
+        indexed_first=True면 정렬 대신 '하나 이상 인덱싱됨 → 미인덱싱' 순서로 두 번 읽습니다 (각 구간 안은 기록 순서 유지).
+        """
+        if indexed_first:
+            parts = ("AND u.index_mask != 0", "AND u.index_mask = 0")
+        else:
+            parts = ("",)
+        for condition in parts:
+            cursor = self.conn.execute(f"""
+                SELECT u.url, u.index_mask, u.status_code, u.title,
+                       (SELECT group_concat(issue, ' | ') FROM
+                            (SELECT t.issue FROM url_issues i JOIN issue_types t ON t.id = i.issue_id
+                             WHERE i.url_id = u.id ORDER BY i.rowid))
+                FROM urls u WHERE u.run_id = ? {condition} ORDER BY u.id""", (run_id,))
+            for url, mask, status, title, issues in cursor:
+                record = {'URL': url}
+                for engine, bit in ENGINE_BITS.items():
+                    record[f"{engine.capitalize()}_Index"] = "O" if mask & bit else "X"
+                record.update({'Status': status, 'Title': title, 'Issues': issues or "None"})
+                yield record
+
+    def export_csv(self, run_id, filename, indexed_first=False, header_lines=()):
+        """리포트를 CSV로 내보냅니다. header_lines는 데이터 앞에 '# ' 주석으로 기록됩니다."""
+        self.flush()
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            for line in header_lines:
+                f.write(f"# {line}\n")
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(self.iter_report_rows(run_id, indexed_first))
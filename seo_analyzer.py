@@ -1,95 +1,435 @@
-import aiohttp
 import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlparse
+
+import aiohttp
 from bs4 import BeautifulSoup
-from config import TIMEOUT, CONCURRENT_REQUESTS
+
+from config import (
+    CONCURRENT_REQUESTS,
+    HTML_CONTENT_TYPES,
+    MAX_REDIRECTS,
+    MAX_RESPONSE_BYTES,
+    PARSE_WORKERS,
+    READ_CHUNK_SIZE,
+    REDIRECT_CHAIN_MAX,
+    TIMEOUT,
+)
+from host_limiter import HostLimiter, parse_retry_after
+from html_extractor import DEFAULT_RULES, HtmlExtractor, extract
+from metrics import METRICS, http_trace_config
+from redirects import RedirectCache, redirect_hop
+from retry import (
+    DeferredQueue,
+    RetryBudget,
+    backoff_delay,
+    can_retry,
+    classify_exception,
+    classify_status,
+)
 from utils import get_random_header
 
-async def fetch_and_analyze(session, url):
+
+def analyze_html(content, encoding=None, rules=DEFAULT_RULES):
     """
-    비동기로 URL을 가져와서 SEO 요소를 분석합니다.
+    HTML 바이트를 파싱하여 SEO 요소와 이슈 목록을 반환합니다.
+    단일 패스 추출 엔진(html_extractor)을 사용하며, 필요한 요소를 모두 찾으면 본문 파싱을 중단합니다.
+    네트워크와 무관한 순수 함수이므로 프로세스 풀 워커에서 실행할 수 있습니다.
+    """
+    return extract(content, rules, encoding)
+
+def analyze_html_soup(content):
     """
-    results = {
+    BeautifulSoup 기반의 기존 분석 구현입니다.
+    결과 비교 및 벤치마크(benchmark.py)의 기준값으로 유지합니다.
+    """
+    record = {
+        'title': '',
+        'description': '',
+        'h1': [],
+        'canonical': '',
+        'robots': '',
+        'issues': []
+    }
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # Title
+    title_tag = soup.find('title')
+    record['title'] = title_tag.text.strip() if title_tag else "Missing"
+    if not title_tag:
+        record['issues'].append("Missing Title tag")
+    elif len(record['title']) < 10:
+        record['issues'].append("Title too short")
+        
+    # Meta Description
+    desc_tag = soup.find('meta', attrs={'name': 'description'})
+    if desc_tag:
+        record['description'] = desc_tag.get('content', '').strip()
+    if not record['description']:
+        record['issues'].append("Missing Meta Description")
+        
+    # H1 Tag
+    h1_tags = soup.find_all('h1')
+    record['h1'] = [h.text.strip() for h in h1_tags]
+    if len(h1_tags) == 0:
+        record['issues'].append("Missing H1 tag")
+    elif len(h1_tags) > 1:
+        record['issues'].append("Multiple H1 tags")
+        
+    # Canonical
+    canonical_tag = soup.find('link', rel='canonical')
+    if canonical_tag:
+        record['canonical'] = canonical_tag.get('href', '')
+    if not record['canonical']:
+        record['issues'].append("Missing Canonical tag")
+        
+    # Robots Meta
+    robots_tag = soup.find('meta', attrs={'name': 'robots'})
+    if robots_tag:
+        record['robots'] = robots_tag.get('content', '').lower()
+        if 'noindex' in record['robots']:
+            record['issues'].append("Meta robots set to 'noindex'")
+    
+    return record
+
+# HTTP 캐시에 저장하는 분석 결과 필드
+CACHED_FIELDS = ('status_code', 'content_type', 'x_robots_tag', 'title', 'description',
+                 'h1', 'canonical', 'robots', 'issues')
+
+def _empty_result(url):
+    return {
         'url': url,
         'status_code': 0,
+        'content_type': '',
+        'x_robots_tag': '',
         'title': '',
         'description': '',
         'h1': [],
         'canonical': '',
         'robots': '',
-        'issues': []
+        'issues': [],
+        'failure_class': None,
+        'cached': False
     }
+
+async def fetch_and_analyze(session, url, executor=None, limiter=None, cache=None, redirects=None,
+                            rules=DEFAULT_RULES):
+    """
+    비동기로 URL을 가져와서 SEO 요소를 분석합니다.
+    본문은 MAX_RESPONSE_BYTES까지만 스트리밍으로 읽고, HTML이 아닌 응답은 헤더만 기록합니다.
+    리다이렉트는 한 단계씩 직접 따라가며 각 단계(상태 코드, Location, 지연 시간)를 result['redirects']에 기록하고,
+    최종 URL은 result['final_url']에 기록합니다. 루프, 너무 많은 리다이렉트, 긴 체인은 이슈로 남깁니다.
+    executor: 지정하면 HTML 파싱을 해당 프로세스 풀에서 수행하여 이벤트 루프를 막지 않습니다.
+    limiter: HostLimiter를 지정하면 호스트별 동시 요청 수 제한을 따르고 응답 상태를 반영합니다.
+    cache: HttpCache를 지정하면 조건부 요청을 보내고, 304 응답이면 저장된 분석 결과를 재사용합니다.
+    redirects: RedirectCache를 지정하면 리다이렉트로 도달한 URL은 실행 중 한 번만 요청하고 결과를 공유합니다.
+    rules: HTML 추출 규칙 (예: 링크 수집 시 DEFAULT_RULES + (LinkRule(),))
+    """
+    hops = []
+    visited = {url}
+    current = url
+    problem = None
+    while True:
+        hop = record = None
+        future, owner = redirects.claim(current) if redirects is not None and hops else (None, False)
+        if future is not None and not owner:
+            hop, record = await future
+        if hop is None and record is None:
+            try:
+                hop, record = await _fetch_page(session, current, executor, limiter, cache, rules)
+            finally:
+                if owner:
+                    redirects.settle(current, future, hop, record)
+        if hop is None:
+            break
+        hops.append(hop)
+        current = hop['location']
+        if current in visited:
+            problem = f"Redirect loop ({len(hops)} hops)"
+            break
+        if len(hops) >= MAX_REDIRECTS:
+            problem = f"Too many redirects (over {MAX_REDIRECTS})"
+            break
+        visited.add(current)
     
+    if record is None:
+        # 리다이렉트가 끝나지 않은 경우: 마지막 리다이렉트 응답을 결과로 기록
+        record = _empty_result(url)
+        record['status_code'] = hops[-1]['status']
+        record['issues'].append(problem)
+    else:
+        # 공유된 결과일 수 있으므로 복사해서 사용
+        record = dict(record, url=url, issues=list(record['issues']))
+        if hops:
+            record['issues'].append(f"Redirects to {current} ({hops[0]['status']})")
+            if len(hops) > REDIRECT_CHAIN_MAX:
+                record['issues'].append(f"Long redirect chain ({len(hops)} hops)")
+    record['final_url'] = current
+    record['redirects'] = hops
+    return record
+
+async def _fetch_page(session, url, executor=None, limiter=None, cache=None, rules=DEFAULT_RULES):
+    """
+    URL 하나를 리다이렉트를 따라가지 않고 요청합니다.
+    반환값: 리다이렉트 응답이면 (hop, None), 그 외에는 (None, 분석 결과)
+    """
+    results = _empty_result(url)
+    
+    cache_key = f"page:{url}"
+    entry = cache.get(cache_key) if cache is not None else None
+    if entry is not None and entry.fresh:
+        results.update(entry.payload, cached=True)
+        return None, results
+    headers = get_random_header()
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    
+    acquired = None # limiter 슬롯을 얻은 호스트
+    status = latency = retry_after = None
     try:
-        async with session.get(url, headers=get_random_header(), timeout=TIMEOUT, ssl=False) as response:
+        # 잘못된 URL(예: 닫히지 않은 IPv6 주소)의 ValueError도 일반 실패 결과로 기록
+        host = urlparse(url).netloc
+        if limiter:
+            await limiter.acquire(host)
+            acquired = host
+        started = time.monotonic()
+        async with session.get(url, headers=headers, timeout=TIMEOUT, ssl=False, allow_redirects=False) as response:
+            status, latency = response.status, time.monotonic() - started
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            hop = redirect_hop(url, response, latency)
+            if hop is not None:
+                return hop, None
+            if response.status == 304 and entry is not None:
+                cache.touch(cache_key)
+                results.update(entry.payload, cached=True)
+                return None, results
+            validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
             results['status_code'] = response.status
+            results['content_type'] = response.content_type
+            results['x_robots_tag'] = ', '.join(response.headers.getall('X-Robots-Tag', [])).lower()
+            if 'noindex' in results['x_robots_tag']:
+                results['issues'].append("X-Robots-Tag set to 'noindex'")
             
             if response.status != 200:
                 results['issues'].append(f"HTTP Status {response.status}")
-                return results
+                results['failure_class'] = classify_status(response.status)
+                return None, results
             
-            content = await response.read()
-            soup = BeautifulSoup(content, 'html.parser')
+            # HTML이 아니면 본문을 내려받지 않음 (PDF, 이미지 등)
+            if response.content_type not in HTML_CONTENT_TYPES:
+                results['issues'].append(f"Non-HTML content ({response.content_type})")
+                _cache_page(cache, cache_key, validators, results)
+                return None, results
             
-            # Title
-            title_tag = soup.find('title')
-            results['title'] = title_tag.text.strip() if title_tag else "Missing"
-            if not title_tag:
-                results['issues'].append("Missing Title tag")
-            elif len(results['title']) < 10:
-                results['issues'].append("Title too short")
-                
-            # Meta Description
-            desc_tag = soup.find('meta', attrs={'name': 'description'})
-            if desc_tag:
-                results['description'] = desc_tag.get('content', '').strip()
-            if not results['description']:
-                results['issues'].append("Missing Meta Description")
-                
-            # H1 Tag
-            h1_tags = soup.find_all('h1')
-            results['h1'] = [h.text.strip() for h in h1_tags]
-            if len(h1_tags) == 0:
-                results['issues'].append("Missing H1 tag")
-            elif len(h1_tags) > 1:
-                results['issues'].append("Multiple H1 tags")
-                
-            # Canonical
-            canonical_tag = soup.find('link', rel='canonical')
-            if canonical_tag:
-                results['canonical'] = canonical_tag.get('href', '')
-            if not results['canonical']:
-                results['issues'].append("Missing Canonical tag")
-                
-            # Robots Meta
-            robots_tag = soup.find('meta', attrs={'name': 'robots'})
-            if robots_tag:
-                results['robots'] = robots_tag.get('content', '').lower()
-                if 'noindex' in results['robots']:
-                    results['issues'].append("Meta robots set to 'noindex'")
+            body_started = time.perf_counter()
+            if executor is None:
+                # 받는 즉시 파싱하고, 필요한 요소를 모두 찾으면 나머지 본문은 읽지 않음
+                extractor = HtmlExtractor(rules, response.charset)
+                sink = _TimedSink(extractor.feed)
+                truncated = await _read_capped(response, sink)
+                record = extractor.close()
+                # 본문 수신 중 파싱에 쓴 시간을 빼서 전송 시간과 파싱 시간을 나눠 기록
+                elapsed = time.perf_counter() - body_started
+                METRICS.observe('http_transfer_seconds', elapsed - sink.elapsed)
+                METRICS.observe('html_parse_seconds', sink.elapsed, mode='inline')
+            else:
+                buffer = bytearray()
+                truncated = await _read_capped(response, buffer.extend)
+                METRICS.observe('http_transfer_seconds', time.perf_counter() - body_started)
+        
+        # 프로세스 풀 사용 시 연결을 반납한 뒤 파싱 (대기 시간 포함)
+        if executor is not None:
+            with METRICS.timer('html_parse_seconds', mode='process'):
+                record = await asyncio.get_running_loop().run_in_executor(
+                    executor, analyze_html, bytes(buffer), response.charset, rules)
+        results.update(record)
+        if truncated:
+            results['issues'].append(f"Page larger than {MAX_RESPONSE_BYTES // 1024}KB (analysis truncated)")
 
     except Exception as e:
         results['issues'].append(f"Async Crawl Error: {str(e)}")
-        
-    return results
+        results['failure_class'] = classify_exception(e)
+    finally:
+        if acquired is not None:
+            limiter.release(acquired, status, latency, retry_after)
+    
+    # 분석을 정상적으로 마친 경우에만 저장 (취소/오류로 중단된 빈 결과가 이후 304 응답에 재사용되지 않도록)
+    if status == 200 and results['failure_class'] is None:
+        _cache_page(cache, cache_key, validators, results)
+    return None, results
+
+def _cache_page(cache, cache_key, validators, results):
+    if cache is not None:
+        cache.put(cache_key, *validators, {field: results[field] for field in CACHED_FIELDS})
+
+class _TimedSink:
+    """sink 호출에 걸린 시간을 누적합니다 (본문 수신 중 파싱 시간 측정용)."""
+    def __init__(self, sink):
+        self.sink = sink
+        self.elapsed = 0.0
+
+    def __call__(self, chunk):
+        started = time.perf_counter()
+        try:
+            return self.sink(chunk)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+async def _read_capped(response, sink):
+    """
+    응답 본문을 청크 단위로 sink에 전달합니다.
+    sink가 True를 반환하면(분석 완료) 중단하고, MAX_RESPONSE_BYTES에 도달하면 잘라냅니다.
+    최대 크기에 걸려 중단된 경우 True를 반환합니다.
+    """
+    received = 0
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        remaining = MAX_RESPONSE_BYTES - received
+        if len(chunk) >= remaining:
+            sink(chunk[:remaining])
+            return not response.content.at_eof() or len(chunk) > remaining
+        received += len(chunk)
+        if sink(chunk):
+            return False
+    return False
+
+# 파이프라인 종료 신호
+_DONE = object()
+
+class _Pipeline:
+    """
+    iter_analyze_results의 내부 상태를 관리합니다.
+    - 작업 큐(queue): 입력 URL과 재시도 항목 (url, attempt)
+    - 지연 큐(deferred): 백오프 대기 중인 재시도 항목
+    - 결과 큐(out): 최종 결과. 모든 입력이 최종 결과를 낼 때 _DONE을 넣습니다.
+    """
+    def __init__(self, session, concurrency, executor, limiter, cache, rules=DEFAULT_RULES):
+        self.session = session
+        self.rules = rules
+        self.executor = executor
+        self.limiter = limiter
+        self.cache = cache
+        self.queue = asyncio.Queue(maxsize=concurrency * 2)
+        self.out = asyncio.Queue(maxsize=concurrency)
+        self.deferred = DeferredQueue(self.queue)
+        self.budget = RetryBudget()
+        self.redirects = RedirectCache() # 리다이렉트 대상은 실행 중 한 번만 요청
+        self.outstanding = 0 # 투입되었지만 아직 최종 결과가 나오지 않은 URL 수
+        self.produced_all = False
+
+    async def produce(self, urls):
+        """URL 이터러블(동기/비동기)을 작업 큐에 채웁니다. 큐가 가득 차면 대기합니다."""
+        try:
+            if hasattr(urls, '__aiter__'):
+                async for url in urls:
+                    await self._submit(url)
+            else:
+                for url in urls:
+                    await self._submit(url)
+        finally:
+            self.produced_all = True
+            if self.outstanding == 0:
+                await self.out.put(_DONE)
+
+    async def _submit(self, url):
+        self.outstanding += 1
+        self.budget.record_request()
+        await self.queue.put((url, 1))
 
-async def analyze_urls_async(urls, update_callback=None):
+    async def work(self):
+        """작업 큐에서 URL을 하나씩 꺼내 분석하고, 재시도 대상이면 지연 큐로 보냅니다."""
+        while True:
+            url, attempt = await self.queue.get()
+            try:
+                with METRICS.timer('page_seconds'):
+                    result = await fetch_and_analyze(self.session, url, self.executor, self.limiter, self.cache,
+                                                     self.redirects, self.rules)
+            except Exception as e:
+                # 예상하지 못한 예외도 실패 결과로 내보냄 (워커가 죽으면 outstanding이 줄지 않아 파이프라인이 끝나지 않음)
+                result = _empty_result(url)
+                result['issues'].append(f"Analysis Error: {e}")
+                result['failure_class'] = 'error'
+            failure = result['failure_class']
+            if failure:
+                METRICS.inc('page_failures_total', failure=failure)
+            if failure and can_retry(failure, attempt) and self.budget.allow():
+                self.deferred.defer((url, attempt + 1), backoff_delay(failure, attempt))
+                continue
+            result['attempts'] = attempt
+            await self.out.put(result)
+            self.outstanding -= 1
+            if self.produced_all and self.outstanding == 0:
+                await self.out.put(_DONE)
+
+async def iter_analyze_results(urls, session=None, concurrency=CONCURRENT_REQUESTS,
+                               parse_workers=PARSE_WORKERS, executor=None, limiter=None, cache=None,
+                               rules=DEFAULT_RULES):
+    """
+    고정된 수의 워커로 URL을 분석하고, 완료되는 순서대로 결과를 yield 합니다.
+    작업 큐와 결과 큐의 크기가 제한되어 있어 URL 수와 관계없이 메모리 사용량이 동시성 수준에 비례합니다.
+    일시적인 실패(DNS, 연결, 타임아웃, 5xx, 429)는 retry 정책에 따라 지연 큐를 거쳐 재시도하며,
+    결과에는 시도 횟수(attempts)와 최종 실패 원인(failure_class)이 기록됩니다.
+    urls: URL 리스트/제너레이터 또는 비동기 이터러블 (예: sitemap_parser.iter_sitemap_urls_async)
+    parse_workers: 1 이상이면 HTML 파싱 전용 프로세스 풀을 만들어 사용합니다 (0이면 이벤트 루프에서 파싱)
+    executor: 외부에서 만든 프로세스 풀을 공유할 때 지정합니다 (parse_workers보다 우선)
+    limiter: 호스트별 적응형 동시성 제어기 (생략하면 새로 생성)
+    cache: HttpCache (조건부 요청으로 변경되지 않은 페이지의 분석 결과 재사용)
+    rules: HTML 추출 규칙. 기본 규칙에 없는 필드(예: 링크)는 HTTP 캐시에 저장되지 않으므로 cache와 함께 쓰지 않습니다
+    """
+    if limiter is None:
+        limiter = HostLimiter()
+    own_executor = executor is None and parse_workers > 0
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=parse_workers)
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                        trace_configs=[http_trace_config()])
+
+    pipeline = _Pipeline(session, concurrency, executor, limiter, cache, rules)
+    producer = asyncio.create_task(pipeline.produce(urls))
+    tasks = [asyncio.create_task(pipeline.deferred.run())]
+    tasks += [asyncio.create_task(pipeline.work()) for _ in range(concurrency)]
+
+    try:
+        while True:
+            result = await pipeline.out.get()
+            if result is _DONE:
+                break
+            yield result
+        await producer # 입력 이터러블에서 발생한 예외 전달
+    finally:
+        for task in [producer, *tasks]:
+            task.cancel()
+        await asyncio.gather(producer, *tasks, return_exceptions=True)
+        if own_session:
+            await session.close()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+async def analyze_urls_async(urls, update_callback=None, retain=True, parse_workers=PARSE_WORKERS,
+                             limiter=None, cache=None, session=None, concurrency=CONCURRENT_REQUESTS):
     """
     여러 URL을 비동기로 동시에 분석합니다.
+    urls: URL 리스트/제너레이터 또는 비동기 이터러블
     update_callback: 처리 완료 시 호출될 콜백 함수 (중간 저장용)
+    retain: False이면 결과를 모아두지 않고 콜백으로만 전달합니다 (대량 URL 처리용)
+    parse_workers: HTML 파싱 프로세스 수 (0이면 이벤트 루프에서 직접 파싱)
+    limiter: HostLimiter (호스트별 처리율을 실행 후 확인하려면 직접 만들어 전달)
+    cache: HttpCache (지정하면 조건부 요청 사용)
+    session: 공유할 aiohttp 세션 (생략하면 새로 생성)
+    concurrency: 동시에 분석하는 URL 수 (워커 수)
+    결과는 입력 순서가 아닌 완료 순서로 전달됩니다.
     """
-    connector = aiohttp.TCPConnector(limit=CONCURRENT_REQUESTS)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        tasks = []
-        for url in urls:
-            tasks.append(process_url(session, url, update_callback))
-        
-        return await asyncio.gather(*tasks)
-
-async def process_url(session, url, update_callback):
-    result = await fetch_and_analyze(session, url)
-    if update_callback:
-        update_callback(result)
-    return result
+    results = [] if retain else None
+    async for result in iter_analyze_results(urls, session=session, concurrency=concurrency,
+                                             parse_workers=parse_workers, limiter=limiter, cache=cache):
+        if update_callback:
+            update_callback(result)
+        if retain:
+            results.append(result)
+    return results
 
 if __name__ == "__main__":
     # Test code
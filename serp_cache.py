@@ -0,0 +1,79 @@
+"""
+검색 엔진 결과(SERP) 캐시 (SQLite)
+- (엔진, 도메인, 페이지 번호)별로 수집한 URL을 저장합니다
+- TTL 안에 수집한 페이지는 다시 요청하지 않고, 아직 없는 페이지부터 이어서 수집합니다
+- 결과가 끝난 페이지(last)까지 캐시되어 있으면 해당 엔진은 브라우저를 실행하지 않습니다
+"""
+import json
+import os
+import sqlite3
+import time
+
+from config import SERP_CACHE_PATH, SERP_CACHE_TTL
+
+
+class SerpCache:
+    def __init__(self, path=SERP_CACHE_PATH, ttl=SERP_CACHE_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS serp_pages (
+                engine TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                urls TEXT NOT NULL,
+                last INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (engine, domain, page)
+            )""")
+
+    def lookup(self, engine, domain, max_pages, since=None):
+        """
+        앞 페이지부터 연속으로 캐시된(TTL 이내) 결과를 모읍니다.
+        since: 이 시각(time.time()) 이후에 저장된 페이지만 사용합니다 (생략하면 TTL 기준, 수집이 끝까지 됐는지 확인할 때 사용)
+        반환값: (URL set, 이어서 수집할 페이지 번호, 더 수집할 필요가 없는지)
+        """
+        urls = set()
+        if since is None:
+            if self.ttl <= 0:
+                return urls, 0, False
+            since = time.time() - self.ttl
+        rows = dict((page, (page_urls, last)) for page, page_urls, last in self.conn.execute(
+            "SELECT page, urls, last FROM serp_pages WHERE engine = ? AND domain = ? AND fetched_at >= ?",
+            (engine, domain, since)))
+        for page in range(max_pages):
+            if page not in rows:
+                return urls, page, False
+            page_urls, last = rows[page]
+            urls.update(json.loads(page_urls))
+            if last:
+                return urls, page + 1, True
+        return urls, max_pages, True
+
+    def crawl_finished(self, engine, domain, max_pages, started, refresh=False):
+        """
+        started(time.time())에 시작한 수집이 검색 결과 끝(또는 max_pages)까지 마쳤는지 확인합니다.
+        크롤러는 캡차/차단/추출 오류가 있었던 페이지는 저장하지 않고, 결과가 끝난 페이지는 빈 페이지라도 last로 저장하므로
+        이번 수집에서 사용한 페이지(이번에 저장했거나 TTL 이내의 캐시)가 끝까지 이어져 있으면 완료입니다.
+        refresh: 캐시를 무시하고 수집한 경우 (이번에 저장한 페이지만 인정)
+        """
+        since = started if refresh or self.ttl <= 0 else started - self.ttl
+        return self.lookup(engine, domain, max_pages, since=since)[2]
+
+    def put(self, engine, domain, page, urls, last=False):
+        """페이지 하나의 수집 결과를 저장합니다. last=True는 이 페이지에서 검색 결과가 끝났다는 뜻입니다."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO serp_pages (engine, domain, page, urls, last, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (engine, domain, page, json.dumps(sorted(urls), ensure_ascii=False), int(last), time.time()))
+            if last:
+                # 결과가 끝난 페이지 뒤에 남아 있는 예전 페이지는 더 이상 유효하지 않음
+                self.conn.execute(
+                    "DELETE FROM serp_pages WHERE engine = ? AND domain = ? AND page > ?", (engine, domain, page))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,81 @@
+"""
+검색 결과 페이지(SERP) 링크 추출
+- 브라우저에서는 HREFS_SCRIPT 한 번의 evaluate 호출로 페이지의 모든 링크(href)를 가져옵니다
+- 리다이렉트 래퍼 해제(/url?q=, bing.com/ck/a?u=)와 대상 도메인(호스트) 필터링은 이 모듈의 순수 함수에서 처리하므로
+  저장해 둔 SERP HTML로도 같은 결과를 확인할 수 있습니다 (links_from_html)
+"""
+import base64
+import binascii
+from urllib.parse import parse_qs, unquote, urlparse
+
+import lxml.html
+
+from url_canon import canonicalize
+
+# 페이지의 모든 a[href] 값을 중복 없이 반환 (page.evaluate 한 번으로 호출)
+HREFS_SCRIPT = """() => Array.from(new Set(
+    Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href'))))"""
+
+def unwrap_redirect(href):
+    """검색 엔진 리다이렉트 링크에서 실제 URL을 꺼냅니다. 래퍼가 아니면 그대로 반환합니다."""
+    parsed = urlparse(href)
+    # Google: /url?q=<URL> 또는 /url?url=<URL>
+    if parsed.path == '/url' and (not parsed.netloc or 'google' in parsed.netloc):
+        params = parse_qs(parsed.query)
+        target = (params.get('q') or params.get('url') or [None])[0]
+        return target or href
+    # Bing: bing.com/ck/a?...&u=a1<base64url(URL)>
+    if parsed.path == '/ck/a' and 'bing' in parsed.netloc:
+        encoded = (parse_qs(parsed.query).get('u') or [''])[0]
+        if encoded.startswith('a1'):
+            encoded = encoded[2:]
+            try:
+                target = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+            except (binascii.Error, UnicodeDecodeError):
+                return href
+            # 알파벳 밖의 문자는 무시되므로 깨진 값이 빈 문자열 등으로 풀릴 수 있음
+            return target if target.startswith(('http://', 'https://')) else href
+    return href
+
+def _host(canonical):
+    """정규화된 URL(host[:port]/path?query)에서 호스트 부분만 반환합니다."""
+    return canonical.split('/', 1)[0].split('?', 1)[0]
+
+def filter_serp_links(hrefs, domain):
+    """
+    SERP에서 가져온 href 목록에서 대상 도메인(하위 도메인 포함)의 결과 URL만 골라 set으로 반환합니다.
+    리다이렉트 래퍼를 풀고 퍼센트 인코딩을 해제합니다. 검색 엔진 자체 링크는 호스트가 달라 제외됩니다.
+    """
+    target_host = _host(canonicalize(domain))
+    found = set()
+    for href in hrefs:
+        if not href:
+            continue
+        href = unwrap_redirect(href.strip())
+        if href.lower().startswith(('http%3a', 'https%3a')):
+            href = unquote(href)
+        if not href.startswith('http'):
+            continue
+        host = _host(canonicalize(href))
+        if host == target_host or host.endswith('.' + target_host):
+            found.add(href)
+    return found
+
+async def collect_serp_links(page, domain):
+    """브라우저 페이지에서 링크를 한 번에 가져와 결과 URL만 반환합니다."""
+    hrefs = await page.evaluate(HREFS_SCRIPT)
+    return filter_serp_links(hrefs, domain)
+
+def links_from_html(html, domain):
+    """저장된 SERP HTML에서 결과 URL을 추출합니다 (브라우저 없이 동일한 규칙 적용)."""
+    doc = lxml.html.fromstring(html)
+    return filter_serp_links(doc.xpath('//a/@href'), domain)
+
+if __name__ == "__main__":
+    # 저장된 SERP HTML 확인용: python serp_links.py <파일.html> <도메인>
+    import sys
+    with open(sys.argv[1], 'rb') as f:
+        links = links_from_html(f.read(), sys.argv[2])
+    for link in sorted(links):
+        print(link)
+    print(f"{len(links)}개")
@@ -0,0 +1,512 @@
+"""
+대형 사이트맵 분산(샤드) 실행
+- 사이트맵 URL을 안정적인 해시로 N개 샤드에 나눠 SQLite 작업 큐(shard_work)에 넣습니다
+- 작업자(프로세스 또는 다른 서버)는 URL을 SHARD_LEASE_SIZE개씩 임대(lease)해 분석하고,
+  결과를 작업자별 저장소(SHARD_DIR/job<번호>_<작업자>.db)에 기록한 뒤 완료로 표시합니다
+- 임대는 SHARD_LEASE_SECONDS 동안 유효하며 새 임대를 받을 때마다 갱신됩니다.
+  기본 작업자 이름은 프로세스마다 다르므로(<호스트>-s<샤드>-p<PID>) 죽은 작업자의 임대분은 유효 시간이 지나면
+  다른 작업자가 가져갑니다. --worker로 이름을 지정해 다시 시작하면 자신의 임대분을 바로 반납하고 이어서 처리합니다
+- 모든 URL이 완료되면 작업자별 부분 결과를 하나의 실행(run)으로 합쳐 main.py와 같은 리포트를 만듭니다
+
+사용법:
+  python shards.py run <사이트맵 URL> --shards 4          # 큐 생성 + 로컬 작업자 4개 + 검색 엔진 수집 + 합치기
+  python shards.py enqueue <사이트맵 URL> --shards 16     # 큐만 생성 (여러 서버에서 작업할 때)
+  python shards.py work <job> [--shard 3] [--worker 이름]  # 작업자 실행 (샤드 생략 시 모든 샤드에서 가져감)
+  python shards.py status <job>
+  python shards.py merge <job> [--partial]                # 부분 결과 합치기 및 리포트 (검색 엔진 결과는 SERP 캐시 사용)
+  (여러 서버에서 실행할 때는 SHARD_QUEUE_PATH와 SHARD_DIR을 공유 저장소에 둡니다)
+"""
+import argparse
+import asyncio
+import datetime
+import glob
+import hashlib
+import itertools
+import multiprocessing
+import os
+import re
+import socket
+import sqlite3
+import sys
+import time
+
+from config import (
+    CONCURRENT_REQUESTS,
+    ENGINES,
+    HTTP_CACHE_PATH,
+    SHARD_DIR,
+    SHARD_LEASE_SECONDS,
+    SHARD_LEASE_SIZE,
+    SHARD_QUEUE_PATH,
+)
+from host_limiter import HostLimiter
+from http_cache import HttpCache
+from index_checker import get_domain_from_url
+from main import (
+    ENGINE_LABELS,
+    apply_engine_results,
+    crawl_all_engines,
+    pct,
+    write_metrics,
+    write_run_reports,
+)
+from metrics import METRICS
+from run_store import RunStore
+from seo_analyzer import analyze_urls_async
+from sitemap_parser import SitemapError, iter_sitemap_entries_async
+
+REPORTS_DIR = "reports"
+
+# 큐에 넣을 때 한 번에 기록하는 URL 수
+ENQUEUE_BATCH = 1000
+
+# shard_work.state
+PENDING, LEASED, DONE = 0, 1, 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shard_jobs (
+    id INTEGER PRIMARY KEY,
+    sitemap_url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    shards INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,                 -- 결과를 합칠 실행 (RunStore)
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'loading'   -- loading → ready → merged (사이트맵을 다 읽지 못하면 failed)
+);
+CREATE TABLE IF NOT EXISTS shard_work (
+    job_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    state INTEGER NOT NULL DEFAULT 0,        -- 0: 대기, 1: 임대 중, 2: 완료
+    worker TEXT,
+    lease_until REAL,
+    PRIMARY KEY (job_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_shard_work_state ON shard_work(job_id, shard, state);
+"""
+
+def shard_of(url, shards):
+    """URL의 샤드 번호 (프로세스/서버와 관계없이 항상 같은 값)"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % shards
+
+def default_worker_id(shard=None):
+    """
+    프로세스마다 고유한 작업자 이름 (같은 서버에서 같은 샤드를 맡은 작업자가 동시에 떠도 임대분과 저장소가 섞이지 않음).
+    재시작 시 임대분을 이어받으려면 --worker로 고정된 이름을 지정합니다.
+    """
+    host = socket.gethostname()
+    return f"{host}-s{shard}-p{os.getpid()}" if shard is not None else f"{host}-any-p{os.getpid()}"
+
+def worker_cache_path(shard=None):
+    """
+    작업자의 조건부 요청 캐시 파일. 작업자 이름은 프로세스마다 다르므로 서버와 샤드 기준으로 고정해
+    재시작이나 다음 job에서도 같은 파일을 재사용합니다 (같은 샤드는 매번 같은 URL을 맡음).
+    """
+    host = socket.gethostname()
+    name = f"{host}-s{shard}" if shard is not None else f"{host}-any"
+    return os.path.join(os.path.dirname(HTTP_CACHE_PATH), 'shards', f"http_cache_{_safe_name(name)}.db")
+
+def _safe_name(value):
+    return re.sub(r'[^0-9A-Za-z.-]', '_', value)
+
+def worker_store_path(shard_dir, job_id, worker):
+    return os.path.join(shard_dir, f"job{job_id}_{_safe_name(worker)}.db")
+
+class ShardQueue:
+    """샤드 작업 큐 (여러 프로세스가 함께 쓰므로 임대/완료는 짧은 IMMEDIATE 트랜잭션으로 처리)"""
+    def __init__(self, path=SHARD_QUEUE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _write(self, fn):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn()
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return result
+
+    def create_job(self, sitemap_url, domain, shards, run_id):
+        return self._write(lambda: self.conn.execute(
+            "INSERT INTO shard_jobs (sitemap_url, domain, shards, run_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (sitemap_url, domain, shards, run_id, time.time())).lastrowid)
+
+    def add_urls(self, job_id, urls, shards):
+        self._write(lambda: self.conn.executemany(
+            "INSERT OR IGNORE INTO shard_work (job_id, url, shard) VALUES (?, ?, ?)",
+            [(job_id, url, shard_of(url, shards)) for url in urls]))
+
+    def set_status(self, job_id, status):
+        self._write(lambda: self.conn.execute("UPDATE shard_jobs SET status = ? WHERE id = ?", (status, job_id)))
+
+    def job(self, job_id):
+        row = self.conn.execute(
+            "SELECT id, sitemap_url, domain, shards, run_id, status FROM shard_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'sitemap_url', 'domain', 'shards', 'run_id', 'status'), row))
+
+    def release(self, job_id, worker):
+        """작업자가 (재)시작할 때 이전에 임대해 두고 끝내지 못한 URL을 대기 상태로 돌립니다. 반환값: 반납한 수"""
+        return self._write(lambda: self.conn.execute(
+            "UPDATE shard_work SET state = ?, worker = NULL, lease_until = NULL "
+            "WHERE job_id = ? AND worker = ? AND state = ?", (PENDING, job_id, worker, LEASED)).rowcount)
+
+    def lease(self, job_id, shards, worker, size=SHARD_LEASE_SIZE, seconds=SHARD_LEASE_SECONDS):
+        """
+        shards 순서대로 대기 중이거나 임대가 만료된 URL을 size개까지 임대합니다.
+        진행 중인 자신의 임대도 함께 갱신합니다. 남은 작업이 없으면 빈 리스트
+        """
+        def lease():
+            now = time.time()
+            self.conn.execute("UPDATE shard_work SET lease_until = ? WHERE job_id = ? AND worker = ? AND state = ?",
+                              (now + seconds, job_id, worker, LEASED))
+            urls = []
+            for shard in shards:
+                urls = [row[0] for row in self.conn.execute(
+                    "SELECT url FROM shard_work WHERE job_id = ? AND shard = ? "
+                    "AND (state = ? OR (state = ? AND lease_until < ?)) LIMIT ?",
+                    (job_id, shard, PENDING, LEASED, now, size))]
+                if urls:
+                    break
+            self.conn.executemany(
+                "UPDATE shard_work SET state = ?, worker = ?, lease_until = ? WHERE job_id = ? AND url = ?",
+                [(LEASED, worker, now + seconds, job_id, url) for url in urls])
+            return urls
+        return self._write(lease)
+
+    def complete(self, job_id, worker, urls):
+        """결과를 저장한 URL을 완료로 표시합니다 (임대가 다른 작업자에게 넘어간 URL은 제외)."""
+        self._write(lambda: self.conn.executemany(
+            "UPDATE shard_work SET state = ?, lease_until = NULL WHERE job_id = ? AND url = ? AND worker = ? AND state = ?",
+            [(DONE, job_id, url, worker, LEASED) for url in urls]))
+
+    def progress(self, job_id):
+        """{shard: [대기, 임대 중, 완료]}"""
+        progress = {}
+        for shard, state, count in self.conn.execute(
+                "SELECT shard, state, COUNT(*) FROM shard_work WHERE job_id = ? GROUP BY shard, state", (job_id,)):
+            progress.setdefault(shard, [0, 0, 0])[state] = count
+        return dict(sorted(progress.items()))
+
+    def remaining(self, job_id):
+        return self.conn.execute("SELECT COUNT(*) FROM shard_work WHERE job_id = ? AND state != ?",
+                                 (job_id, DONE)).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+async def enqueue_sitemap(queue, store, sitemap_url, shards):
+    """
+    사이트맵을 스트리밍으로 읽어 작업 큐에 넣고 job 번호를 반환합니다. URL이 없으면 None
+    읽지 못한 사이트맵이 있으면 job을 'failed'로 표시하고 SitemapError를 그대로 발생시킵니다.
+    """
+    entries = iter_sitemap_entries_async(sitemap_url)
+    first = await anext(entries, None)
+    if first is None:
+        return None
+    domain = get_domain_from_url(first['loc'])
+    run_id = store.start_run(domain, sitemap_url)
+    job_id = queue.create_job(sitemap_url, domain, shards, run_id)
+    batch = [first['loc']]
+    try:
+        async for entry in entries:
+            batch.append(entry['loc'])
+            if len(batch) >= ENQUEUE_BATCH:
+                queue.add_urls(job_id, batch, shards)
+                batch = []
+    except SitemapError:
+        queue.set_status(job_id, 'failed')
+        raise
+    queue.add_urls(job_id, batch, shards)
+    queue.set_status(job_id, 'ready')
+    return job_id
+
+async def _work_async(queue, job_id, shards, worker, store, run_id, cache, concurrency):
+    """
+    임대한 URL을 끊김 없이 분석기로 흘려보내고, 임대 단위로 결과를 저장한 뒤 완료 표시합니다.
+    반환값: 분석한 URL 수
+    """
+    owner = {}      # 분석 중인 URL → 임대 번호
+    leased = {}     # 임대 번호 → URL 목록
+    remaining = {}  # 임대 번호 → 아직 결과가 나오지 않은 URL 수
+    counter = itertools.count()
+    processed = 0
+
+    def on_analyze_complete(result):
+        nonlocal processed
+        processed += 1
+        lease_no = owner.pop(result['url'])
+        store.add(run_id, result)
+        remaining[lease_no] -= 1
+        if remaining[lease_no] == 0:
+            # 결과를 먼저 기록한 뒤 완료 표시 (중간에 죽으면 이 임대분만 다시 처리)
+            store.flush()
+            queue.complete(job_id, worker, leased.pop(lease_no))
+            del remaining[lease_no]
+
+    async def leased_urls():
+        while True:
+            urls = queue.lease(job_id, shards, worker)
+            if not urls:
+                return
+            lease_no = next(counter)
+            leased[lease_no] = urls
+            remaining[lease_no] = len(urls)
+            for url in urls:
+                owner[url] = lease_no
+                yield url
+
+    with METRICS.timer('stage_seconds', stage='analysis'):
+        await analyze_urls_async(leased_urls(), on_analyze_complete, retain=False, limiter=HostLimiter(),
+                                 cache=cache, concurrency=concurrency)
+    return processed
+
+def work(job_id, shard=None, worker=None, queue_path=SHARD_QUEUE_PATH, shard_dir=SHARD_DIR,
+         concurrency=CONCURRENT_REQUESTS):
+    """
+    작업자 하나를 실행합니다 (임대할 URL이 없으면 종료). 별도 프로세스의 진입점으로도 사용합니다.
+    shard를 지정하면 그 샤드만, 생략하면 모든 샤드에서 가져갑니다.
+    반환값: 이번 실행에서 처리한 URL 수
+    """
+    queue = ShardQueue(queue_path)
+    job = queue.job(job_id)
+    if job is None:
+        print(f"job #{job_id}이(가) 없습니다.")
+        queue.close()
+        return 0
+    worker = worker or default_worker_id(shard)
+    if shard is not None:
+        shards = [shard]
+    else:
+        # 작업자마다 다른 샤드부터 가져가 경합을 줄임
+        start = shard_of(worker, job['shards'])
+        shards = [(start + i) % job['shards'] for i in range(job['shards'])]
+    released = queue.release(job_id, worker)
+    if released:
+        print(f"[{worker}] 이전 실행에서 끝내지 못한 URL {released}개를 다시 처리합니다.")
+
+    os.makedirs(shard_dir, exist_ok=True)
+    store = RunStore(worker_store_path(shard_dir, job_id, worker))
+    run_id = store.conn.execute("SELECT MIN(id) FROM runs").fetchone()[0] or store.start_run(job['domain'], job['sitemap_url'])
+    # 조건부 요청 캐시는 서버/샤드별 파일 사용. 같은 샤드를 맡은 작업자가 동시에 떠도 함께 쓸 수 있도록 바로 커밋
+    cache = HttpCache(worker_cache_path(shard), commit_every=1)
+    try:
+        processed = asyncio.run(_work_async(queue, job_id, shards, worker, store, run_id, cache, concurrency))
+    finally:
+        store.close()
+        cache.close()
+        queue.close()
+    write_metrics(shard_dir, f"job{job_id}_{_safe_name(worker)}")
+    print(f"[{worker}] 처리 완료: {processed}개")
+    return processed
+
+def merge(job_id, store, queue, shard_dir=SHARD_DIR):
+    """작업자별 부분 결과를 job의 실행으로 합칩니다. 반환값: 합친 URL 수"""
+    job = queue.job(job_id)
+    added = 0
+    with METRICS.timer('stage_seconds', stage='merge'):
+        for path in sorted(glob.glob(os.path.join(shard_dir, f"job{job_id}_*.db"))):
+            source = RunStore(path)
+            run_ids = [row[0] for row in source.conn.execute("SELECT id FROM runs ORDER BY id")]
+            source.close()
+            for source_run_id in run_ids:
+                added += store.merge_run(path, source_run_id, job['run_id'])
+    return added
+
+def _incomplete_reason(queue, job):
+    """job을 완료된 실행으로 합칠 수 없는 이유 (사이트맵을 모두 넣었고 모든 URL이 끝났으면 None)"""
+    if job['status'] not in ('ready', 'merged'):
+        return f"사이트맵을 모두 큐에 넣지 못한 job입니다 (상태: {job['status']})"
+    remaining = queue.remaining(job['id'])
+    if remaining:
+        return f"끝나지 않은 URL {remaining}개가 있습니다"
+    return None
+
+def finish_job(job_id, store, queue, engine_urls, shard_dir=SHARD_DIR, reports_dir=REPORTS_DIR, partial=False):
+    """
+    부분 결과를 합치고 인덱싱 여부를 결합해 리포트를 저장합니다.
+    partial=True면 끝나지 않은 job(읽지 못한 사이트맵, 남은 URL)도 지금까지의 결과로 리포트를 만들되,
+    실행과 job은 완료로 표시하지 않습니다. partial=False인데 끝나지 않은 job이면 ValueError
+    """
+    job = queue.job(job_id)
+    incomplete = _incomplete_reason(queue, job)
+    if incomplete and not partial:
+        raise ValueError(f"job #{job_id}: {incomplete}")
+    run_id = job['run_id']
+    added = merge(job_id, store, queue, shard_dir)
+    print(f"\n부분 결과 합치기: {added}개 추가 ('{store.path}', run #{run_id})")
+    if incomplete:
+        print(f"[!] {incomplete}. 지금까지의 결과로만 리포트를 만듭니다 (실행은 완료로 표시하지 않음).")
+    else:
+        store.finish_run(run_id)
+    apply_engine_results(store, run_id, engine_urls)
+    os.makedirs(reports_dir, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report = write_run_reports(store, run_id, job['domain'], reports_dir, timestamp)
+    if not incomplete:
+        queue.set_status(job_id, 'merged')
+    metrics_files = write_metrics(reports_dir, timestamp)
+
+    summary = report['summary']
+    print(f"\n===== 분석 결과 요약 (job #{job_id}, {job['shards']}개 샤드{', 부분 결과' if incomplete else ''}) =====")
+    print(f"전체 URL: {summary['total']}개")
+    for engine, label in ENGINE_LABELS.items():
+        print(f"{label} 인덱싱: {summary['engines'][engine]}개 ({pct(summary['engines'][engine], summary['total'])})")
+    print(f"미인덱싱: {summary['not_indexed']}개")
+    print(f"1. 전체 리포트: {report['filename']}")
+    print(f"2. 정렬된 리포트(추천): {report['sorted_filename']}")
+    if report['diff_filename']:
+        print(f"3. 이전 실행(run #{report['previous_run']}) 대비 인덱싱 변화 {report['diff_count']}건: {report['diff_filename']}")
+    if metrics_files:
+        print(f"- 실행 계측: {metrics_files[0]} / {metrics_files[1]}")
+
+def _collect_engines(domain, refresh_engines=()):
+    return asyncio.run(crawl_all_engines(domain, refresh_engines))
+
+def print_status(queue, job_id):
+    job = queue.job(job_id)
+    print(f"job #{job_id} [{job['status']}] {job['sitemap_url']} → run #{job['run_id']}")
+    for shard, (pending, leased, done) in queue.progress(job_id).items():
+        print(f"  shard {shard:>3}: 대기 {pending}, 임대 중 {leased}, 완료 {done}")
+    print(f"  남은 URL: {queue.remaining(job_id)}개")
+
+def run(sitemap_url, shards, queue_path=SHARD_QUEUE_PATH, shard_dir=SHARD_DIR, refresh_engines=(),
+        concurrency=CONCURRENT_REQUESTS):
+    """큐를 만들고 샤드마다 로컬 작업자 프로세스를 띄우는 동안 검색 엔진을 수집한 뒤, 모두 끝나면 합칩니다."""
+    queue = ShardQueue(queue_path)
+    store = RunStore()
+
+    async def run_async():
+        job_id = await enqueue_sitemap(queue, store, sitemap_url, shards)
+        if job_id is None:
+            return None, None
+        job = queue.job(job_id)
+        print(f"[job #{job_id}] URL {queue.remaining(job_id)}개를 {shards}개 샤드로 나눴습니다. 작업자 {shards}개 시작...")
+        engine_task = asyncio.create_task(crawl_all_engines(job['domain'], refresh_engines))
+        ctx = multiprocessing.get_context('spawn')
+        workers = [ctx.Process(target=work, args=(job_id, shard), kwargs={
+            'queue_path': queue_path, 'shard_dir': shard_dir, 'concurrency': max(1, concurrency // shards)})
+            for shard in range(shards)]
+        try:
+            for process in workers:
+                process.start()
+            loop = asyncio.get_running_loop()
+            for process in workers:
+                await loop.run_in_executor(None, process.join)
+            return job_id, await engine_task
+        finally:
+            engine_task.cancel()
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+
+    try:
+        try:
+            with METRICS.timer('stage_seconds', stage='pipeline'):
+                job_id, engine_urls = asyncio.run(run_async())
+        except SitemapError as e:
+            print(f"[!] 사이트맵을 모두 읽지 못했습니다: {e}")
+            return 1
+        if job_id is None:
+            print("발견된 URL: 0개")
+            return 1
+        remaining = queue.remaining(job_id)
+        if remaining:
+            print(f"\n[!] 끝나지 않은 URL {remaining}개가 있습니다. "
+                  f"'python shards.py work {job_id}'로 이어서 처리한 뒤 'python shards.py merge {job_id}'를 실행하세요.")
+            return 1
+        finish_job(job_id, store, queue, engine_urls, shard_dir)
+        return 0
+    finally:
+        store.close()
+        queue.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대형 사이트맵 분산(샤드) 실행")
+    parser.add_argument('--queue', default=SHARD_QUEUE_PATH, help="작업 큐 파일 경로")
+    parser.add_argument('--shard-dir', default=SHARD_DIR, help="작업자별 부분 결과 폴더")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help="큐 생성 + 로컬 작업자 실행 + 검색 엔진 수집 + 합치기")
+    p.add_argument('sitemap_url')
+    p.add_argument('--shards', type=int, default=os.cpu_count() or 4)
+    p.add_argument('--concurrency', type=int, default=CONCURRENT_REQUESTS, help="모든 작업자를 합친 동시 요청 수")
+    p.add_argument('--refresh-engines', nargs='*', choices=list(ENGINES), metavar='ENGINE')
+
+    p = sub.add_parser('enqueue', help="작업 큐만 생성 (여러 서버에서 work 실행)")
+    p.add_argument('sitemap_url')
+    p.add_argument('--shards', type=int, required=True)
+
+    p = sub.add_parser('work', help="작업자 실행")
+    p.add_argument('job', type=int)
+    p.add_argument('--shard', type=int, help="맡을 샤드 (생략 시 모든 샤드)")
+    p.add_argument('--worker', help="고정 작업자 이름 (재시작 시 같은 이름이면 자신의 임대분을 이어서 처리, "
+                   "같은 이름으로 작업자를 동시에 두 개 띄우지 않아야 함). 생략하면 프로세스마다 고유한 이름 사용")
+    p.add_argument('--concurrency', type=int, default=CONCURRENT_REQUESTS)
+
+    p = sub.add_parser('status', help="샤드별 진행 상황")
+    p.add_argument('job', type=int)
+
+    p = sub.add_parser('merge', help="부분 결과 합치기 및 리포트 생성")
+    p.add_argument('job', type=int)
+    p.add_argument('--partial', action='store_true',
+                   help="끝나지 않은 URL이 있거나 사이트맵을 모두 읽지 못한 job도 지금까지의 결과로 합치기 (완료로 표시하지 않음)")
+    p.add_argument('--refresh-engines', nargs='*', choices=list(ENGINES), metavar='ENGINE')
+
+    args = parser.parse_args(argv)
+    refresh_engines = () if getattr(args, 'refresh_engines', None) is None else tuple(args.refresh_engines or ENGINES)
+
+    if args.command == 'run':
+        return run(args.sitemap_url, args.shards, args.queue, args.shard_dir, refresh_engines, args.concurrency)
+    if args.command == 'work':
+        work(args.job, args.shard, args.worker, args.queue, args.shard_dir, args.concurrency)
+        return 0
+
+    queue = ShardQueue(args.queue)
+    try:
+        if args.command == 'enqueue':
+            store = RunStore()
+            try:
+                job_id = asyncio.run(enqueue_sitemap(queue, store, args.sitemap_url, args.shards))
+            except SitemapError as e:
+                print(f"[!] 사이트맵을 모두 읽지 못했습니다: {e}")
+                return 1
+            finally:
+                store.close()
+            if job_id is None:
+                print("발견된 URL: 0개")
+                return 1
+            print(f"job #{job_id}: URL {queue.remaining(job_id)}개, 샤드 {args.shards}개")
+            return 0
+        if queue.job(args.job) is None:
+            print(f"job #{args.job}이(가) 없습니다.")
+            return 1
+        if args.command == 'status':
+            print_status(queue, args.job)
+            return 0
+        # merge
+        incomplete = _incomplete_reason(queue, queue.job(args.job))
+        if incomplete and not args.partial:
+            print(f"{incomplete}. 모두 처리한 뒤 합치거나 --partial을 사용하세요.")
+            return 1
+        # 검색 엔진 결과는 SERP 캐시(TTL)에 있으면 브라우저 없이 재사용
+        engine_urls = _collect_engines(queue.job(args.job)['domain'], refresh_engines)
+        store = RunStore()
+        try:
+            finish_job(args.job, store, queue, engine_urls, args.shard_dir, partial=args.partial)
+        finally:
+            store.close()
+        return 0
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
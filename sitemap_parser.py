@@ -1,47 +1,314 @@
+import asyncio
+import zlib
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from lxml import etree
+
+from config import SITEMAP_CONCURRENT_REQUESTS, SITEMAP_MAX_DEPTH, TIMEOUT
+from metrics import http_trace_config
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# 스트리밍 다운로드 시 한 번에 읽을 바이트 수
+CHUNK_SIZE = 64 * 1024
+
+# <url> 항목에서 함께 추출하는 필드
+ENTRY_FIELDS = ('loc', 'lastmod', 'changefreq', 'priority')
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# 비동기 수집 시 소비자에게 넘기기 전 대기할 수 있는 최대 항목 수
+ENTRY_BUFFER_SIZE = 1000
 
-def get_sitemap_urls(sitemap_url):
+# 사이트맵 요청 시간 제한: 소비자(페이지 분석) 속도에 맞춰 오래 읽을 수 있도록 전체 시간은 제한하지 않고
+# 연결 수립과 읽기 대기만 제한 (공유 세션의 기본값 total=300초를 쓰면 큰 사이트맵이 중간에 잘림)
+# connect(연결 풀 대기 포함)는 페이지 요청이 연결을 모두 쓰고 있을 때 잘못 걸릴 수 있으므로 소켓 연결에만 적용
+SITEMAP_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=TIMEOUT, sock_read=TIMEOUT)
+
+class SitemapError(Exception):
+    """
+    일부 사이트맵을 내려받거나 파싱하지 못했습니다.
+    그 전에 넘긴 항목은 유효하지만 URL 목록이 불완전하므로, 호출하는 쪽은 실행을 실패로 처리해야 합니다.
+    """
+    def __init__(self, failures):
+        self.failures = failures  # [(사이트맵 URL, 오류 설명)]
+        super().__init__('; '.join(f"{url}: {reason}" for url, reason in failures))
+
+def describe_error(e):
+    """예외 설명 (TimeoutError처럼 메시지가 비어 있으면 예외 이름)"""
+    return str(e) or type(e).__name__
+
+class SitemapStreamParser:
+    """
+    사이트맵 XML을 청크 단위로 받아 증분 파싱합니다.
+    feed()가 호출될 때마다 완성된 항목만 반환하고, 처리한 요소는 즉시 메모리에서 해제합니다.
+    gzip 압축(.xml.gz) 본문은 첫 바이트로 감지하여 투명하게 해제합니다.
+    반환 형식: ('url', {'loc', 'lastmod', 'changefreq', 'priority'}) 또는 ('sitemap', loc)
+    """
+    def __init__(self):
+        self._parser = etree.XMLPullParser(
+            events=('end',), resolve_entities=False, no_network=True, huge_tree=True
+        )
+        self._decompressor = None
+        self._head = b''
+
+    def feed(self, chunk):
+        if self._head is not None:
+            # gzip 여부 판단을 위해 최소 2바이트 확보
+            self._head += chunk
+            if len(self._head) < len(GZIP_MAGIC):
+                return []
+            chunk, self._head = self._head, None
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor is not None:
+            chunk = self._decompressor.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._collect()
+
+    def close(self):
+        if self._head:
+            self._parser.feed(self._head)
+        elif self._decompressor is not None:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        return self._collect()
+
+    def _collect(self):
+        items = []
+        for _, elem in self._parser.read_events():
+            tag = etree.QName(elem).localname
+            if tag == 'url':
+                entry = {field: None for field in ENTRY_FIELDS}
+                for child in elem:
+                    if not isinstance(child.tag, str):
+                        continue
+                    name = etree.QName(child).localname
+                    if name in entry and child.text:
+                        entry[name] = child.text.strip()
+                if entry['loc']:
+                    items.append(('url', entry))
+            elif tag == 'sitemap':
+                for child in elem:
+                    if isinstance(child.tag, str) and etree.QName(child).localname == 'loc' and child.text:
+                        items.append(('sitemap', child.text.strip()))
+                        break
+            elif tag == 'loc':
+                # <url>/<sitemap>으로 감싸지지 않은 단순 <loc> 목록 대응
+                # (image:loc 등 <url> 내부 확장 태그는 제외)
+                if any(etree.QName(a).localname in ('url', 'sitemap') for a in elem.iterancestors()):
+                    continue
+                if elem.text and elem.text.strip():
+                    items.append(('url', {'loc': elem.text.strip(), 'lastmod': None, 'changefreq': None, 'priority': None}))
+            else:
+                continue
+            _release(elem)
+        return items
+
+def _release(elem):
+    """처리가 끝난 요소와 앞선 형제 요소를 트리에서 제거하여 메모리를 일정하게 유지"""
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+def _cache_lookup(cache, sitemap_url):
+    """캐시 키, 저장된 항목, 요청 헤더를 반환합니다."""
+    key = f"sitemap:{sitemap_url}"
+    entry = cache.get(key) if cache is not None else None
+    headers = dict(HEADERS)
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    return key, entry, headers
+
+def _cached_items(entry):
+    return [tuple(item) for item in entry.payload]
+
+def _iter_sitemap_items(sitemap_url, cache=None):
+    """
+    단일 사이트맵 파일을 스트리밍으로 내려받아 파싱 결과를 순서대로 yield 합니다.
+    cache(HttpCache)를 지정하면 조건부 요청을 보내고, 변경이 없으면(304) 저장된 항목을 재사용합니다.
+    캐시 사용 시 한 파일의 항목(프로토콜상 최대 5만 개)은 저장을 위해 파일 단위로 모아둡니다.
+    """
+    key, entry, headers = _cache_lookup(cache, sitemap_url)
+    if entry is not None and entry.fresh:
+        yield from _cached_items(entry)
+        return
+
+    parser = SitemapStreamParser()
+    collected = [] if cache is not None else None
+    with requests.get(sitemap_url, headers=headers, timeout=10, stream=True) as response:
+        if response.status_code == 304 and entry is not None:
+            cache.touch(key)
+            yield from _cached_items(entry)
+            return
+        response.raise_for_status()
+        validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            for item in parser.feed(chunk):
+                if collected is not None:
+                    collected.append(item)
+                yield item
+    for item in parser.close():
+        if collected is not None:
+            collected.append(item)
+        yield item
+    if cache is not None:
+        cache.put(key, *validators, collected)
+
+def iter_sitemap_entries(sitemap_url, seen=None, max_depth=SITEMAP_MAX_DEPTH, cache=None):
+    """
+    사이트맵 URL을 입력받아 하위 URL 항목을 발견되는 즉시 하나씩 yield 합니다.
+    인덱스 사이트맵은 자식 사이트맵을 차례로 따라가며, 중복 URL은 즉시 걸러냅니다.
+    항목 형식: {'loc', 'lastmod', 'changefreq', 'priority'}
+    """
+    if seen is None:
+        seen = set()
+    visited = {sitemap_url}
+    pending = [(sitemap_url, 0)]
+
+    while pending:
+        current, depth = pending.pop()
+
+        children = []
+        try:
+            for kind, value in _iter_sitemap_items(current, cache):
+                if kind == 'sitemap':
+                    children.append(value)
+                elif value['loc'] not in seen:
+                    seen.add(value['loc'])
+                    yield value
+        except Exception as e:
+            print(f"Error parsing sitemap {current}: {describe_error(e)}")
+
+        # 문서 순서대로 처리되도록 역순으로 스택에 추가
+        for child in reversed(children):
+            if _should_follow(child, depth + 1, visited, max_depth):
+                pending.append((child, depth + 1))
+
+def _should_follow(child, depth, visited, max_depth):
+    """순환 참조와 최대 깊이를 확인하고, 따라갈 자식 사이트맵이면 방문 표시합니다."""
+    if child in visited:
+        return False
+    if depth > max_depth:
+        print(f"Skipping sitemap {child}: max depth {max_depth} exceeded")
+        return False
+    visited.add(child)
+    return True
+
+def iter_sitemap_urls(sitemap_url, cache=None):
+    """iter_sitemap_entries의 URL(loc)만 yield 합니다."""
+    for entry in iter_sitemap_entries(sitemap_url, cache=cache):
+        yield entry['loc']
+
+async def _fetch_sitemap_items(session, sitemap_url, cache=None):
+    """단일 사이트맵 파일을 비동기 스트리밍으로 내려받아 파싱 결과를 yield 합니다. (캐시 동작은 동기 버전과 동일)"""
+    key, entry, headers = _cache_lookup(cache, sitemap_url)
+    if entry is not None and entry.fresh:
+        for item in _cached_items(entry):
+            yield item
+        return
+
+    parser = SitemapStreamParser()
+    collected = [] if cache is not None else None
+    async with session.get(sitemap_url, headers=headers, ssl=False, timeout=SITEMAP_TIMEOUT) as response:
+        if response.status == 304 and entry is not None:
+            cache.touch(key)
+            for item in _cached_items(entry):
+                yield item
+            return
+        response.raise_for_status()
+        validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            for item in parser.feed(chunk):
+                if collected is not None:
+                    collected.append(item)
+                yield item
+    for item in parser.close():
+        if collected is not None:
+            collected.append(item)
+        yield item
+    if cache is not None:
+        cache.put(key, *validators, collected)
+
+async def iter_sitemap_entries_async(sitemap_url, session=None, seen=None,
+                                     max_workers=SITEMAP_CONCURRENT_REQUESTS, max_depth=SITEMAP_MAX_DEPTH, cache=None):
+    """
+    iter_sitemap_entries의 비동기 버전입니다.
+    자식 사이트맵을 제한된 수의 워커로 동시에 내려받고, 발견된 URL 항목을 즉시 yield 합니다.
+    출력 큐가 가득 차면 다운로드가 잠시 멈추므로 소비자(페이지 분석)의 속도에 맞춰 진행됩니다.
+    내려받지 못한 사이트맵이 있으면 나머지 항목을 모두 넘긴 뒤 SitemapError를 발생시킵니다.
+    """
+    if seen is None:
+        seen = set()
+    visited = {sitemap_url}
+    work = asyncio.Queue()
+    out = asyncio.Queue(maxsize=ENTRY_BUFFER_SIZE)
+    done = object()
+    pending = 1
+    failures = []
+    work.put_nowait((sitemap_url, 0))
+
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(headers=HEADERS, timeout=SITEMAP_TIMEOUT,
+                                        trace_configs=[http_trace_config()])
+
+    async def worker():
+        nonlocal pending
+        while True:
+            current, depth = await work.get()
+            try:
+                async for kind, value in _fetch_sitemap_items(session, current, cache):
+                    if kind == 'sitemap':
+                        if _should_follow(value, depth + 1, visited, max_depth):
+                            pending += 1
+                            work.put_nowait((value, depth + 1))
+                    elif value['loc'] not in seen:
+                        seen.add(value['loc'])
+                        await out.put(value)
+            except Exception as e:
+                failures.append((current, describe_error(e)))
+                print(f"Error parsing sitemap {current}: {describe_error(e)}")
+            # 취소(중단)된 경우에는 가득 찬 큐에서 기다리지 않도록 finally가 아닌 곳에서 종료를 알림
+            pending -= 1
+            if pending == 0:
+                await out.put(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_workers)]
+    try:
+        while True:
+            item = await out.get()
+            if item is done:
+                break
+            yield item
+        if failures:
+            raise SitemapError(failures)
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if own_session:
+            await session.close()
+
+async def iter_sitemap_urls_async(sitemap_url, session=None, cache=None):
+    """
+    iter_sitemap_entries_async의 URL(loc)만 yield 합니다.
+    analyze_urls_async에 그대로 넘기면 사이트맵 수집과 페이지 분석이 동시에 진행됩니다.
+    """
+    async for entry in iter_sitemap_entries_async(sitemap_url, session=session, cache=cache):
+        yield entry['loc']
+
+def get_sitemap_urls(sitemap_url, cache=None):
     """
     사이트맵 URL을 입력받아 모든 하위 URL 목록을 반환합니다.
     인덱스 사이트맵(다른 사이트맵을 포함하는 경우) 처리 로직이 포함되어 있습니다.
     """
-    urls = []
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(sitemap_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'lxml-xml')
-        
-        # 1. 인덱스 사이트맵인 경우 (<sitemap> 태그 확인)
-        sitemaps = soup.find_all('sitemap')
-        if sitemaps:
-            for sitemap in sitemaps:
-                loc = sitemap.find('loc')
-                if loc:
-                    urls.extend(get_sitemap_urls(loc.text))
-        
-        # 2. 일반 URL인 경우 (<url> 태그 확인)
-        url_tags = soup.find_all('url')
-        for url_tag in url_tags:
-            loc = url_tag.find('loc')
-            if loc:
-                urls.append(loc.text)
-                
-        # 3. 만약 위 형식이 아니고 단순 XML 태그 <loc>만 있는 경우 대응
-        if not sitemaps and not url_tags:
-            locs = soup.find_all('loc')
-            for loc in locs:
-                urls.append(loc.text)
-                
-    except Exception as e:
-        print(f"Error parsing sitemap {sitemap_url}: {e}")
-        
-    return list(set(urls)) # 중복 제거
+    return list(iter_sitemap_urls(sitemap_url, cache)) # 중복 제거는 스트리밍 중에 처리됨
 
 if __name__ == "__main__":
     # 테스트 코드
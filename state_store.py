@@ -0,0 +1,85 @@
+"""
+URL별 최근 분석 상태 저장소 (증분 실행용, SQLite)
+- 사이트맵 lastmod와 마지막 분석 결과를 URL 단위로 보관합니다
+- 다음 실행에서 새 URL, lastmod가 갱신된 URL, 지난번 실패한 URL, 오래된 결과만 다시 분석합니다
+"""
+import datetime
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from config import STATE_DB_PATH
+
+# 상태 저장소에 보관하는 분석 결과 필드
+STATE_FIELDS = ('url', 'status_code', 'content_type', 'x_robots_tag', 'title', 'description',
+                'h1', 'canonical', 'robots', 'issues', 'failure_class', 'final_url', 'redirects')
+
+# 이 횟수만큼 저장이 쌓이면 커밋
+COMMIT_EVERY = 500
+
+def parse_lastmod(value):
+    """W3C Datetime 형식의 lastmod를 UTC 타임스탬프로 변환합니다. 해석할 수 없으면 None"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+def is_failed(result):
+    """크롤링 자체가 실패한 결과인지 (다음 실행에서 반드시 재분석)"""
+    return bool(result.get('failure_class')) or not result.get('status_code')
+
+class UrlStateStore:
+    def __init__(self, path=STATE_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_state (
+                url TEXT PRIMARY KEY,
+                lastmod REAL,
+                analyzed_at REAL NOT NULL,
+                failed INTEGER NOT NULL,
+                result BLOB NOT NULL
+            )""")
+        self._pending = 0
+
+    def reusable_result(self, url, lastmod, stale_after):
+        """
+        이전 분석 결과를 그대로 쓸 수 있으면 결과 dict를, 다시 분석해야 하면 None을 반환합니다.
+        재분석 조건: 새 URL / 지난번 실패 / lastmod가 이전보다 최신 / stale_after(초)보다 오래된 결과
+        """
+        row = self.conn.execute(
+            "SELECT lastmod, analyzed_at, failed, result FROM url_state WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        prev_lastmod, analyzed_at, failed, blob = row
+        if failed or time.time() - analyzed_at > stale_after:
+            return None
+        current = parse_lastmod(lastmod)
+        if current is not None and current > (prev_lastmod if prev_lastmod is not None else analyzed_at):
+            return None
+        return json.loads(zlib.decompress(blob))
+
+    def save(self, result, lastmod=None):
+        payload = {field: result.get(field) for field in STATE_FIELDS}
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO url_state (url, lastmod, analyzed_at, failed, result) VALUES (?, ?, ?, ?, ?)",
+            (result['url'], parse_lastmod(lastmod), time.time(), int(is_failed(result)), blob))
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,90 @@
+"""LinkCrawler.handle의 링크/리다이렉트 반영 테스트 (네트워크 없이 분석 결과 dict를 직접 넘김)"""
+import pytest
+
+from link_graph import KNOWN, QUEUED, LinkCrawler, LinkGraph
+
+SITE = 'https://example.com'
+
+@pytest.fixture
+def crawler(tmp_path):
+    graph = LinkGraph(str(tmp_path / 'graph.db'), f"{SITE}/")
+    crawler = LinkCrawler(graph, max_depth=5, max_pages=100)
+    start, _ = graph.add_node(f"{SITE}/")
+    crawler.enqueue(start, f"{SITE}/", 0)
+    yield crawler
+    graph.close()
+
+def fetch(crawler, url, final_url=None, links=(), status=200, redirect_status=None):
+    """대기열에서 url을 꺼내 분석 결과를 넘깁니다 (redirect_status를 주면 final_url로 리다이렉트된 결과)."""
+    node = next(node for queued, node in crawler.frontier if queued == url)
+    crawler.frontier.remove((url, node))
+    crawler.in_flight[url] = node
+    crawler.handle({
+        'url': url,
+        'final_url': final_url or url,
+        'status_code': status,
+        'redirects': [{'status': redirect_status, 'location': final_url}] if redirect_status else [],
+        'links': list(links),
+    })
+    return node
+
+def frontier_urls(crawler):
+    return [url for url, _ in crawler.frontier]
+
+def edges(graph):
+    graph.flush()
+    return set(graph.conn.execute("SELECT src, dst FROM edges"))
+
+def node_of(graph, url):
+    return graph.add_node(url)[0]
+
+def test_links_are_followed(crawler):
+    fetch(crawler, f"{SITE}/", links=['/a', 'b', 'https://other.com/x', '#top', 'mailto:x@example.com'])
+    assert frontier_urls(crawler) == [f"{SITE}/a", f"{SITE}/b"]
+
+def test_redirect_to_same_canonical_url_follows_final_links(crawler):
+    # /blog → /blog/ 는 정규화하면 같은 노드: 최종 페이지의 링크를 이 노드의 링크로 따라감
+    fetch(crawler, f"{SITE}/", links=['/blog'])
+    blog = fetch(crawler, f"{SITE}/blog", f"{SITE}/blog/", links=['post1'], redirect_status=301)
+    graph = crawler.graph
+    post = node_of(graph, f"{SITE}/blog/post1")
+    assert frontier_urls(crawler) == [f"{SITE}/blog/post1"]
+    assert graph.link_depth[post] == 2
+    assert (blog, post) in edges(graph)
+
+def test_redirect_target_is_not_fetched_again(crawler):
+    fetch(crawler, f"{SITE}/", links=['/old'])
+    old = fetch(crawler, f"{SITE}/old", f"{SITE}/new", links=['/post'], redirect_status=301)
+    graph = crawler.graph
+    new = node_of(graph, f"{SITE}/new")
+    post = node_of(graph, f"{SITE}/post")
+    # 최종 페이지는 요청한 것으로 처리하고 그 링크만 대기열에 추가
+    assert frontier_urls(crawler) == [f"{SITE}/post"]
+    assert graph.state[new] == QUEUED
+    assert graph.link_depth[new] == graph.link_depth[old]
+    assert {(old, new), (new, post)} <= edges(graph)
+    graph.flush()
+    assert graph.conn.execute("SELECT status_code, outlinks FROM nodes WHERE id = ?", (old,)).fetchone() == (301, 1)
+    assert graph.conn.execute("SELECT status_code, outlinks FROM nodes WHERE id = ?", (new,)).fetchone() == (200, 1)
+
+def test_redirect_to_already_queued_page_only_adds_edge(crawler):
+    fetch(crawler, f"{SITE}/", links=['/old', '/new'])
+    fetch(crawler, f"{SITE}/old", f"{SITE}/new", links=['/post'], redirect_status=301)
+    # /new는 자체 요청에서 링크를 수집하므로 여기서 링크를 중복 기록하지 않음
+    assert frontier_urls(crawler) == [f"{SITE}/new"]
+    assert crawler.graph.state[node_of(crawler.graph, f"{SITE}/post")] == KNOWN
+
+def test_redirect_to_other_host(crawler):
+    fetch(crawler, f"{SITE}/", links=['/out'])
+    out = fetch(crawler, f"{SITE}/out", 'https://other.com/', links=['/x'], redirect_status=302)
+    assert frontier_urls(crawler) == []
+    assert not any(src == out for src, _ in edges(crawler.graph))
+
+def test_nofollow_page(crawler):
+    url = f"{SITE}/"
+    node = next(node for _, node in crawler.frontier)
+    crawler.frontier.clear()
+    crawler.in_flight[url] = node
+    crawler.handle({'url': url, 'final_url': url, 'status_code': 200, 'redirects': [],
+                    'links': ['/a'], 'robots': 'noindex, nofollow'})
+    assert frontier_urls(crawler) == []
@@ -0,0 +1,112 @@
+"""seo_analyzer의 페이지 요청/캐시 테스트 (로컬 aiohttp 서버 사용)"""
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+import seo_analyzer
+from host_limiter import HostLimiter
+from http_cache import HttpCache
+from seo_analyzer import analyze_urls_async, fetch_and_analyze
+
+PAGE = b'<html><head><title>Cached page title</title></head><body><h1>Heading</h1>'
+
+async def serve(handler, body):
+    """handler로 모든 경로를 처리하는 서버를 띄우고 body(base_url)를 실행합니다."""
+    app = web.Application()
+    app.router.add_get('/{path:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await body(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+async def page(request):
+    return web.Response(body=PAGE, content_type='text/html', headers={'ETag': '"v1"'})
+
+def test_completed_page_is_cached(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache.db'))
+
+    async def body(base):
+        async with aiohttp.ClientSession() as session:
+            return await fetch_and_analyze(session, f"{base}/a", cache=cache)
+
+    result = asyncio.run(serve(page, body))
+    entry = cache.get(f"page:{result['url']}")
+    assert entry is not None and entry.etag == '"v1"'
+    assert entry.payload['title'] == 'Cached page title'
+    cache.close()
+
+def test_cancelled_page_is_not_cached(tmp_path):
+    # 본문을 받는 중에 취소된 200 응답은 빈 분석 결과이므로, 다음 실행의 304 응답에 재사용되지 않도록 저장하지 않음
+    cache = HttpCache(str(tmp_path / 'cache.db'))
+
+    async def run():
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def slow_page(request):
+            response = web.StreamResponse(headers={'ETag': '"v1"', 'Content-Type': 'text/html'})
+            await response.prepare(request)
+            await response.write(b'<html><head>')
+            started.set()
+            await cancelled.wait()
+            return response
+
+        async def body(base):
+            async with aiohttp.ClientSession() as session:
+                task = asyncio.create_task(fetch_and_analyze(session, f"{base}/slow", cache=cache))
+                await asyncio.wait_for(started.wait(), 5)
+                await asyncio.sleep(0.1)
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                cancelled.set()
+                return task.cancelled()
+
+        return await serve(slow_page, body)
+
+    assert asyncio.run(run())
+    assert cache.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+    cache.close()
+
+def test_malformed_url_is_failed_result():
+    limiter = HostLimiter()
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return await fetch_and_analyze(session, 'http://[::1/a', limiter=limiter)
+
+    result = asyncio.run(run())
+    assert result['failure_class'] == 'error'
+    assert result['issues'] == ['Async Crawl Error: Invalid IPv6 URL']
+    assert not limiter.snapshot()
+
+def analyze(urls, timeout=10):
+    async def run(base):
+        return await asyncio.wait_for(analyze_urls_async([url.format(base=base) for url in urls], concurrency=2), timeout)
+    return asyncio.run(serve(page, run))
+
+def test_pipeline_finishes_with_unparseable_url():
+    results = analyze(['http://[::1/a', '{base}/ok'])
+    by_url = {result['url']: result for result in results}
+    assert by_url['http://[::1/a']['failure_class'] == 'error'
+    assert [result['status_code'] for url, result in by_url.items() if url.endswith('/ok')] == [200]
+
+def test_pipeline_turns_worker_exception_into_result(monkeypatch):
+    # 분석 중 예외가 나도 워커가 죽지 않고 결과를 내보내야 파이프라인이 끝남 (이전에는 영원히 대기)
+    real = seo_analyzer.fetch_and_analyze
+
+    async def flaky(session, url, *args):
+        if 'broken' in url:
+            raise ValueError('Invalid IPv6 URL')
+        return await real(session, url, *args)
+    monkeypatch.setattr(seo_analyzer, 'fetch_and_analyze', flaky)
+
+    results = analyze(['{base}/broken', '{base}/ok', '{base}/broken2'])
+    failed = sorted(result['url'].rsplit('/', 1)[1] for result in results if result['failure_class'] == 'error')
+    assert failed == ['broken', 'broken2']
+    assert len(results) == 3
+    assert all(result['attempts'] == 1 for result in results)
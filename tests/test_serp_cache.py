@@ -0,0 +1,94 @@
+"""SerpCache 조회와 수집 완료 판정 테스트 (차단된 엔진은 체크포인트하지 않고, 결과가 0개로 끝난 엔진은 완료로 판정)"""
+import time
+
+import pytest
+
+from serp_cache import SerpCache
+
+DOMAIN = 'example.com'
+BLOCKED = object()
+
+def crawl(cache, pages, max_pages=3, start_page=0):
+    """
+    index_checker 크롤러의 페이지 루프와 같은 방식으로 캐시에 기록합니다.
+    pages: 페이지별 결과 (URL set, 캡차/차단이면 BLOCKED). 차단된 페이지는 저장하지 않고 중단하며,
+    1페이지 이후 결과가 없으면 마지막 페이지로 저장합니다.
+    """
+    urls = set()
+    for page_num in range(start_page, max_pages):
+        links = pages[page_num]
+        if links is BLOCKED:
+            break
+        urls.update(links)
+        cache.put('google', DOMAIN, page_num, links, last=not links and page_num > 0)
+        if not links and page_num > 0:
+            break
+    return urls
+
+def age(cache, seconds):
+    """저장된 페이지를 seconds초 전에 수집한 것으로 바꿉니다."""
+    with cache.conn:
+        cache.conn.execute("UPDATE serp_pages SET fetched_at = fetched_at - ?", (seconds,))
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SerpCache(str(tmp_path / 'serp.db'), ttl=3600)
+    yield cache
+    cache.close()
+
+def test_blocked_on_first_page_is_not_finished(cache):
+    started = time.time()
+    assert crawl(cache, [BLOCKED]) == set()
+    assert not cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_empty_but_finished_is_finished(cache):
+    started = time.time()
+    assert crawl(cache, [set(), set()]) == set()
+    assert cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_blocked_after_some_pages_is_not_finished(cache):
+    started = time.time()
+    crawl(cache, [{'https://example.com/a'}, BLOCKED])
+    assert not cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_all_pages_without_end_is_finished(cache):
+    started = time.time()
+    crawl(cache, [{'https://example.com/a'}, {'https://example.com/b'}, {'https://example.com/c'}])
+    assert cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_resumed_crawl_with_cached_pages_is_finished(cache):
+    # 이전 수집(TTL 이내)이 1페이지까지 저장하고 멈춘 뒤, 이번 수집이 2페이지부터 이어서 끝냄
+    crawl(cache, [{'https://example.com/a'}, BLOCKED])
+    age(cache, 60)
+    started = time.time()
+    urls, start_page, complete = cache.lookup('google', DOMAIN, 3)
+    assert (start_page, complete) == (1, False)
+    crawl(cache, [None, {'https://example.com/b'}, set()], start_page=start_page)
+    assert cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_refresh_ignores_pages_from_earlier_crawl(cache):
+    crawl(cache, [{'https://example.com/a'}, set()])
+    age(cache, 60)
+    started = time.time()
+    assert cache.crawl_finished('google', DOMAIN, 3, started)
+    # 캐시를 무시하고 다시 수집하다 차단되면 이전에 끝난 페이지가 남아 있어도 완료가 아님
+    crawl(cache, [BLOCKED])
+    assert not cache.crawl_finished('google', DOMAIN, 3, started, refresh=True)
+
+def test_expired_pages_do_not_count(cache):
+    crawl(cache, [{'https://example.com/a'}, set()])
+    age(cache, 7200)
+    started = time.time()
+    crawl(cache, [BLOCKED])
+    assert not cache.crawl_finished('google', DOMAIN, 3, started)
+
+def test_disabled_cache_still_reports_finished_crawl(tmp_path):
+    # TTL이 0이면 재사용은 하지 않지만, 이번 수집에서 저장한 페이지로 완료 여부는 판정
+    cache = SerpCache(str(tmp_path / 'serp.db'), ttl=0)
+    started = time.time()
+    crawl(cache, [{'https://example.com/a'}, set()])
+    assert cache.lookup('google', DOMAIN, 3) == (set(), 0, False)
+    assert cache.crawl_finished('google', DOMAIN, 3, started)
+    started = time.time() + 1
+    assert not cache.crawl_finished('google', DOMAIN, 3, started)
+    cache.close()
@@ -0,0 +1,61 @@
+"""serp_links의 링크 추출/필터링 테스트 (bench_server의 SERP fixture 사용, 브라우저 없이 실행)"""
+import base64
+
+import pytest
+
+from bench_server import serp_fixture
+from serp_links import filter_serp_links, links_from_html, unwrap_redirect
+
+DOMAIN = 'example.com'
+
+def expected_results(count=10, start=0):
+    hosts = {3: f"www.{DOMAIN}", 4: f"blog.{DOMAIN}"}
+    return {f"https://{hosts.get(i % 5, DOMAIN)}/p/{i}" for i in range(start, start + count)}
+
+@pytest.mark.parametrize('engine', ['google', 'bing', 'naver'])
+def test_fixture_results_are_unwrapped(engine):
+    assert links_from_html(serp_fixture(engine, DOMAIN), DOMAIN) == expected_results()
+
+@pytest.mark.parametrize('engine', ['google', 'bing', 'naver'])
+def test_fixture_pagination(engine):
+    assert links_from_html(serp_fixture(engine, DOMAIN, start=10), DOMAIN) == expected_results(start=10)
+
+@pytest.mark.parametrize('engine', ['google', 'bing', 'naver'])
+def test_engine_and_lookalike_hosts_excluded(engine):
+    links = links_from_html(serp_fixture(engine, DOMAIN), DOMAIN)
+    for link in links:
+        assert not any(name in link for name in ('google', 'bing', 'naver', 'ads.example', 'mirror.example'))
+    assert f"https://not{DOMAIN}/p/0" not in links
+
+def test_google_wrapper():
+    assert unwrap_redirect('/url?q=https://example.com/a%3Fb&sa=U') == 'https://example.com/a?b'
+    assert unwrap_redirect('https://www.google.com/url?url=https://example.com/a') == 'https://example.com/a'
+    # 다른 사이트의 /url 경로는 래퍼가 아님
+    assert unwrap_redirect('https://example.org/url?q=https://example.com/') == 'https://example.org/url?q=https://example.com/'
+
+def test_bing_wrapper():
+    encoded = base64.urlsafe_b64encode('https://example.com/한글?x=1'.encode('utf-8')).decode('ascii').rstrip('=')
+    href = f"https://www.bing.com/ck/a?!&&p=abc&u=a1{encoded}&ntb=1"
+    assert unwrap_redirect(href) == 'https://example.com/한글?x=1'
+    # 디코딩할 수 없는 값은 원래 링크를 유지하고, 필터에서 bing 호스트로 제외됨
+    broken = 'https://www.bing.com/ck/a?u=a1%%%'
+    assert unwrap_redirect(broken) == broken
+    assert filter_serp_links([broken], DOMAIN) == set()
+
+def test_domain_matching():
+    hrefs = [
+        'https://example.com/a',
+        'http://WWW.Example.com/b',
+        'https://shop.example.com/c',
+        'https%3A%2F%2Fexample.com%2Fd',
+        'https://badexample.com/e',
+        'https://example.com.evil.example/f',
+        '/search?q=site:example.com',
+        '',
+        None,
+    ]
+    assert filter_serp_links(hrefs, DOMAIN) == {
+        'https://example.com/a', 'http://WWW.Example.com/b', 'https://shop.example.com/c', 'https://example.com/d'}
+
+def test_www_domain_argument_matches_bare_host():
+    assert filter_serp_links(['https://example.com/a'], 'www.example.com') == {'https://example.com/a'}
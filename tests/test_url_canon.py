@@ -0,0 +1,153 @@
+"""
+url_canon 정규화(인덱싱 여부 매칭 규칙) 속성 테스트
+시드를 고정한 무작위 URL로 멱등성, 같은 URL의 여러 표기 간 동치, 다른 URL 간 구분을 확인합니다.
+"""
+import random
+from urllib.parse import quote, urlencode
+
+import pytest
+
+from url_canon import canonical_set, canonicalize
+
+SAMPLES = 300
+
+LABELS = ['example', 'shop', 'blog-1', 'x9', '한국', 'bücher']
+SUFFIXES = ['com', 'co.kr', 'org']
+SEGMENTS = ['a', 'B', 'dir', 'file.html', 'x~y', 'a-b_c', '한글', '%E2%9C%93', 'semi;colon', 'a%2Fb', '1']
+PARAMS = [('id', '1'), ('q', 'a b'), ('page', '2'), ('sort', 'new'), ('tag', '한글')]
+
+def random_url(rng):
+    """(scheme, host, path, query) 구성 요소"""
+    scheme = rng.choice(['http', 'https'])
+    host = '.'.join(rng.sample(LABELS, rng.randint(1, 2)) + [rng.choice(SUFFIXES)])
+    path = '/' + '/'.join(rng.choice(SEGMENTS) for _ in range(rng.randint(0, 3)))
+    params = rng.sample(PARAMS, rng.randint(0, 3))
+    return scheme, host, path, params
+
+def build(scheme, host, path, params, port=None):
+    netloc = f"{host}:{port}" if port else host
+    query = urlencode(params, quote_via=quote)
+    return f"{scheme}://{netloc}{path}" + (f"?{query}" if query else '')
+
+def samples(seed):
+    rng = random.Random(seed)
+    return [(rng, random_url(rng)) for _ in range(SAMPLES)]
+
+def idna(host):
+    return host.encode('idna').decode('ascii')
+
+def escape_unreserved(path, rng):
+    """경로의 영문자 하나를 %XX로 바꿉니다 (같은 URL)."""
+    positions = [i for i, char in enumerate(path) if char.isascii() and char.isalpha()
+                 and not _inside_escape(path, i)]
+    if not positions:
+        return path
+    i = rng.choice(positions)
+    return f"{path[:i]}%{ord(path[i]):02X}{path[i + 1:]}"
+
+def _inside_escape(path, i):
+    return (i >= 1 and path[i - 1] == '%') or (i >= 2 and path[i - 2] == '%')
+
+def lower_escapes(path):
+    out, i = [], 0
+    while i < len(path):
+        if path[i] == '%':
+            out.append(path[i:i + 3].lower())
+            i += 3
+        else:
+            out.append(path[i])
+            i += 1
+    return ''.join(out)
+
+# ----- 멱등성 -----
+
+@pytest.mark.parametrize('trailing_slash', ['strip', 'keep'])
+@pytest.mark.parametrize('query_policy', ['keep', 'drop_tracking', 'drop_all'])
+def test_idempotent(query_policy, trailing_slash):
+    policies = {'query_policy': query_policy, 'trailing_slash': trailing_slash}
+    for _, parts in samples(1):
+        key = canonicalize(build(*parts), **policies)
+        assert canonicalize(key, **policies) == key
+
+def test_idempotent_with_port_and_www():
+    for rng, (scheme, host, path, params) in samples(2):
+        url = build(scheme, 'www.' + host, path, params, port=rng.choice([None, 8080, 443]))
+        key = canonicalize(url)
+        assert canonicalize(key) == key
+
+# ----- 같은 URL의 다른 표기 -----
+
+def variants(rng, scheme, host, path, params):
+    other = 'https' if scheme == 'http' else 'http'
+    default_port = 80 if scheme == 'http' else 443
+    shuffled = params[:]
+    rng.shuffle(shuffled)
+    return {
+        'scheme': build(other, host, path, params),
+        'www': build(scheme, 'www.' + host, path, params),
+        'default_port': build(scheme, host, path, params, port=default_port),
+        'host_case': build(scheme, host.upper(), path, params),
+        'idna': build(scheme, idna(host), path, params),
+        'escape_case': build(scheme, host, lower_escapes(path), params),
+        'escaped_unreserved': build(scheme, host, escape_unreserved(path, rng), params),
+        'encoded_unicode': build(scheme, host, quote(path, safe="%/;~"), params),
+        'trailing_slash': build(scheme, host, path.rstrip('/') + '/', params),
+        'param_order': build(scheme, host, path, shuffled),
+        'tracking': build(scheme, host, path, params + [('utm_source', 'news'), ('gclid', 'abc')]),
+        'fragment': build(scheme, host, path, params) + '#section',
+        'no_scheme': build(scheme, host, path, params).split('://', 1)[1],
+    }
+
+def test_equivalent_variants():
+    for rng, parts in samples(3):
+        key = canonicalize(build(*parts))
+        for name, variant in variants(rng, *parts).items():
+            assert canonicalize(variant) == key, (name, build(*parts), variant)
+
+def test_variants_match_in_canonical_set():
+    """검색 엔진 결과 URL이 다른 표기여도 사이트맵 URL이 인덱싱된 것으로 판정됨 (apply_engine_results와 같은 방식)"""
+    for rng, parts in samples(4):
+        indexed = canonical_set(variants(rng, *parts).values())
+        assert canonicalize(build(*parts)) in indexed
+
+# ----- 다른 URL은 구분 -----
+
+def test_different_path_differs():
+    for rng, (scheme, host, path, params) in samples(5):
+        other = path.rstrip('/') + '/other'
+        assert canonicalize(build(scheme, host, path, params)) != canonicalize(build(scheme, host, other, params))
+
+def test_path_case_differs():
+    assert canonicalize('https://example.com/Page') != canonicalize('https://example.com/page')
+
+def test_different_host_differs():
+    assert canonicalize('https://example.com/a') != canonicalize('https://shop.example.com/a')
+    assert canonicalize('https://example.com/a') != canonicalize('https://example.org/a')
+
+def test_non_default_port_differs():
+    assert canonicalize('https://example.com:8443/a') != canonicalize('https://example.com/a')
+    assert canonicalize('http://example.com:443/a') != canonicalize('http://example.com/a')
+
+def test_different_query_differs_unless_dropped():
+    for rng, (scheme, host, path, params) in samples(6):
+        url = build(scheme, host, path, params)
+        other = build(scheme, host, path, params + [('variant', 'b')])
+        assert canonicalize(url, query_policy='keep') != canonicalize(other, query_policy='keep')
+        assert canonicalize(url, query_policy='drop_tracking') != canonicalize(other, query_policy='drop_tracking')
+        assert canonicalize(url, query_policy='drop_all') == canonicalize(other, query_policy='drop_all')
+
+def test_tracking_params_kept_under_keep_policy():
+    url = 'https://example.com/a?id=1'
+    tracked = 'https://example.com/a?id=1&utm_source=x'
+    assert canonicalize(url, query_policy='keep') != canonicalize(tracked, query_policy='keep')
+    assert canonicalize(url, query_policy='drop_tracking') == canonicalize(tracked, query_policy='drop_tracking')
+
+def test_trailing_slash_kept_under_keep_policy():
+    assert canonicalize('https://example.com/a/', trailing_slash='keep') != \
+        canonicalize('https://example.com/a', trailing_slash='keep')
+    assert canonicalize('https://example.com', trailing_slash='keep') == \
+        canonicalize('https://example.com/', trailing_slash='keep')
+
+def test_reserved_escape_not_decoded():
+    # %2F(/)는 경로 구분자와 다르므로 디코딩하지 않음
+    assert canonicalize('https://example.com/a%2Fb') != canonicalize('https://example.com/a/b')
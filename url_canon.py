@@ -0,0 +1,103 @@
+"""
+URL 정규화 엔진 (인덱싱 여부 비교용)
+- URL을 한 번만 파싱하여 비교 키를 만듭니다: 스킴 무시, 호스트 소문자/IDNA 변환, 맨 앞 www. 제거, 기본 포트 제거
+- 퍼센트 인코딩 정규화: 예약되지 않은 문자(A-Z a-z 0-9 - . _ ~)는 디코딩, 나머지 이스케이프는 대문자로 통일,
+  한글 등 비ASCII 문자는 UTF-8로 인코딩하므로 인코딩 여부와 관계없이 같은 키가 됩니다
+- 쿼리 파라미터(추적 파라미터 제거, 정렬)와 경로 끝 슬래시 처리는 config.py 설정을 따릅니다
+- 프래그먼트(#...)와 사용자 정보(user@)는 버립니다
+- 같은 URL은 메모리 캐시(lru_cache)로 한 번만 계산합니다
+"""
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+from config import (
+    CANON_CACHE_SIZE,
+    CANON_QUERY_POLICY,
+    CANON_TRACKING_PARAMS,
+    CANON_TRACKING_PREFIXES,
+    CANON_TRAILING_SLASH,
+)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 경로에서 이스케이프하지 않는 문자 (RFC 3986 예약 문자 + 비예약 문자, 기존 % 이스케이프 유지)
+PATH_SAFE = "%/:@!$&'()*+,;=-._~"
+
+_ESCAPE_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+_TRACKING_PARAMS = frozenset(CANON_TRACKING_PARAMS)
+
+def _normalize_escape(match):
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else '%' + match.group(1).upper()
+
+def _normalize_path(path, trailing_slash):
+    if path and not path.isascii():
+        path = quote(path, safe=PATH_SAFE)
+    if '%' in path:
+        path = _ESCAPE_RE.sub(_normalize_escape, path)
+    if trailing_slash == 'strip':
+        path = path.rstrip('/')
+    elif not path:
+        path = '/'
+    return path
+
+def _is_tracking(name):
+    return name in _TRACKING_PARAMS or name.startswith(CANON_TRACKING_PREFIXES)
+
+def _normalize_query(query, query_policy):
+    if not query or query_policy == 'drop_all':
+        return ''
+    pairs = parse_qsl(query, keep_blank_values=True)
+    if query_policy == 'drop_tracking':
+        pairs = [(name, value) for name, value in pairs if not _is_tracking(name.lower())]
+    pairs.sort()
+    return urlencode(pairs, quote_via=quote)
+
+def _normalize_host(hostname):
+    host = hostname.rstrip('.')
+    if not host.isascii():
+        try:
+            host = host.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+@lru_cache(maxsize=CANON_CACHE_SIZE)
+def canonicalize(url, query_policy=CANON_QUERY_POLICY, trailing_slash=CANON_TRAILING_SLASH):
+    """
+    비교용 정규화 URL을 반환합니다. 형식: host[:port]/path[?query] (스킴 없음)
+    스킴이 없는 입력(example.com/a)은 http로 간주합니다.
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if '://' not in url:
+        url = 'http://' + url.lstrip('/')
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        # 잘못된 포트/호스트 형식은 정규화하지 않고 비교
+        return url
+    scheme = parts.scheme.lower()
+    host = _normalize_host(parts.hostname or '')
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    path = _normalize_path(parts.path, trailing_slash)
+    query = _normalize_query(parts.query, query_policy)
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+def canonicalize_many(urls, **policies):
+    """여러 URL을 순서대로 정규화한 리스트를 반환합니다."""
+    return [canonicalize(url, **policies) for url in urls]
+
+def canonical_set(urls, **policies):
+    """정규화된 URL 집합을 반환합니다 (인덱싱 여부 조회용)."""
+    return {canonicalize(url, **policies) for url in urls}
+
+def cache_info():
+    return canonicalize.cache_info()
@@ -1,8 +1,8 @@
-import csv
-import os
 import random
-from urllib.parse import urlparse
+
 from config import USER_AGENTS
+from url_canon import canonicalize
+
 
 def get_random_header():
     return {'User-Agent': random.choice(USER_AGENTS)}
@@ -10,6 +10,13 @@ def get_random_header():
 def normalize_url(url):
     """
     URL 비교를 위해 정규화합니다.
+    실제 처리는 url_canon.canonicalize (스킴/www./기본 포트/끝 슬래시/추적 파라미터 무시, 퍼센트 인코딩 통일)
+    """
+    return canonicalize(url)
+
+def normalize_url_legacy(url):
+    """
+    이전 문자열 치환 방식의 정규화 (벤치마크 비교 기준용)
     - http/https 제거
     - www. 제거
     - 끝의 / 제거
@@ -26,24 +33,3 @@ def normalize_url(url):
         url = url[:-1]
         
     return url
-
-class CsvLogger:
-    def __init__(self, filename, fieldnames):
-        self.filename = filename
-        self.fieldnames = fieldnames
-        self.initialized = False
-        
-        # 파일이 이미 존재하면 헤더를 쓰지 않음
-        if os.path.exists(filename) and os.path.getsize(filename) > 0:
-            self.initialized = True
-
-    def log(self, data):
-        try:
-            with open(self.filename, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-                if not self.initialized:
-                    writer.writeheader()
-                    self.initialized = True
-                writer.writerow(data)
-        except Exception as e:
-            print(f"Error writing to CSV: {e}")